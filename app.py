@@ -5,11 +5,30 @@ Beautiful UI with Dashboard & Statistics
 """
 
 import streamlit as st
-import pandas as pd
-import google.generativeai as genai
-import json
+import html
+import os
+import re
+import uuid
 from io import BytesIO
 from datetime import datetime
+from functools import lru_cache
+
+from postpro.ensemble import score_ensemble
+from postpro.cache import AnalysisCache, ExportCache, default_cache_dir, upload_digest
+from postpro.analyzer import ContextCache
+from postpro.batch import load_drafts, split_drafts
+from postpro.history import HistoryStore, score_band
+from postpro.ingest import parse_linkedin_xlsx
+from postpro.library import AnchorLibrary
+from postpro.layout import DEVICES, fold_all
+from postpro.lint import default_linter
+from postpro.providers import get_provider
+from postpro.scheduler import as_completed, scheduler_from_env
+from postpro.live import DebouncedWorker, IncrementalLinter
+from postpro.store import ExportStore
+from postpro.tokens import total_usage
+from postpro.tracing import tracer
+from postpro.variants import optimize
 
 # Page config
 st.set_page_config(
@@ -19,466 +38,335 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# ?perf=1 traces this session's runs (not the whole process) and reveals the Performance tab
+tracer.trace_session(st.query_params.get('perf') == '1')
+
+ASSETS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets')
+
+
+@lru_cache(maxsize=None)
+def load_css(name: str = 'style.css') -> str:
+    """A stylesheet from assets/, minified into a <style> block once per process."""
+    with open(os.path.join(ASSETS, name), encoding='utf-8') as f:
+        css = f.read()
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.DOTALL)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};:,>])\s*', r'\1', css)
+    return f"<style>{css.strip()}</style>"
+
+
 # Modern CSS with gradients and animations
-st.markdown("""
-<style>
-    /* Import Google Font */
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap');
-    
-    * {
-        font-family: 'Inter', sans-serif;
-    }
-    
-    /* Main background */
-    .stApp {
-        background: linear-gradient(135deg, #1a1a2e 0%, #16213e 50%, #0f3460 100%);
-    }
-    
-    /* Header styling */
-    .main-header {
-        background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        font-size: 3rem;
-        font-weight: 700;
-        text-align: center;
-        margin-bottom: 0;
-    }
-    
-    .sub-header {
-        color: #a0aec0;
-        font-size: 1.1rem;
-        text-align: center;
-        margin-top: 5px;
-        margin-bottom: 30px;
-    }
-    
-    /* Card styling */
-    .metric-card {
-        background: linear-gradient(145deg, #1e2a4a 0%, #152238 100%);
-        border-radius: 16px;
-        padding: 24px;
-        border: 1px solid rgba(102, 126, 234, 0.2);
-        box-shadow: 0 4px 20px rgba(0, 0, 0, 0.3);
-        transition: transform 0.3s ease, box-shadow 0.3s ease;
-    }
-    
-    .metric-card:hover {
-        transform: translateY(-5px);
-        box-shadow: 0 8px 30px rgba(102, 126, 234, 0.3);
-    }
-    
-    .metric-value {
-        font-size: 2.5rem;
-        font-weight: 700;
-        background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-    }
-    
-    .metric-label {
-        color: #a0aec0;
-        font-size: 0.9rem;
-        text-transform: uppercase;
-        letter-spacing: 1px;
-        margin-top: 8px;
-    }
-    
-    /* Score display */
-    .score-container {
-        background: linear-gradient(145deg, #1e2a4a 0%, #152238 100%);
-        border-radius: 20px;
-        padding: 30px;
-        text-align: center;
-        border: 2px solid;
-        animation: pulse 2s infinite;
-    }
-    
-    .score-high {
-        border-color: #48bb78;
-        box-shadow: 0 0 30px rgba(72, 187, 120, 0.3);
-    }
-    
-    .score-medium {
-        border-color: #ecc94b;
-        box-shadow: 0 0 30px rgba(236, 201, 75, 0.3);
-    }
-    
-    .score-low {
-        border-color: #fc8181;
-        box-shadow: 0 0 30px rgba(252, 129, 129, 0.3);
-    }
-    
-    .score-number {
-        font-size: 4rem;
-        font-weight: 700;
-    }
-    
-    .score-number.high { color: #48bb78; }
-    .score-number.medium { color: #ecc94b; }
-    .score-number.low { color: #fc8181; }
-    
-    /* Risk badges */
-    .risk-badge {
-        display: inline-block;
-        padding: 8px 20px;
-        border-radius: 50px;
-        font-weight: 600;
-        font-size: 0.9rem;
-        text-transform: uppercase;
-        letter-spacing: 1px;
-    }
-    
-    .risk-low {
-        background: linear-gradient(90deg, #48bb78 0%, #38a169 100%);
-        color: white;
-    }
-    
-    .risk-medium {
-        background: linear-gradient(90deg, #ecc94b 0%, #d69e2e 100%);
-        color: #1a1a2e;
-    }
-    
-    .risk-high {
-        background: linear-gradient(90deg, #fc8181 0%, #e53e3e 100%);
-        color: white;
-    }
-    
-    /* Button styling */
-    .stButton > button {
-        background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        border: none;
-        border-radius: 12px;
-        padding: 12px 30px;
-        font-weight: 600;
-        font-size: 1rem;
-        transition: all 0.3s ease;
-        box-shadow: 0 4px 15px rgba(102, 126, 234, 0.4);
-    }
-    
-    .stButton > button:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 6px 25px rgba(102, 126, 234, 0.6);
-    }
-    
-    /* Text area styling */
-    .stTextArea textarea {
-        background: #1e2a4a;
-        border: 1px solid rgba(102, 126, 234, 0.3);
-        border-radius: 12px;
-        color: #e2e8f0;
-        font-size: 15px;
-        padding: 15px;
-    }
-    
-    .stTextArea textarea:focus {
-        border-color: #667eea;
-        box-shadow: 0 0 0 3px rgba(102, 126, 234, 0.2);
-    }
-    
-    /* Sidebar styling */
-    [data-testid="stSidebar"] {
-        background: linear-gradient(180deg, #1e2a4a 0%, #152238 100%);
-    }
-    
-    [data-testid="stSidebar"] .stTextInput input {
-        background: #0f172a;
-        border: 1px solid rgba(102, 126, 234, 0.3);
-        border-radius: 8px;
-        color: #e2e8f0;
-    }
-    
-    /* Tab styling */
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 8px;
-        background: transparent;
-    }
-    
-    .stTabs [data-baseweb="tab"] {
-        background: #1e2a4a;
-        border-radius: 10px;
-        color: #a0aec0;
-        border: 1px solid rgba(102, 126, 234, 0.2);
-        padding: 10px 20px;
-    }
-    
-    .stTabs [aria-selected="true"] {
-        background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
-        color: white;
-    }
-    
-    /* Expander styling */
-    .streamlit-expanderHeader {
-        background: #1e2a4a;
-        border-radius: 10px;
-        color: #e2e8f0;
-    }
-    
-    /* Analysis results cards */
-    .analysis-card {
-        background: linear-gradient(145deg, #1e2a4a 0%, #152238 100%);
-        border-radius: 16px;
-        padding: 20px;
-        margin: 10px 0;
-        border-left: 4px solid #667eea;
-    }
-    
-    .suggestion-item {
-        background: rgba(102, 126, 234, 0.1);
-        border-radius: 10px;
-        padding: 15px;
-        margin: 8px 0;
-        border-left: 3px solid #667eea;
-        color: #e2e8f0;
-    }
-    
-    .hook-rewrite {
-        background: linear-gradient(145deg, rgba(72, 187, 120, 0.1) 0%, rgba(56, 161, 105, 0.1) 100%);
-        border-radius: 12px;
-        padding: 20px;
-        border: 1px solid rgba(72, 187, 120, 0.3);
-        color: #48bb78;
-        font-size: 1.1rem;
-        line-height: 1.6;
-    }
-    
-    /* Footer */
-    .footer {
-        text-align: center;
-        color: #4a5568;
-        padding: 30px;
-        margin-top: 50px;
-    }
-    
-    /* Animations */
-    @keyframes pulse {
-        0%, 100% { opacity: 1; }
-        50% { opacity: 0.8; }
-    }
-    
-    @keyframes slideIn {
-        from { opacity: 0; transform: translateY(20px); }
-        to { opacity: 1; transform: translateY(0); }
-    }
-    
-    .animate-in {
-        animation: slideIn 0.5s ease forwards;
-    }
-    
-    /* Mobile preview */
-    .mobile-preview {
-        background: #000;
-        border-radius: 30px;
-        padding: 20px;
-        max-width: 320px;
-        margin: 0 auto;
-        border: 3px solid #333;
-    }
-    
-    .mobile-header {
-        background: #1a1a1a;
-        padding: 10px;
-        border-radius: 10px;
-        margin-bottom: 15px;
-    }
-    
-    .mobile-content {
-        background: #fff;
-        color: #000;
-        padding: 15px;
-        border-radius: 10px;
-        font-size: 14px;
-        line-height: 1.5;
-    }
-    
-    .see-more {
-        color: #0a66c2;
-        font-weight: 600;
-    }
-    
-    /* Hide Streamlit branding */
-    #MainMenu {visibility: hidden;}
-    footer {visibility: hidden;}
-    
-    /* Custom divider */
-    .custom-divider {
-        height: 2px;
-        background: linear-gradient(90deg, transparent, #667eea, transparent);
-        margin: 30px 0;
-    }
-</style>
-""", unsafe_allow_html=True)
+st.markdown(load_css(), unsafe_allow_html=True)
 
 
-# Initialize session state
-if 'analysis_history' not in st.session_state:
-    st.session_state.analysis_history = []
-if 'total_analyses' not in st.session_state:
-    st.session_state.total_analyses = 0
-if 'avg_score' not in st.session_state:
-    st.session_state.avg_score = 0
+@st.cache_resource
+def get_analysis_cache() -> AnalysisCache:
+    """Process-wide analysis cache shared by every session."""
+    return AnalysisCache(os.path.join(default_cache_dir(), 'analysis.sqlite'))
 
 
-def parse_linkedin_xlsx(uploaded_file) -> dict:
-    """Parse LinkedIn Content export XLSX file."""
-    try:
-        xlsx = pd.ExcelFile(BytesIO(uploaded_file.read()))
-        df = pd.read_excel(xlsx, sheet_name='TOP POSTS', header=None)
-        
-        header_row = None
-        for idx, row in df.iterrows():
-            if 'Post URL' in row.values:
-                header_row = idx
-                break
-        
-        if header_row is None:
-            return {"error": "Could not find Post URL header in file"}
-        
-        engagement_df = df.iloc[header_row+1:, 0:3].copy()
-        engagement_df.columns = ['url', 'date', 'engagements']
-        engagement_df = engagement_df.dropna(subset=['url'])
-        engagement_df = engagement_df[engagement_df['url'].str.contains('linkedin.com', na=False)]
-        
-        impressions_df = df.iloc[header_row+1:, 4:7].copy()
-        impressions_df.columns = ['url', 'date', 'impressions']
-        impressions_df = impressions_df.dropna(subset=['url'])
-        impressions_df = impressions_df[impressions_df['url'].str.contains('linkedin.com', na=False)]
-        
-        demographics = {}
-        try:
-            demo_df = pd.read_excel(xlsx, sheet_name='DEMOGRAPHICS')
-            top_titles = demo_df[demo_df['Top Demographics'] == 'Job titles'].head(5)
-            demographics = top_titles[['Value', 'Percentage']].to_dict('records')
-        except:
-            pass
-        
-        # Get engagement trends
-        try:
-            trend_df = pd.read_excel(xlsx, sheet_name='ENGAGEMENT')
-            trends = trend_df.to_dict('records')
-        except:
-            trends = []
-        
-        return {
-            "top_by_engagement": engagement_df.head(10).to_dict('records'),
-            "top_by_impressions": impressions_df.head(10).to_dict('records'),
-            "demographics": demographics,
-            "trends": trends
-        }
-        
-    except Exception as e:
-        return {"error": str(e)}
-
-
-def analyze_posts(anchor: str, draft: str, api_key: str) -> dict:
-    """Send anchor and draft to Google Gemini for comparison analysis."""
-    
-    genai.configure(api_key=api_key)
-    model = genai.GenerativeModel('gemini-2.5-flash')
-    
-    prompt = f"""You are a Strategic LinkedIn Editor for a Senior Executive.
-Your task is to validate if the [New Draft] matches the DNA of the [Anchor Post].
-
-CONTEXT:
-The user's audience consists of senior professionals - Founders, CEOs, and executives.
-
-FATAL ERRORS to flag:
-1. "Junior" advice (basic tips that sound inexperienced)
-2. "Bot Speak" (words like: delve, landscape, unlock, game-changer, leverage, synergy)
-3. "Wall of Text" (paragraphs > 3 lines without breaks)
-4. Tone mismatch (formal vs casual, story vs data)
-
-ANALYSIS FRAMEWORK:
-1. Visual Physics: Line breaks, paragraph density, white space, overall structure
-2. Tonal DNA: Cynicism vs Optimism, Direct vs Storytelling, Personal vs Professional
-3. Hook Geometry: Does the first sentence create similar psychological impact?
-4. Authority Level: Does it sound like the same seniority level?
-
-[ANCHOR POST - This performed well]:
-{anchor}
-
----
-
-[NEW DRAFT - Analyze this]:
-{draft}
-
-Compare the draft to the anchor and provide your analysis.
-
-OUTPUT: Return ONLY valid JSON (no markdown, no explanation before/after, no ```json tags):
-{{
-    "score": <number 0-100>,
-    "verdict": "<one sentence explaining the main gap>",
-    "risk_level": "<Low/Medium/High>",
-    "analysis": {{
-        "visual_physics": "<brief assessment>",
-        "tonal_dna": "<brief assessment>",
-        "hook_comparison": "<brief assessment>"
-    }},
-    "fatal_errors": ["<list any fatal errors found, empty array if none>"],
-    "fix_suggestions": ["<specific actionable suggestion 1>", "<suggestion 2>", "<suggestion 3>"],
-    "rewritten_hook": "<rewritten first 2-3 lines that match anchor's style>"
-}}"""
-
-    try:
-        response = model.generate_content(prompt)
-        result_text = response.text.strip()
-        
-        if result_text.startswith("```"):
-            result_text = result_text.split("```")[1]
-            if result_text.startswith("json"):
-                result_text = result_text[4:]
-        if result_text.endswith("```"):
-            result_text = result_text[:-3]
-        result_text = result_text.strip()
-        
-        return json.loads(result_text)
-        
-    except json.JSONDecodeError as e:
-        return {"error": f"Failed to parse AI response: {str(e)}", "raw": result_text}
-    except Exception as e:
-        return {"error": str(e)}
-
-
-def render_mobile_preview(text: str, char_limit: int = 150):
-    """Render a mobile-style preview with See More cutoff."""
-    lines = text.split('\n')
-    preview_lines = []
-    char_count = 0
-    line_count = 0
-    cut_off = False
-    
-    for line in lines:
-        if line_count >= 3 or char_count >= char_limit:
-            cut_off = True
+@st.cache_resource
+def get_scheduler():
+    """Process-wide worker pool every session's model calls go through."""
+    return scheduler_from_env()
+
+
+def session_id() -> str:
+    """Stable id of this browser session, for fair queueing."""
+    return st.session_state.setdefault('session_id', uuid.uuid4().hex)
+
+
+_WORKSPACE = re.compile(r'[0-9a-f]{32}')
+
+
+def workspace_id() -> str:
+    """Id scoping this user's score history and merged exports.
+
+    Kept in the URL as ?workspace=, so a reload or a bookmark returns to
+    the same workspace; a new visitor gets a fresh one.
+    """
+    if 'workspace' not in st.session_state:
+        # The id names a file on disk, so anything but our own format is replaced
+        requested = st.query_params.get('workspace') or ''
+        st.session_state['workspace'] = requested if _WORKSPACE.fullmatch(requested) else uuid.uuid4().hex
+    if st.query_params.get('workspace') != st.session_state['workspace']:
+        st.query_params['workspace'] = st.session_state['workspace']
+    return st.session_state['workspace']
+
+
+def workspace_dir(workspace: str) -> str:
+    """Directory holding one workspace's library and the models built from it."""
+    path = os.path.join(default_cache_dir(), 'workspaces', workspace)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+@st.cache_resource
+def get_context_cache() -> ContextCache:
+    """Process-wide Gemini context caches for anchor prompt prefixes."""
+    return ContextCache()
+
+
+@st.cache_resource
+def get_export_cache() -> ExportCache:
+    """Process-wide parsed-export cache, keyed by upload digest."""
+    return ExportCache(os.path.join(default_cache_dir(), 'exports'))
+
+
+@st.cache_resource(max_entries=64)
+def get_similarity_index(workspace: str):
+    """Vector index of a workspace's posts whose text we know, memory-mapped from disk."""
+    # numpy is only loaded once the index is first needed
+    from postpro.similarity import VectorIndex
+    index = VectorIndex.load(os.path.join(workspace_dir(workspace), 'similarity'))
+    index_library(workspace, index)
+    return index
+
+
+@st.cache_resource
+def get_history() -> HistoryStore:
+    """Process-wide analysis history with running totals, scoped per workspace."""
+    return HistoryStore(os.path.join(default_cache_dir(), 'history.sqlite'))
+
+
+@st.cache_resource(max_entries=64)
+def get_library(workspace: str) -> AnchorLibrary:
+    """Anchor library database of one workspace."""
+    return AnchorLibrary(os.path.join(workspace_dir(workspace), 'library.sqlite'))
+
+
+@st.cache_resource(max_entries=64)
+def get_predictor(workspace: str):
+    """Reach predictor trained on one workspace's library posts, persisted next to it."""
+    # numpy is only loaded once a draft needs a prediction
+    from postpro.predictor import ReachPredictor
+    path = os.path.join(workspace_dir(workspace), 'predictor.npz')
+    predictor = ReachPredictor.load(path)
+    if predictor.update(get_library(workspace).training_rows(since=predictor.synced)):
+        predictor.save(path)
+    return predictor
+
+
+def sync_predictor(workspace: str):
+    """Retrain the workspace's predictor on library posts added or updated since it last looked."""
+    predictor = get_predictor(workspace)
+    if predictor.update(get_library(workspace).training_rows(since=predictor.synced)):
+        predictor.save(os.path.join(workspace_dir(workspace), 'predictor.npz'))
+
+
+def reach_text(prediction: dict) -> str:
+    """'~1,200 impressions · ~35 engagements' for a prediction."""
+    return " · ".join(f"~{prediction[t]:,} {t}" for t in ('impressions', 'engagements') if prediction[t] is not None)
+
+
+@st.cache_resource(max_entries=64)
+def get_export_store(workspace: str) -> ExportStore:
+    """Store merging every export uploaded in one workspace."""
+    path = os.path.join(default_cache_dir(), 'workspaces')
+    os.makedirs(path, exist_ok=True)
+    return ExportStore(os.path.join(path, f'{workspace}.sqlite'))
+
+
+@st.cache_resource(max_entries=8)
+def get_merged_export(workspace: str, version: int):
+    """Merged view of a workspace's exports as of snapshot version, as a shared ColumnarExport."""
+    from postpro.columnar import compact
+    return compact(get_export_store(workspace).merged())
+
+
+@st.cache_resource(max_entries=8)
+def get_dashboard(digest: str, _parsed) -> dict:
+    """Derived Dashboard frames for an export, computed once per upload digest."""
+    from postpro.analytics import dashboard
+    return dashboard(_parsed)
+
+
+def index_post_text(workspace: str, post: dict, text: str):
+    """Add or refresh one top post in the workspace's similarity index."""
+    index = get_similarity_index(workspace)
+    meta = {'url': post['url'], 'engagements': post.get('engagements'), 'date': str(post.get('date', ''))}
+    if index.add([post['url']], [text], [meta]):
+        index.save(os.path.join(workspace_dir(workspace), 'similarity'))
+
+
+def index_library(workspace: str, index=None):
+    """Add or refresh every anchor of the workspace's library that has text in its similarity index."""
+    from postpro.similarity import text_digest
+    if index is None:
+        index = get_similarity_index(workspace)
+    changed, cursor = 0, None
+    while True:
+        anchors, cursor = get_library(workspace).page(after=cursor, limit=500, with_text_only=True)
+        changed += index.add(
+            [a['url'] or text_digest(a['text']) for a in anchors],
+            [a['text'] for a in anchors],
+            [{'url': a['url'], 'engagements': a['engagements'], 'date': str(a['published'] or '')} for a in anchors],
+        )
+        if cursor is None:
             break
-        preview_lines.append(line)
-        char_count += len(line)
-        line_count += 1
-    
-    preview_text = '\n'.join(preview_lines)
-    if cut_off:
-        preview_text += '...'
-    
-    return preview_text, cut_off
+    if changed:
+        index.save(os.path.join(workspace_dir(workspace), 'similarity'))
+
+
+def record_usage(*records):
+    """Add per-request token/cost records to this session's totals."""
+    totals = st.session_state.setdefault('usage', total_usage([]))
+    for name, value in total_usage(records).items():
+        totals[name] += value
+
+
+def format_usage(usage: dict) -> str:
+    cost = f" · ~${usage['cost_usd']:.4f}" if usage.get('cost_usd') is not None else ""
+    return f"{usage['input_tokens']:,} tokens in / {usage['output_tokens']:,} out{cost}"
+
+
+def use_as_anchor(text: str):
+    """Button callback: load a suggested post into the anchor box."""
+    st.session_state.anchor = text
+
+
+def use_as_draft(text: str):
+    """Button callback: load a variant into the draft box."""
+    st.session_state.draft = text
+
+
+def load_export(uploaded_file):
+    """Shared columnar export for an upload (or an error dict), parsing only the first time its bytes are seen."""
+    # Hash once per uploaded file; reruns reuse the digest from session state
+    file_id = getattr(uploaded_file, 'file_id', None) or uploaded_file.id
+    if st.session_state.get('export_file_id') != file_id:
+        st.session_state['export_file_id'] = file_id
+        st.session_state['export_digest'] = upload_digest(uploaded_file.getvalue())
+    digest = st.session_state['export_digest']
+    
+    cache = get_export_cache()
+    export = parsed = cache.get(digest)
+    if parsed is None:
+        with st.spinner("📈 Analyzing your data..."):
+            parsed = parse_linkedin_xlsx(BytesIO(uploaded_file.getvalue()))
+        if "error" in parsed:
+            return parsed
+        export = cache.set(digest, parsed)
+    if st.session_state.get('library_digest') != digest:
+        get_library(workspace_id()).import_export(parsed)
+        sync_predictor(workspace_id())
+        index_library(workspace_id())
+        st.session_state['export_delta'] = get_export_store(workspace_id()).import_export(digest, parsed)
+        st.session_state['library_digest'] = digest
+    return export
+
+
+def current_export():
+    """The export this session is viewing, looked up in the shared stores by its data_key handle."""
+    key = st.session_state.get('data_key')
+    if key is None:
+        return None
+    if key.startswith('merged-'):
+        _, workspace, version = key.split('-')
+        return get_merged_export(workspace, int(version))
+    return get_export_cache().get(key)
+
+
+@lru_cache(maxsize=64)
+def render_mobile_preview(text: str) -> dict:
+    """Where the feed folds text behind "...see more" on each device profile."""
+    return fold_all(text)
+
+
+def render_live_score(anchor: str, draft: str):
+    """Latest background score; stale while a newer version is being scored."""
+    worker = st.session_state.live_worker
+    latest = worker.latest()
+    if latest is None:
+        st.caption("⏳ Live score: waiting for you to pause...")
+        return
+    (scored_anchor, scored_draft, *_), result = latest
+    fresh = scored_anchor == anchor and scored_draft == draft
+    if "error" in result:
+        st.caption(f"⚡ Live score unavailable: {result['error']}")
+    else:
+        status = "" if fresh else " (updating...)"
+        st.caption(f"⚡ Live score: **{result.get('score', '?')}** · {result.get('risk_level', '?')} risk{status}")
+
+
+# Poll for background results without blocking the script, where supported
+if hasattr(st, 'fragment'):
+    render_live_score = st.fragment(run_every=1)(render_live_score)
 
 
 # ============== MAIN APP ==============
 
+HEADER_HTML = (
+    '<h1 class="main-header">🛡️ PostPro</h1>'
+    '<p class="sub-header">The Reputation Guardian - AI-Powered LinkedIn Post Optimizer</p>'
+    '<div class="custom-divider"></div>'
+)
+
 # Header
-st.markdown('<h1 class="main-header">🛡️ PostPro</h1>', unsafe_allow_html=True)
-st.markdown('<p class="sub-header">The Reputation Guardian - AI-Powered LinkedIn Post Optimizer</p>', unsafe_allow_html=True)
-st.markdown('<div class="custom-divider"></div>', unsafe_allow_html=True)
+st.markdown(HEADER_HTML, unsafe_allow_html=True)
 
 # Sidebar
 with st.sidebar:
     st.markdown("### ⚙️ Configuration")
     
-    api_key = st.text_input(
-        "🔑 Gemini API Key",
-        type="password",
-        help="Get your free API key from aistudio.google.com"
+    backend = st.selectbox(
+        "🤖 Model backend",
+        ["Gemini", "OpenAI-compatible", "Local (Ollama / llama.cpp)", "Mock (offline demo)"]
+    )
+    kind = {"Gemini": "gemini", "OpenAI-compatible": "openai",
+            "Local (Ollama / llama.cpp)": "ollama", "Mock (offline demo)": "mock"}[backend]
+    
+    api_key = ""
+    if kind == "gemini":
+        api_key = st.text_input(
+            "🔑 Gemini API Key",
+            type="password",
+            help="Get your free API key from aistudio.google.com"
+        )
+    elif kind == "openai":
+        api_key = st.text_input("🔑 API Key", type="password")
+    
+    provider = None
+    if kind != "mock":
+        defaults = {"gemini": ("gemini-2.5-flash", None, "gemini-2.5-pro"),
+                    "openai": ("gpt-4o-mini", "https://api.openai.com/v1", "gpt-4o"),
+                    "ollama": ("llama3.1", "http://localhost:11434/v1", "llama3.1:70b")}[kind]
+        with st.expander("Model settings", expanded=kind != "gemini"):
+            model_name = st.text_input("Model", value=defaults[0])
+            base_url = st.text_input("Base URL", value=defaults[1]) if defaults[1] else None
+            escalate = st.checkbox(
+                "🪜 Escalate uncertain results to a stronger model",
+                help="The fast model answers first; borderline or malformed answers are re-scored by the strong one"
+            )
+            strong_name = st.text_input("Strong model", value=defaults[2], disabled=not escalate)
+        if kind != "gemini" or model_name != defaults[0] or escalate:
+            provider = get_provider(kind, api_key, model_name, base_url,
+                                    escalate_to=strong_name if escalate else None)
+    else:
+        provider = get_provider("mock")
+    # Gemini needs a key; local and mock backends do not
+    can_call = bool(api_key) or (provider is not None and not provider.needs_key)
+    
+    cache_stats = get_analysis_cache().stats()
+    st.caption(
+        f"⚡ Cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+        f"({cache_stats['disk_entries']} saved)"
+    )
+    queue_stats = get_scheduler().stats()
+    if queue_stats['queued'] or queue_stats['running']:
+        st.caption(
+            f"🧵 Shared queue: {queue_stats['queued']} waiting · {queue_stats['running']} running · "
+            f"p95 wait {queue_stats['wait_p95_ms'] / 1000:.1f}s"
+        )
+    # Filled in at the end of the run, once this run's requests are counted
+    usage_slot = st.empty()
+    
+    gate_enabled = st.checkbox(
+        "🚦 Skip AI calls for drafts that fail local checks",
+        value=False,
+        help="Drafts with a cliche phrase or several bot-speak words are caught locally, without spending API quota"
     )
+    linter = default_linter() if gate_enabled else None
     
     st.markdown("---")
     
@@ -490,37 +378,70 @@ with st.sidebar:
     )
     
     if uploaded_file:
-        with st.spinner("📈 Analyzing your data..."):
-            parsed_data = parse_linkedin_xlsx(uploaded_file)
+        export = load_export(uploaded_file)
         
-        if "error" not in parsed_data:
+        if "error" not in export:
             st.success("✅ Data loaded!")
-            st.session_state['parsed_data'] = parsed_data
+            st.session_state['data_key'] = st.session_state['export_digest']
+            
+            delta = st.session_state.get('export_delta')
+            if delta and not delta['skipped']:
+                st.caption(
+                    f"🗂️ {delta['new_posts']} new posts, {delta['changed_posts']} updated, "
+                    f"{delta['changed_days']} days of trends merged"
+                )
+            if st.checkbox("🗂️ Combine with previous exports", value=False,
+                           help="Merges the exports uploaded in this workspace. Posts are matched "
+                                "by URL; the metrics of the newest export win"):
+                workspace = workspace_id()
+                version = get_export_store(workspace).version()
+                export = get_merged_export(workspace, version)
+                st.session_state['data_key'] = f"merged-{workspace}-{version}"
             
-            if parsed_data.get("demographics"):
+            demographics = export.records("demographics", 3) if "demographics" in export else []
+            if demographics:
                 st.markdown("#### 👥 Your Audience")
-                for demo in parsed_data["demographics"][:3]:
+                for demo in demographics:
                     pct = float(demo['Percentage']) * 100
                     st.markdown(f"• **{demo['Value']}**: {pct:.1f}%")
 
+# Sessions keep only the data_key handle; the export itself lives in the shared store
+export = current_export()
+
 # Main content with tabs
-tab1, tab2, tab3 = st.tabs(["🎯 Analyzer", "📈 Dashboard", "📚 Library"])
+tab_names = ["🎯 Analyzer", "📈 Dashboard", "📚 Library", "📦 Batch"]
+if tracer.active():
+    tab_names.append("⏱️ Performance")
+tab1, tab2, tab3, tab4, *perf_tab = st.tabs(tab_names)
 
 # TAB 1: Analyzer
-with tab1:
+with tab1, tracer.span('render.analyzer'):
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown("### 🏆 Anchor Post")
         st.markdown("*Your proven winner - the DNA template*")
         
-        if 'parsed_data' in st.session_state:
+        if export is not None:
             with st.expander("📈 Your Top Posts"):
-                data = st.session_state['parsed_data']
-                for i, post in enumerate(data['top_by_engagement'][:3], 1):
+                for i, post in enumerate(export.records('top_by_engagement', 3), 1):
                     eng = post.get('engagements', 'N/A')
                     st.markdown(f"**{i}.** [{eng} engagements]({post['url']})")
         
+        # Suggest anchors that read most like the current draft
+        current_draft = st.session_state.get('draft', '')
+        similar = get_similarity_index(workspace_id()) if current_draft else None
+        if similar is not None and len(similar):
+            with st.expander("🔎 Most similar proven posts"):
+                for hit in similar.search(current_draft, k=3):
+                    first_line = hit['text'].strip().split('\n', 1)[0][:80]
+                    st.markdown(
+                        f"**{hit['similarity']:.0%} match** · {hit.get('engagements') or 'N/A'} engagements  \n"
+                        f"*{first_line}*"
+                    )
+                    st.button("Use as anchor", key=f"use_{hit['id']}",
+                              on_click=use_as_anchor, args=(hit['text'],))
+        
         anchor_text = st.text_area(
             "Paste your best post",
             height=200,
@@ -541,18 +462,70 @@ with tab1:
         
         # Mobile preview
         if draft_text:
-            st.markdown("#### 📱 Mobile Preview")
-            preview, is_cut = render_mobile_preview(draft_text)
+            st.markdown("#### 📱 Feed Preview")
+            with tracer.span('render_mobile_preview', bytes=len(draft_text)):
+                folds = render_mobile_preview(draft_text)
+            device = st.radio("Device", list(DEVICES), horizontal=True, label_visibility="collapsed",
+                              format_func=lambda d: DEVICES[d]['label'], key="preview_device")
+            shown = folds[device]
+            preview = '<br>'.join(html.escape(line) for line in shown['lines'])
+            more = (f'<span style="color: #666; font-weight: 600;">{DEVICES[device]["more"]}</span>'
+                    if shown['cut'] else '')
             preview_html = f"""
-            <div style="background: #fff; color: #000; padding: 15px; border-radius: 10px; 
-                        font-size: 14px; line-height: 1.5; max-width: 300px; border: 2px solid #e2e8f0;">
-                {preview.replace(chr(10), '<br>')}
-                {'<span style="color: #0a66c2; font-weight: 600;">...see more</span>' if is_cut else ''}
+            <div style="background: #fff; color: #000; padding: 15px 0; border-radius: 10px; 
+                        font-size: {DEVICES[device]['font_size']}px; line-height: 1.43;
+                        width: {DEVICES[device]['width'] + 32}px; max-width: 100%; border: 2px solid #e2e8f0;">
+                <div style="padding: 0 16px;">{preview}{more}</div>
             </div>
             """
             st.markdown(preview_html, unsafe_allow_html=True)
-            if is_cut:
-                st.warning("⚠️ Hook cuts off before main message!")
+            # The hook is the opening line; it should be read in full before the fold
+            body = draft_text.lstrip()
+            hook_end = len(draft_text) - len(body) + len(body.split('\n', 1)[0].rstrip())
+            hook_cut = [f['label'] for f in folds.values() if f['cut'] and f['fold'] < hook_end]
+            if hook_cut:
+                st.warning(f"⚠️ Hook cuts off before the fold on {', '.join(hook_cut)}!")
+            st.caption("Fold: " + " · ".join(
+                f"{f['label']} {f['fold']} chars" if f['cut'] else f"{f['label']} shows all"
+                for f in folds.values()
+            ))
+            
+            # Instant local checks - no API call; only edited paragraphs are re-linted
+            if 'incremental_linter' not in st.session_state:
+                st.session_state.incremental_linter = IncrementalLinter()
+            lint_report = st.session_state.incremental_linter.lint(draft_text)
+            lint_metrics = lint_report['metrics']
+            st.caption(
+                f"📐 {lint_metrics['words']} words · {lint_metrics['paragraphs']} paragraphs · "
+                f"longest {lint_metrics['max_paragraph_lines']} lines · "
+                f"{lint_metrics['whitespace_ratio']:.0%} white space"
+            )
+            prediction = get_predictor(workspace_id()).predict(draft_text, lint_metrics)
+            if prediction:
+                st.caption(f"📈 Predicted reach: {reach_text(prediction)} "
+                           f"(learned from {prediction['posts']} of your posts)")
+            for issue in lint_report['issues']:
+                if issue['severity'] == 'hard':
+                    st.error(f"🚫 {issue['message']}")
+                else:
+                    st.warning(f"⚠️ {issue['message']}")
+            
+            live_enabled = st.checkbox(
+                "⚡ Live AI score while typing",
+                help="Scores in the background after you pause typing (uses API quota)"
+            )
+            if live_enabled and can_call and anchor_text:
+                if 'live_worker' not in st.session_state:
+                    # Resolved here: the background thread has no script context
+                    scheduler, cache, context_cache = get_scheduler(), get_analysis_cache(), get_context_cache()
+                    st.session_state.live_worker = DebouncedWorker(
+                        lambda anchor, draft, key, model, session, linter: scheduler.submit_analysis(
+                            anchor, draft, key, session, model=model, stream=False, cache=cache,
+                            context_cache=context_cache, linter=linter
+                        ).result()
+                    )
+                st.session_state.live_worker.submit(anchor_text, draft_text, api_key, provider, session_id(), linter)
+                render_live_score(anchor_text, draft_text)
 
     st.markdown('<div class="custom-divider"></div>', unsafe_allow_html=True)
     
@@ -562,131 +535,285 @@ with tab1:
         analyze_btn = st.button(
             "🚀 Run DNA Analysis",
             use_container_width=True,
-            disabled=not (api_key and anchor_text and draft_text)
+            disabled=not (can_call and anchor_text and draft_text)
         )
     
-    if not api_key:
-        st.info("👈 Enter your Gemini API key in the sidebar")
+    if not can_call:
+        st.info("👈 Enter your API key in the sidebar")
     
-    # Results
-    if analyze_btn and api_key and anchor_text and draft_text:
-        with st.spinner("🧠 Analyzing your DNA..."):
-            result = analyze_posts(anchor_text, draft_text, api_key)
-        
-        if "error" in result:
-            st.error(f"❌ {result['error']}")
-        else:
-            # Update stats
-            st.session_state.total_analyses += 1
-            st.session_state.analysis_history.append({
-                'score': result.get('score', 0),
-                'timestamp': datetime.now().isoformat()
-            })
-            scores = [h['score'] for h in st.session_state.analysis_history]
-            st.session_state.avg_score = sum(scores) / len(scores)
+    # Ensemble: score the draft against several of the top posts at once
+    top_posts = export.get('top_by_engagement', []) if export is not None else []
+    if top_posts:
+        with st.expander("🧬 Ensemble Analysis - score against your top posts"):
+            st.caption("The export only has post links - paste the text of each top post once and it is remembered.")
+            anchor_texts = st.session_state.setdefault('anchor_texts', {})
+            k = st.slider("Anchors (K)", 1, min(5, len(top_posts)), min(3, len(top_posts)))
             
+            ensemble_posts = top_posts[:k]
+            saved_texts = get_library(workspace_id()).texts_by_url(p['url'] for p in ensemble_posts)
+            for i, post in enumerate(ensemble_posts, 1):
+                previous = anchor_texts.get(post['url'], saved_texts.get(post['url'], ''))
+                anchor_texts[post['url']] = st.text_area(
+                    f"#{i} · {post.get('engagements', 'N/A')} engagements",
+                    value=previous,
+                    height=100,
+                    key=f"ensemble_anchor_{post['url']}"
+                )
+                text = anchor_texts[post['url']].strip()
+                if text:
+                    index_post_text(workspace_id(), post, text)
+                    if text != saved_texts.get(post['url']):
+                        get_library(workspace_id()).save_anchor(text, url=post['url'])
+                        sync_predictor(workspace_id())
+            
+            ready = [p for p in ensemble_posts if anchor_texts.get(p['url'], '').strip()]
+            ensemble_btn = st.button(
+                f"🧬 Run Ensemble Analysis ({len(ready)} anchors)",
+                disabled=not (can_call and draft_text and ready)
+            )
+            
+            if ensemble_btn and can_call and draft_text and ready:
+                with st.spinner(f"🧠 Scoring against {len(ready)} anchors in parallel..."):
+                    ensemble = score_ensemble(
+                        draft_text,
+                        [anchor_texts[p['url']] for p in ready],
+                        api_key,
+                        weights=[float(p.get('engagements') or 1) for p in ready],
+                        cache=get_analysis_cache(),
+                        model=provider,
+                        context_cache=get_context_cache(),
+                        linter=linter,
+                        scheduler=get_scheduler(),
+                        session=session_id()
+                    )
+                
+                if "error" in ensemble:
+                    st.error(f"❌ {ensemble['error']}")
+                else:
+                    e1, e2, e3 = st.columns(3)
+                    e1.metric("Ensemble Score", ensemble['score'], help="Engagement-weighted mean")
+                    e2.metric("Spread (σ)", ensemble['stdev'])
+                    e3.metric("Range", f"{ensemble['min']:.0f}–{ensemble['max']:.0f}")
+                    st.markdown(f"**Weakest match:** {ensemble['verdict']}")
+                    record_usage(*(r.get('usage') for r in ensemble['anchors']))
+                    st.caption(f"🧮 {format_usage(ensemble['usage'])}")
+                    import pandas as pd
+                    st.dataframe(
+                        pd.DataFrame([
+                            {'Anchor': i, 'Score': r.get('score'), 'Verdict': r.get('verdict') or r.get('error', '')}
+                            for i, r in enumerate(ensemble['anchors'], 1)
+                        ]),
+                        use_container_width=True,
+                        hide_index=True
+                    )
+    
+    # Variants: rewrite the draft several ways, score locally, send only the best to the model
+    if anchor_text and draft_text:
+        with st.expander("🧪 Variants - find a stronger version of this draft"):
+            st.caption("Hooks and layouts are rewritten locally and pre-scored for free; "
+                       "only the most promising variants are sent to the model.")
+            n_variants = st.slider("Variants to generate", 8, 128, 32, step=8)
+            suggested_draft, suggested_hook = st.session_state.get('suggested_hook', ('', ''))
+            variant_anchors = [anchor_text] + [
+                t for t in st.session_state.get('anchor_texts', {}).values() if t.strip() and t != anchor_text
+            ]
+            variants_btn = st.button(
+                f"🧪 Generate and score variants ({len(variant_anchors)} anchors)",
+                disabled=not can_call
+            )
+            if variants_btn and can_call:
+                with st.spinner(f"🧠 Scoring the best of {n_variants} variants..."):
+                    st.session_state['variant_result'] = optimize(
+                        draft_text,
+                        variant_anchors,
+                        api_key,
+                        n=n_variants,
+                        suggested_hooks=[suggested_hook] if suggested_draft == draft_text else [],
+                        cache=get_analysis_cache(),
+                        model=provider,
+                        context_cache=get_context_cache(),
+                        scheduler=get_scheduler(),
+                        session=session_id()
+                    )
+            
+            optimized = st.session_state.get('variant_result')
+            if optimized and "error" in optimized:
+                st.error(f"❌ {optimized['error']}")
+            elif optimized:
+                if variants_btn:
+                    record_usage(optimized['usage'])
+                st.caption(
+                    f"{len(optimized['variants'])} variants · {optimized['llm_calls']} model calls "
+                    f"over {optimized['rounds']} round(s) · 🧮 {format_usage(optimized['usage'])}"
+                )
+                for i, variant in enumerate(optimized['best']):
+                    label = "Original" if variant.get('original') else ", ".join(
+                        [variant['hook'].replace('_', ' ')] + [e.replace('_', ' ') for e in variant['edits']]
+                    )
+                    st.markdown(
+                        f"**{variant['score']:.0f}** AI · {variant['local']:.0f} local · "
+                        f"{variant['change']:.0%} changed — *{label}*"
+                    )
+                    st.code(variant['text'], language=None)
+                    if not variant.get('original'):
+                        st.button("Use this draft", key=f"use_variant_{i}",
+                                  on_click=use_as_draft, args=(variant['text'],))
+    
+    # Results - fields render as soon as they stream in
+    if analyze_btn and can_call and anchor_text and draft_text:
+        results_area = st.empty()
+        result = {}
+        with results_area.container():
             st.markdown('<div class="custom-divider"></div>', unsafe_allow_html=True)
             st.markdown("## 📊 Analysis Results")
             
             # Score and Risk
             res_col1, res_col2, res_col3 = st.columns(3)
-            
-            with res_col1:
-                score = result.get('score', 0)
-                score_class = 'high' if score >= 70 else 'medium' if score >= 40 else 'low'
-                st.markdown(f"""
-                <div class="score-container score-{score_class}">
-                    <div class="score-number {score_class}">{score}</div>
-                    <div style="color: #a0aec0; font-size: 1.2rem;">Humanity Score</div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            with res_col2:
-                risk = result.get('risk_level', 'Unknown')
-                risk_class = risk.lower()
-                st.markdown(f"""
-                <div class="metric-card" style="text-align: center; padding-top: 40px;">
-                    <div class="risk-badge risk-{risk_class}">{risk} Risk</div>
-                    <div style="color: #a0aec0; margin-top: 20px;">Reputation Risk Level</div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            with res_col3:
-                st.markdown(f"""
-                <div class="metric-card">
-                    <div style="color: #667eea; font-weight: 600; margin-bottom: 10px;">📋 Verdict</div>
-                    <div style="color: #e2e8f0; font-size: 1rem; line-height: 1.6;">
-                        {result.get('verdict', 'No verdict available')}
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
+            score_slot = res_col1.empty()
+            risk_slot = res_col2.empty()
+            verdict_slot = res_col3.empty()
             
             st.markdown("<br>", unsafe_allow_html=True)
             
             # Detailed analysis
             detail_col1, detail_col2 = st.columns(2)
-            
             with detail_col1:
                 st.markdown("### 🔬 Analysis Breakdown")
-                analysis = result.get('analysis', {})
-                
-                st.markdown(f"""
-                <div class="analysis-card">
-                    <strong style="color: #667eea;">📐 Visual Physics</strong><br>
-                    <span style="color: #e2e8f0;">{analysis.get('visual_physics', 'N/A')}</span>
-                </div>
-                <div class="analysis-card">
-                    <strong style="color: #667eea;">🎭 Tonal DNA</strong><br>
-                    <span style="color: #e2e8f0;">{analysis.get('tonal_dna', 'N/A')}</span>
-                </div>
-                <div class="analysis-card">
-                    <strong style="color: #667eea;">🎣 Hook Comparison</strong><br>
-                    <span style="color: #e2e8f0;">{analysis.get('hook_comparison', 'N/A')}</span>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                fatal_errors = result.get('fatal_errors', [])
-                if fatal_errors and fatal_errors[0]:
-                    st.markdown("### ⚠️ Fatal Errors")
-                    for error in fatal_errors:
-                        st.error(error)
-            
+                analysis_slot = st.empty()
+                fatal_slot = st.empty()
             with detail_col2:
                 st.markdown("### 💡 Recommendations")
-                suggestions = result.get('fix_suggestions', [])
-                for i, suggestion in enumerate(suggestions, 1):
-                    st.markdown(f"""
-                    <div class="suggestion-item">
-                        <strong>{i}.</strong> {suggestion}
-                    </div>
-                    """, unsafe_allow_html=True)
-                
+                suggestions_slot = st.empty()
                 st.markdown("### ✨ Suggested Hook Rewrite")
-                rewritten = result.get('rewritten_hook', '')
-                if rewritten:
-                    st.markdown(f"""
-                    <div class="hook-rewrite">
-                        {rewritten}
-                    </div>
-                    """, unsafe_allow_html=True)
+                hook_slot = st.empty()
+            
+            rendered = set()
+            job = get_scheduler().submit_analysis(anchor_text, draft_text, api_key, session_id(),
+                                                  model=provider, cache=get_analysis_cache(),
+                                                  context_cache=get_context_cache(), linter=linter)
+            ahead = get_scheduler().position(job)
+            with st.spinner(f"⏳ Queued behind {ahead} requests..." if ahead else "🧠 Analyzing your DNA..."):
+                for result in job.stream():
+                    if "error" in result:
+                        break
+                    
+                    if 'score' in result and 'score' not in rendered:
+                        rendered.add('score')
+                        score = result.get('score', 0)
+                        score_class = score_band(score)
+                        prediction = get_predictor(workspace_id()).predict(draft_text)
+                        reach = (f'<div style="color: #a0aec0; margin-top: 8px;">📈 {reach_text(prediction)} predicted</div>'
+                                 if prediction else '')
+                        score_slot.markdown(f"""
+                        <div class="score-container score-{score_class}">
+                            <div class="score-number {score_class}">{score}</div>
+                            <div style="color: #a0aec0; font-size: 1.2rem;">Humanity Score</div>
+                            {reach}
+                        </div>
+                        """, unsafe_allow_html=True)
+                    
+                    if 'risk_level' in result and 'risk_level' not in rendered:
+                        rendered.add('risk_level')
+                        risk = result.get('risk_level', 'Unknown')
+                        risk_class = risk.lower()
+                        risk_slot.markdown(f"""
+                        <div class="metric-card" style="text-align: center; padding-top: 40px;">
+                            <div class="risk-badge risk-{risk_class}">{risk} Risk</div>
+                            <div style="color: #a0aec0; margin-top: 20px;">Reputation Risk Level</div>
+                        </div>
+                        """, unsafe_allow_html=True)
+                    
+                    if 'verdict' in result and 'verdict' not in rendered:
+                        rendered.add('verdict')
+                        verdict_slot.markdown(f"""
+                        <div class="metric-card">
+                            <div style="color: #667eea; font-weight: 600; margin-bottom: 10px;">📋 Verdict</div>
+                            <div style="color: #e2e8f0; font-size: 1rem; line-height: 1.6;">
+                                {result.get('verdict', 'No verdict available')}
+                            </div>
+                        </div>
+                        """, unsafe_allow_html=True)
+                    
+                    if 'analysis' in result and 'analysis' not in rendered:
+                        rendered.add('analysis')
+                        analysis = result.get('analysis', {})
+                        analysis_slot.markdown(f"""
+                        <div class="analysis-card">
+                            <strong style="color: #667eea;">📐 Visual Physics</strong><br>
+                            <span style="color: #e2e8f0;">{analysis.get('visual_physics', 'N/A')}</span>
+                        </div>
+                        <div class="analysis-card">
+                            <strong style="color: #667eea;">🎭 Tonal DNA</strong><br>
+                            <span style="color: #e2e8f0;">{analysis.get('tonal_dna', 'N/A')}</span>
+                        </div>
+                        <div class="analysis-card">
+                            <strong style="color: #667eea;">🎣 Hook Comparison</strong><br>
+                            <span style="color: #e2e8f0;">{analysis.get('hook_comparison', 'N/A')}</span>
+                        </div>
+                        """, unsafe_allow_html=True)
+                    
+                    if 'fatal_errors' in result and 'fatal_errors' not in rendered:
+                        rendered.add('fatal_errors')
+                        fatal_errors = result.get('fatal_errors', [])
+                        if fatal_errors and fatal_errors[0]:
+                            with fatal_slot.container():
+                                st.markdown("### ⚠️ Fatal Errors")
+                                for error in fatal_errors:
+                                    st.error(error)
+                    
+                    if 'fix_suggestions' in result and 'fix_suggestions' not in rendered:
+                        rendered.add('fix_suggestions')
+                        suggestions = result.get('fix_suggestions', [])
+                        suggestions_slot.markdown("".join(f"""
+                        <div class="suggestion-item">
+                            <strong>{i}.</strong> {suggestion}
+                        </div>
+                        """ for i, suggestion in enumerate(suggestions, 1)), unsafe_allow_html=True)
+                    
+                    if 'rewritten_hook' in result and 'rewritten_hook' not in rendered:
+                        rendered.add('rewritten_hook')
+                        rewritten = result.get('rewritten_hook', '')
+                        if rewritten:
+                            hook_slot.markdown(f"""
+                            <div class="hook-rewrite">
+                                {rewritten}
+                            </div>
+                            """, unsafe_allow_html=True)
+        
+        if "error" in result:
+            results_area.empty()
+            st.error(f"❌ {result['error']}")
+        else:
+            # Update stats
+            get_history().append(result.get('score', 0), owner=workspace_id())
+            st.session_state['suggested_hook'] = (draft_text, result.get('rewritten_hook', ''))
+            if result.get('usage'):
+                record_usage(result['usage'])
+                st.caption(f"🧮 {format_usage(result['usage'])}")
+            
+            saved_anchor = get_library(workspace_id()).find_by_text(anchor_text)
+            if saved_anchor:
+                get_library(workspace_id()).record_analysis(saved_anchor['id'], draft_text, result)
 
 # TAB 2: Dashboard
-with tab2:
+with tab2, tracer.span('render.dashboard'):
     st.markdown("### 📈 Performance Dashboard")
     
+    summary = get_history().summary(owner=workspace_id())
+    
     # Metrics row
     m1, m2, m3, m4 = st.columns(4)
     
     with m1:
         st.markdown(f"""
         <div class="metric-card">
-            <div class="metric-value">{st.session_state.total_analyses}</div>
+            <div class="metric-value">{summary['count']}</div>
             <div class="metric-label">Total Analyses</div>
         </div>
         """, unsafe_allow_html=True)
     
     with m2:
-        avg = round(st.session_state.avg_score, 1)
+        avg = round(summary['mean'], 1)
         st.markdown(f"""
         <div class="metric-card">
             <div class="metric-value">{avg}</div>
@@ -695,7 +822,7 @@ with tab2:
         """, unsafe_allow_html=True)
     
     with m3:
-        high_scores = len([h for h in st.session_state.analysis_history if h['score'] >= 70])
+        high_scores = summary['high']
         st.markdown(f"""
         <div class="metric-card">
             <div class="metric-value">{high_scores}</div>
@@ -704,8 +831,8 @@ with tab2:
         """, unsafe_allow_html=True)
     
     with m4:
-        if 'parsed_data' in st.session_state:
-            top_eng = st.session_state['parsed_data']['top_by_engagement']
+        if export is not None:
+            top_eng = export.records('top_by_engagement', 1)
             if top_eng:
                 best = top_eng[0].get('engagements', 0)
             else:
@@ -722,47 +849,244 @@ with tab2:
     st.markdown("<br>", unsafe_allow_html=True)
     
     # Score history chart
-    if st.session_state.analysis_history:
+    recent = get_history().tail(owner=workspace_id())
+    if recent:
+        week = get_history().window(7, owner=workspace_id())
         st.markdown("### 📊 Score History")
-        history_df = pd.DataFrame(st.session_state.analysis_history)
-        history_df['index'] = range(1, len(history_df) + 1)
+        st.caption(
+            f"Last 7 days: {week['count']} analyses · avg {week['mean']:.1f} · "
+            f"{week['high']} high / {week['medium']} medium / {week['low']} low"
+        )
+        import pandas as pd
+        history_df = pd.DataFrame(recent)
+        history_df['index'] = range(summary['count'] - len(history_df) + 1, summary['count'] + 1)
         st.line_chart(history_df.set_index('index')['score'])
     
     # LinkedIn trends
-    if 'parsed_data' in st.session_state and st.session_state['parsed_data'].get('trends'):
-        st.markdown("### 📈 LinkedIn Engagement Trends")
-        trends = st.session_state['parsed_data']['trends']
-        if trends:
-            trend_df = pd.DataFrame(trends)
-            if 'Date' in trend_df.columns and 'Impressions' in trend_df.columns:
-                trend_df['Date'] = pd.to_datetime(trend_df['Date'])
-                st.line_chart(trend_df.set_index('Date')['Impressions'])
+    if export is not None:
+        frames = get_dashboard(st.session_state['data_key'], export)
+        
+        if 'rolling' in frames:
+            st.markdown("### 📈 LinkedIn Engagement Trends")
+            trend = frames['rolling']
+            st.line_chart(trend[['Impressions', 'Impressions 7d', 'Impressions 28d']])
+            
+            st.markdown("#### 💬 Engagement Rate")
+            st.line_chart(trend[['Rate 7d', 'Rate 28d']] * 100)
+            
+            st.markdown("#### 📅 Average Impressions by Weekday and Month")
+            st.dataframe(frames['heatmap'].assign(All=frames['weekday']).round(0), use_container_width=True)
+        
+        posts = frames['posts']
+        if not posts.empty:
+            import pandas as pd
+            st.markdown("### 🏅 Post Percentiles")
+            st.dataframe(
+                pd.DataFrame({
+                    'Post': posts['url'],
+                    'Published': posts['date'].dt.date,
+                    'Engagements': posts['engagements'],
+                    'Impressions': posts['impressions'],
+                    'Rate %': (posts['rate'] * 100).round(2),
+                    'Engagement pctl': posts['engagements_pct'].round(0),
+                    'Rate pctl': posts['rate_pct'].round(0),
+                }),
+                column_config={'Post': st.column_config.LinkColumn('Post')},
+                hide_index=True,
+                use_container_width=True
+            )
 
 # TAB 3: Library
-with tab3:
+with tab3, tracer.span('render.library'):
     st.markdown("### 📚 Anchor Library")
     st.markdown("*Save your best posts as templates for future analysis*")
     
-    st.info("🚧 Coming in V2.1: Save and manage your anchor posts in a local database!")
-    
-    if 'parsed_data' in st.session_state:
+    library = get_library(workspace_id())
+    
+    with st.expander("➕ Save an anchor post"):
+        with st.form("save_anchor", clear_on_submit=True):
+            new_text = st.text_area("Post text", height=150)
+            new_url = st.text_input("Post URL (optional)", help="Links the text to the post's metrics from your export")
+            new_tags = st.text_input("Tags", placeholder="hiring, storytelling")
+            if st.form_submit_button("💾 Save to Library") and new_text.strip():
+                library.save_anchor(new_text, url=new_url.strip() or None, tags=new_tags)
+                index_library(workspace_id())
+                st.success("✅ Saved!")
+    
+    query = st.text_input("🔍 Search anchors", placeholder="Words from the post or its tags")
+    # Keyset pagination: a stack of cursors, one per page visited
+    if st.session_state.get('library_query') != query:
+        st.session_state['library_query'] = query
+        st.session_state['library_cursors'] = [None]
+    cursors = st.session_state['library_cursors']
+    anchors, next_cursor = library.page(after=cursors[-1], limit=10, query=query)
+    
+    st.caption(f"{library.count()} anchors saved · page {len(cursors)}")
+    for anchor in anchors:
+        title = anchor['text'].strip().split('\n', 1)[0][:80] or anchor['url']
+        metrics = f"{anchor['engagements'] if anchor['engagements'] is not None else 'N/A'} engagements"
+        with st.expander(f"{title} · {metrics}"):
+            if anchor['url']:
+                st.markdown(f"[View on LinkedIn]({anchor['url']})")
+            if anchor['tags']:
+                st.caption(f"🏷️ {anchor['tags']}")
+            if anchor['text']:
+                st.text(anchor['text'])
+                st.button("Use as anchor", key=f"library_use_{anchor['id']}",
+                          on_click=use_as_anchor, args=(anchor['text'],))
+            else:
+                st.caption("No text saved yet - paste it in the Ensemble Analysis panel or save it above.")
+            if anchor['analyses']:
+                st.markdown("**Past analyses**")
+                import pandas as pd
+                st.dataframe(pd.DataFrame([
+                    {'Score': a['score'], 'Risk': a['risk_level'], 'Verdict': a['verdict'],
+                     'When': datetime.fromtimestamp(a['created']).strftime('%Y-%m-%d %H:%M')}
+                    for a in library.analyses(anchor['id'])
+                ]), hide_index=True)
+    
+    prev_col, next_col = st.columns(2)
+    prev_col.button("⬅️ Previous", disabled=len(cursors) == 1, on_click=cursors.pop)
+    next_col.button("Next ➡️", disabled=next_cursor is None, on_click=cursors.append, args=(next_cursor,))
+    
+    if export is not None:
         st.markdown("### 🏆 Your Top Performing Posts")
-        data = st.session_state['parsed_data']
         
         col1, col2 = st.columns(2)
         
         with col1:
             st.markdown("#### By Engagement")
-            for i, post in enumerate(data['top_by_engagement'][:5], 1):
+            for i, post in enumerate(export.records('top_by_engagement', 5), 1):
                 eng = post.get('engagements', 'N/A')
                 st.markdown(f"**{i}.** [{eng} engagements]({post['url']})")
         
         with col2:
             st.markdown("#### By Impressions")
-            for i, post in enumerate(data['top_by_impressions'][:5], 1):
+            for i, post in enumerate(export.records('top_by_impressions', 5), 1):
                 imp = post.get('impressions', 'N/A')
                 st.markdown(f"**{i}.** [{imp:,} impressions]({post['url']})")
 
+# TAB 4: Batch
+with tab4, tracer.span('render.batch'):
+    st.markdown("### 📦 Batch Scoring")
+    st.markdown("*Score a week's worth of drafts against the anchor from the Analyzer tab*")
+    
+    batch_text = st.text_area(
+        "Paste drafts (separate drafts with a line containing only ---)",
+        height=200,
+        key="batch_drafts"
+    )
+    batch_file = st.file_uploader(
+        "...or upload drafts (CSV with a 'draft' column, or JSONL)",
+        type=['csv', 'jsonl'],
+        key="batch_file"
+    )
+    
+    drafts = split_drafts(batch_text) if batch_text else []
+    if batch_file:
+        drafts += load_drafts(batch_file.name, batch_file.getvalue())
+    
+    if drafts:
+        st.caption(f"{len(drafts)} drafts ready")
+    if not anchor_text:
+        st.info("🏆 Paste an anchor post in the Analyzer tab first")
+    
+    batch_btn = st.button(
+        "🚀 Score All Drafts",
+        disabled=not (can_call and anchor_text and drafts)
+    )
+    
+    leaderboard = st.empty()
+    
+    if batch_btn and can_call and anchor_text and drafts:
+        import pandas as pd
+        rows = []
+        progress = st.progress(0.0)
+        # Queued on the shared scheduler: other sessions keep their turn while this runs.
+        # Repeated drafts coalesce into one job, so a job can stand for several rows.
+        rows_of = {}
+        for i, draft in enumerate(drafts):
+            job = get_scheduler().submit_analysis(anchor_text, draft, api_key, session_id(), model=provider,
+                                                  stream=False, cache=get_analysis_cache(),
+                                                  context_cache=get_context_cache(), linter=linter)
+            rows_of.setdefault(job, []).append(i)
+        for job in as_completed(rows_of):
+            result = job.result()
+            record_usage(result.get('usage'))
+            for i in rows_of[job]:
+                first_line = drafts[i].split('\n', 1)[0]
+                rows.append({
+                    'Draft': i + 1,
+                    'Score': result.get('score'),
+                    'Risk': result.get('risk_level', ''),
+                    'Hook': first_line[:80],
+                    'Verdict': result.get('verdict') or result.get('error', ''),
+                })
+            progress.progress(len(rows) / len(drafts))
+            leaderboard.dataframe(
+                pd.DataFrame(rows).sort_values('Score', ascending=False, na_position='last'),
+                use_container_width=True,
+                hide_index=True
+            )
+        st.session_state['batch_results'] = rows
+    elif st.session_state.get('batch_results'):
+        import pandas as pd
+        leaderboard.dataframe(
+            pd.DataFrame(st.session_state['batch_results']).sort_values('Score', ascending=False, na_position='last'),
+            use_container_width=True,
+            hide_index=True
+        )
+
+# TAB 5: Performance (only with tracing on)
+if perf_tab:
+    with perf_tab[0]:
+        st.markdown("### ⏱️ Performance")
+        st.markdown("*Wall and CPU time per traced span, from this process's recent history*")
+        import numpy as np
+        import pandas as pd
+        
+        queue_stats = get_scheduler().stats()
+        st.markdown("#### 🧵 Scheduler")
+        q1, q2, q3, q4 = st.columns(4)
+        q1.metric("Queued", queue_stats['queued'])
+        q2.metric("Running", f"{queue_stats['running']} / {queue_stats['workers']}")
+        q3.metric("Wait p50 / p95", f"{queue_stats['wait_p50_ms']:.0f} / {queue_stats['wait_p95_ms']:.0f} ms")
+        q4.metric("Coalesced", f"{queue_stats['coalesced']} / {queue_stats['submitted']}")
+        if queue_stats['keys']:
+            st.dataframe(
+                pd.DataFrame([dict(key=label, **counts) for label, counts in queue_stats['keys'].items()]),
+                hide_index=True,
+                use_container_width=True
+            )
+        
+        st.markdown("#### ⏱️ Spans")
+        spans = tracer.summary()
+        if not spans:
+            st.info("No spans recorded yet - use the other tabs and come back")
+        else:
+            st.dataframe(
+                pd.DataFrame(spans).rename(columns={
+                    'span': 'Span', 'count': 'Count', 'p50_ms': 'p50 ms', 'p95_ms': 'p95 ms',
+                    'p99_ms': 'p99 ms', 'cpu_ms': 'CPU ms (mean)',
+                }).round(2),
+                hide_index=True,
+                use_container_width=True
+            )
+            span_name = st.selectbox("Histogram", [row['span'] for row in spans])
+            durations = tracer.durations(span_name)
+            counts, edges = np.histogram(durations, bins=min(30, max(len(durations), 1)))
+            st.bar_chart(pd.Series(counts, index=[f"{edge:.1f}" for edge in edges[:-1]], name='Spans'))
+            if tracer.exporter is not None:
+                st.caption(f"Exporting OTLP/JSON to {tracer.exporter.path or tracer.exporter.endpoint}"
+                           + (f" · {tracer.exporter.dropped} spans dropped" if tracer.exporter.dropped else ""))
+            if st.button("Clear spans"):
+                tracer.clear()
+                st.rerun()
+
+usage_totals = st.session_state.get('usage')
+if usage_totals and usage_totals['requests']:
+    usage_slot.caption(f"🧮 This session: {usage_totals['requests']} requests · {format_usage(usage_totals)}")
+
 # Footer
 st.markdown("""
 <div class="footer">
@@ -0,0 +1,33 @@
+"""
+Dashboard recomputation time for the analytics engine.
+
+    python -m benchmarks.bench_analytics [years] [n_posts]   (default: 5 50)
+"""
+
+import statistics
+import sys
+import time
+
+from benchmarks.synthetic import make_export
+from postpro.analytics import dashboard
+from postpro.ingest import parse_linkedin_xlsx
+
+
+def main(argv):
+    years = int(argv[0]) if argv else 5
+    n_posts = int(argv[1]) if len(argv) > 1 else 50
+    n_days = years * 365
+    parsed = parse_linkedin_xlsx(make_export(n_posts, n_days=n_days))
+    dashboard(parsed)
+
+    times = []
+    for _ in range(20):
+        start = time.perf_counter()
+        dashboard(parsed)
+        times.append((time.perf_counter() - start) * 1000)
+    print(f"{n_days} days, {n_posts} posts: p50 {statistics.median(times):.1f} ms, "
+          f"max {max(times):.1f} ms")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,67 @@
+"""
+Compare streaming ingestion with the original pandas double-parse.
+
+    python -m benchmarks.bench_ingest [rows ...]   (default: 10000 100000)
+"""
+
+import sys
+import time
+from io import BytesIO
+
+import pandas as pd
+
+from benchmarks.synthetic import make_export
+from postpro.ingest import parse_linkedin_xlsx
+
+
+def legacy_parse(uploaded_file) -> dict:
+    """parse_linkedin_xlsx as it shipped in V2.0."""
+    xlsx = pd.ExcelFile(BytesIO(uploaded_file.read()))
+    df = pd.read_excel(xlsx, sheet_name='TOP POSTS', header=None)
+    header_row = None
+    for idx, row in df.iterrows():
+        if 'Post URL' in row.values:
+            header_row = idx
+            break
+    engagement_df = df.iloc[header_row+1:, 0:3].copy()
+    engagement_df.columns = ['url', 'date', 'engagements']
+    engagement_df = engagement_df.dropna(subset=['url'])
+    engagement_df = engagement_df[engagement_df['url'].str.contains('linkedin.com', na=False)]
+    impressions_df = df.iloc[header_row+1:, 4:7].copy()
+    impressions_df.columns = ['url', 'date', 'impressions']
+    impressions_df = impressions_df.dropna(subset=['url'])
+    impressions_df = impressions_df[impressions_df['url'].str.contains('linkedin.com', na=False)]
+    demo_df = pd.read_excel(xlsx, sheet_name='DEMOGRAPHICS')
+    top_titles = demo_df[demo_df['Top Demographics'] == 'Job titles'].head(5)
+    trend_df = pd.read_excel(xlsx, sheet_name='ENGAGEMENT')
+    return {
+        "top_by_engagement": engagement_df.head(10).to_dict('records'),
+        "top_by_impressions": impressions_df.head(10).to_dict('records'),
+        "demographics": top_titles[['Value', 'Percentage']].to_dict('records'),
+        "trends": trend_df.to_dict('records'),
+    }
+
+
+def best_of(fn, data: bytes, repeat: int = 3) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(BytesIO(data))
+        best = min(best, time.perf_counter() - start)
+        assert 'error' not in result, result.get('error')
+    return best
+
+
+def main(argv):
+    sizes = [int(arg) for arg in argv] or [10_000, 100_000]
+    print(f"{'rows':>8} {'legacy (s)':>12} {'streaming (s)':>14} {'speedup':>8}")
+    for n in sizes:
+        data = make_export(n)
+        repeat = 3 if n <= 100_000 else 1
+        legacy = best_of(legacy_parse, data, repeat)
+        streaming = best_of(parse_linkedin_xlsx, data, repeat)
+        print(f"{n:>8} {legacy:>12.3f} {streaming:>14.3f} {legacy / streaming:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
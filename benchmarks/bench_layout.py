@@ -0,0 +1,78 @@
+"""
+Fold simulator: per-draft latency and how often the old heuristic's warning was wrong.
+
+Every draft is laid out for all device profiles, as the Analyzer does on
+each keystroke. The old preview cut after 3 lines or 150 characters and
+warned whenever it cut; the simulator only warns when the opening line
+itself runs past the fold.
+
+    python -m benchmarks.bench_layout [n_drafts]   (default: 2000)
+"""
+
+import random
+import statistics
+import sys
+import time
+
+from benchmarks.bench_lint import make_drafts
+from postpro.layout import DEVICES, GlyphMetrics, fold
+
+HOOKS = ('I almost shut the company down.', 'Nobody tells you this about hiring 👇',
+         'We lost our biggest customer on a Tuesday. Here is what happened next, and what I would do differently.',
+         '3 lessons from 10 years as a founder 🚀🚀🚀', 'Stop. Read this before your next board meeting.',
+         'Our café in Zürich taught me more about leadership than any MBA — here is the story, in full.')
+
+
+def legacy_cut(text: str, char_limit: int = 150) -> bool:
+    """render_mobile_preview's cut-off test before the layout engine."""
+    char_count = line_count = 0
+    for line in text.split('\n'):
+        if line_count >= 3 or char_count >= char_limit:
+            return True
+        char_count += len(line)
+        line_count += 1
+    return False
+
+
+def make_posts(n: int, seed: int = 0) -> list:
+    """Lint-benchmark drafts, half of them opening with a short feed-style hook."""
+    rng = random.Random(seed)
+    drafts = make_drafts(n, seed)
+    return [rng.choice(HOOKS) + '\n\n' + d if i % 2 else d for i, d in enumerate(drafts)]
+
+
+def main(argv):
+    n = int(argv[0]) if argv else 2000
+    posts = make_posts(n)
+
+    start = time.perf_counter()
+    metrics = GlyphMetrics()
+    for device in DEVICES:
+        fold(posts[0], device, metrics)
+    print(f"font load + first draft: {(time.perf_counter() - start) * 1000:.1f} ms "
+          f"({len(metrics._advances)} glyphs measured)")
+
+    times = []
+    legacy_warnings = hook_warnings = 0
+    for post in posts:
+        t = time.perf_counter()
+        folds = [fold(post, device, metrics) for device in DEVICES]
+        times.append((time.perf_counter() - t) * 1000)
+        hook_end = len(post.split('\n', 1)[0])
+        legacy_warnings += legacy_cut(post)
+        hook_warnings += any(f['cut'] and f['fold'] < hook_end for f in folds)
+    times.sort()
+    print(f"{n} drafts x {len(DEVICES)} devices: p50 {statistics.median(times):.3f} ms, "
+          f"p99 {times[int(len(times) * 0.99)]:.3f} ms per draft")
+    print(f"'hook cuts off' warnings: legacy {legacy_warnings / n:.0%} of drafts, "
+          f"layout {hook_warnings / n:.0%}")
+
+    iphone = [fold(p, 'iphone', metrics) for p in posts]
+    desktop = [fold(p, 'desktop', metrics) for p in posts]
+    print(f"fold point (chars): iPhone median {statistics.median(f['fold'] for f in iphone if f['cut']):.0f}, "
+          f"desktop median {statistics.median(f['fold'] for f in desktop if f['cut']):.0f} "
+          f"(legacy: fixed 150)")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,48 @@
+"""
+Per-draft latency of the local lint engine.
+
+    python -m benchmarks.bench_lint [n_drafts]   (default: 10000)
+"""
+
+import random
+import sys
+import time
+
+from postpro.lint import DEFAULT_LEXICON, Linter
+
+WORDS = ('founder', 'team', 'hiring', 'revenue', 'customer', 'board', 'mistake', 'lesson',
+         'market', 'product', 'we', 'I', 'the', 'a', 'said', 'never', 'because', 'year')
+
+
+def make_drafts(n: int, seed: int = 0) -> list:
+    """Realistic-length drafts (600-1500 chars) with occasional bot speak."""
+    rng = random.Random(seed)
+    drafts = []
+    for _ in range(n):
+        paragraphs = []
+        for _ in range(rng.randint(4, 9)):
+            words = [rng.choice(WORDS) for _ in range(rng.randint(8, 40))]
+            if rng.random() < 0.1:
+                words.insert(rng.randrange(len(words)), rng.choice(DEFAULT_LEXICON))
+            paragraphs.append(' '.join(words).capitalize() + '.')
+        drafts.append('\n\n'.join(paragraphs))
+    return drafts
+
+
+def main(argv):
+    n = int(argv[0]) if argv else 10_000
+    drafts = make_drafts(n)
+    linter = Linter()
+    linter.lint(drafts[0])
+
+    start = time.perf_counter()
+    failed = sum(linter.lint(d)['hard_fail'] for d in drafts)
+    elapsed = time.perf_counter() - start
+
+    chars = sum(map(len, drafts)) / n
+    print(f"{n} drafts (avg {chars:.0f} chars): {elapsed:.3f}s total, "
+          f"{elapsed / n * 1e6:.1f} µs/draft, {n / elapsed:,.0f} drafts/sec, {failed} gated")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,75 @@
+"""
+Per-session memory for N concurrent sessions viewing exports.
+
+Three ways a session can hold its export:
+- records: its own dict-of-records copy, as session_state held before
+  (every disk-cache hit and merged view unpickled a fresh one)
+- columns: its own in-memory ColumnarExport (sessions with distinct exports)
+- handle: only the data_key, resolved through one ExportCache whose
+  exports are memory-mapped from disk (sessions sharing an export)
+
+Heap is measured with tracemalloc. Mapped pages are not on the Python
+heap; they are listed separately and are paid once per host, not per
+session or per worker process.
+
+    python -m benchmarks.bench_memory [sessions] [posts] [days]   (default: 100 1000 1500)
+"""
+
+import gc
+import pickle
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic import make_export
+from postpro.cache import ExportCache
+from postpro.columnar import compact
+from postpro.ingest import parse_linkedin_xlsx
+
+
+def held(build, n: int) -> tuple:
+    """(heap bytes retained by n sessions, seconds) for sessions built by build(i)."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    sessions = [{'export': build(i)} for i in range(n)]
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del sessions
+    return size, elapsed
+
+
+def main(argv):
+    n = int(argv[0]) if argv else 100
+    posts = int(argv[1]) if len(argv) > 1 else 1000
+    days = int(argv[2]) if len(argv) > 2 else 1500
+    parsed = parse_linkedin_xlsx(make_export(posts, days, 0, 50))
+    blob = pickle.dumps(parsed)
+    cache = ExportCache(tempfile.mkdtemp())
+    shared = cache.set('shared', parsed)
+
+    print(f"{n} sessions, export of {posts} posts / {days} days ({len(blob) / 2 ** 20:.2f} MB pickled)")
+    print(f"{'layout':<10} {'per session':>14} {'all sessions':>14} {'build':>9}")
+    cases = (
+        ('records', lambda i: pickle.loads(blob)),
+        ('columns', lambda i: compact(parsed)),
+        ('handle', lambda i: cache.get('shared') and 'shared'),
+    )
+    for name, build in cases:
+        size, elapsed = held(build, n)
+        print(f"{name:<10} {size / n / 1024:>11.1f} KB {size / 2 ** 20:>11.2f} MB {elapsed * 1000:>7.0f}ms")
+    print(f"shared mapped arrays: {shared.nbytes / 2 ** 20:.2f} MB, once per host")
+
+    for label, fn in (('top 5 posts', lambda: shared.records('top_by_engagement', 5)),
+                      ('trends table', lambda: shared.table('trends'))):
+        start = time.perf_counter()
+        for _ in range(100):
+            fn()
+        print(f"{label:<14} {(time.perf_counter() - start) * 10:.3f} ms")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
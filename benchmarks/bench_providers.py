@@ -0,0 +1,47 @@
+"""
+Latency and strong-model usage of fallback routing vs. always using the strong model.
+
+Both models are in-process mocks with simulated latency, so only the
+routing policy is measured.
+
+    python -m benchmarks.bench_providers [n_drafts] [fast_s] [strong_s]   (default: 200 0.02 0.2)
+"""
+
+import statistics
+import sys
+import time
+
+from postpro.analyzer import analyze_posts
+from postpro.providers import FallbackRouter, MockProvider
+
+ANCHOR = "I almost shut the company down.\n\nThen one customer called."
+
+
+def _run(model, n):
+    times = []
+    for i in range(n):
+        start = time.perf_counter()
+        analyze_posts(ANCHOR, f"Draft {i}\n\nA different opening every time.", '', model=model)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+def main(argv):
+    n = int(argv[0]) if argv else 200
+    fast_latency = float(argv[1]) if len(argv) > 1 else 0.02
+    strong_latency = float(argv[2]) if len(argv) > 2 else 0.2
+
+    strong = MockProvider(latency=strong_latency)
+    times = _run(strong, n)
+    print(f"strong only: p50 {statistics.median(times):.0f} ms, mean {statistics.mean(times):.0f} ms, "
+          f"{strong.calls} strong calls")
+
+    strong = MockProvider(latency=strong_latency)
+    router = FallbackRouter(MockProvider(latency=fast_latency), strong)
+    times = _run(router, n)
+    print(f"fast -> strong: p50 {statistics.median(times):.0f} ms, mean {statistics.mean(times):.0f} ms, "
+          f"{strong.calls} strong calls ({router.escalations / router.calls:.0%} escalated)")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,153 @@
+"""
+Load test: N concurrent sessions against a mock LLM, with and without the shared scheduler.
+
+Interactive sessions each run a few analyses with think time between
+them; some review the same post at the same moment. Two sessions paste
+a large batch at the start. Sessions are spread over two API keys, and
+the mock rejects calls (429) once a key has more than QUOTA calls in
+flight, the way a provider quota does.
+
+"direct" is the old behaviour: every session calls the model from its
+own thread (batches through score_drafts). "scheduler" routes everything
+through one AnalysisScheduler.
+
+    python -m benchmarks.bench_scheduler [sessions] [latency_s]   (default: 40 0.3)
+"""
+
+import random
+import statistics
+import sys
+import threading
+import time
+
+from postpro.analyzer import analyze_posts
+from postpro.batch import score_drafts
+from postpro.fakes import FakeRateLimitError
+from postpro.providers import MockProvider
+from postpro.scheduler import AnalysisScheduler, as_completed
+
+ANCHOR = "I almost shut the company down.\n\nThen one customer called."
+QUOTA = 6
+ANALYSES_PER_SESSION = 4
+BATCH_SIZE = 60
+
+
+class QuotaModel:
+    """Mock model for one API key that counts upstream calls and enforces a concurrency quota."""
+
+    name = 'mock'
+    needs_key = False
+
+    def __init__(self, latency: float):
+        self.inner = MockProvider(latency=latency)
+        self.calls = self.rejected = self.active = self.peak = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt, stream: bool = False, **kwargs):
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            over = self.active > QUOTA
+        try:
+            if over:
+                with self._lock:
+                    self.rejected += 1
+                raise FakeRateLimitError()
+            return self.inner.generate_content(prompt, stream=stream)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def _plan(n_sessions: int, seed: int = 0):
+    rng = random.Random(seed)
+    shared = [f"Team draft {i}\n\nEveryone is reviewing this one." for i in range(3)]
+    sessions = []
+    for s in range(n_sessions):
+        key = 'key-a' if s % 4 else 'key-b'
+        if s < 2:
+            drafts = [f"Batch {s} draft {i}\n\nScheduled for next week." for i in range(BATCH_SIZE)]
+            sessions.append({'key': key, 'batch': drafts})
+            continue
+        steps = []
+        for i in range(ANALYSES_PER_SESSION):
+            draft = rng.choice(shared) if rng.random() < 0.25 else f"Session {s} draft {i}\n\nMy own post."
+            steps.append((rng.uniform(0.0, 1.0), draft))
+        sessions.append({'key': key, 'steps': steps})
+    return sessions
+
+
+def _run(plan, models, scheduler=None):
+    latencies, batch_times, errors = [], [], []
+    lock = threading.Lock()
+
+    def session(index, spec):
+        model = models[spec['key']]
+        name = f"session-{index}"
+        if 'batch' in spec:
+            start = time.perf_counter()
+            if scheduler is None:
+                results = [r for _, r in score_drafts(ANCHOR, spec['batch'], spec['key'], concurrency=4,
+                                                      requests_per_second=0, base_delay=0.2, model=model)]
+            else:
+                jobs = [scheduler.submit_analysis(ANCHOR, d, spec['key'], name, model=model, stream=False)
+                        for d in spec['batch']]
+                results = [job.result() for job in as_completed(jobs)]
+            with lock:
+                batch_times.append(time.perf_counter() - start)
+                errors.extend(r for r in results if 'error' in r)
+            return
+        for think, draft in spec['steps']:
+            time.sleep(think)
+            start = time.perf_counter()
+            if scheduler is None:
+                result = analyze_posts(ANCHOR, draft, spec['key'], model=model)
+            else:
+                result = scheduler.submit_analysis(ANCHOR, draft, spec['key'], name, model=model,
+                                                   stream=False).result()
+            with lock:
+                if 'error' in result:
+                    errors.append(result)
+                else:
+                    latencies.append((time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target=session, args=(i, spec)) for i, spec in enumerate(plan)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, batch_times, errors, time.perf_counter() - start
+
+
+def main(argv):
+    n_sessions = int(argv[0]) if argv else 40
+    latency = float(argv[1]) if len(argv) > 1 else 0.3
+    plan = _plan(n_sessions)
+    interactive = sum(len(s.get('steps', ())) for s in plan)
+    print(f"{n_sessions} sessions ({interactive} interactive analyses, 2 batches of {BATCH_SIZE}), "
+          f"2 API keys, quota {QUOTA} in flight per key, {latency * 1000:.0f} ms per call")
+
+    for mode in ('direct', 'scheduler'):
+        models = {'key-a': QuotaModel(latency), 'key-b': QuotaModel(latency)}
+        scheduler = AnalysisScheduler(workers=16, per_key=QUOTA, base_delay=0.2) if mode == 'scheduler' else None
+        latencies, batch_times, errors, elapsed = _run(plan, models, scheduler)
+        latencies.sort()
+        calls = sum(m.calls for m in models.values())
+        rejected = sum(m.rejected for m in models.values())
+        print(f"\n{mode}:")
+        print(f"  interactive latency (successful): p50 {statistics.median(latencies):.0f} ms, "
+              f"p95 {latencies[int(len(latencies) * 0.95)]:.0f} ms, max {latencies[-1]:.0f} ms")
+        print(f"  batches finished in {max(batch_times):.1f}s; whole run {elapsed:.1f}s")
+        print(f"  upstream calls {calls} ({rejected} rejected over quota), "
+              f"peak in flight per key {max(m.peak for m in models.values())}, "
+              f"failed analyses {len(errors)}")
+        if scheduler is not None:
+            stats = scheduler.stats()
+            print(f"  coalesced {stats['coalesced']} of {stats['submitted']} requests; "
+                  f"queue wait p50 {stats['wait_p50_ms']:.0f} ms, p95 {stats['wait_p95_ms']:.0f} ms")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
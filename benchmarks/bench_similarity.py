@@ -0,0 +1,52 @@
+"""
+Top-K query latency of the vector index.
+
+    python -m benchmarks.bench_similarity [n_posts] [dim]   (default: 100000 256)
+"""
+
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from postpro.similarity import HashingEmbedder, VectorIndex
+
+
+def main(argv):
+    n = int(argv[0]) if argv else 100_000
+    dim = int(argv[1]) if len(argv) > 1 else 256
+    rng = np.random.default_rng(0)
+
+    index = VectorIndex(HashingEmbedder(dim))
+    # Random unit rows stand in for embedded history; embedding cost is not what we time
+    vectors = rng.standard_normal((n, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    index._matrix = vectors
+    index.ids = [f"post-{i}" for i in range(n)]
+    index.meta = [{'engagements': int(e)} for e in rng.integers(0, 2000, n)]
+    index._digests = [''] * n
+    index._rows = {post_id: row for row, post_id in enumerate(index.ids)}
+    index._engagements = np.array([m['engagements'] for m in index.meta], dtype=np.float64)
+    index._size = n
+
+    draft = "Three years ago I almost shut the company down.\n\nHere's what changed."
+    query = index.embedder.embed([draft])[0]
+    index.search(query, k=5)
+
+    for label, kwargs in (("top-5", {}), ("top-5, engagements >= 500", {'min_engagements': 500})):
+        times = []
+        for _ in range(50):
+            start = time.perf_counter()
+            index.search(query, k=5, **kwargs)
+            times.append((time.perf_counter() - start) * 1000)
+        print(f"{n} posts x {dim}d, {label}: p50 {statistics.median(times):.2f} ms, "
+              f"max {max(times):.2f} ms")
+
+    start = time.perf_counter()
+    index.embedder.embed([draft])
+    print(f"embedding one draft: {(time.perf_counter() - start) * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,81 @@
+"""
+Cold start: import time and time-to-first-paint of a new session.
+
+Each measurement runs in a fresh interpreter, so nothing is warm. Import
+time covers the modules app.py pulls in (Streamlit itself excluded, a
+running server already has it). First paint is the time from the start
+of a session's script run until the header is sent to the browser; the
+second session in the same process shows the warm-server case.
+
+    python -m benchmarks.bench_startup [app.py] [runs]   (default: ./app.py 5)
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROBE = r'''
+import json, os, sys, tempfile, time, warnings
+warnings.simplefilter('ignore')
+os.environ['POSTPRO_CACHE_DIR'] = tempfile.mkdtemp()
+app = sys.argv[1]
+sys.path.insert(0, os.path.dirname(os.path.abspath(app)))
+
+import streamlit
+from streamlit.runtime.scriptrunner_utils.script_run_context import ScriptRunContext
+from streamlit.testing.v1 import AppTest
+
+if sys.argv[2] == 'imports':
+    start = time.perf_counter()
+    for line in open(app, encoding='utf-8'):
+        if line.startswith(('import ', 'from ')) and 'streamlit' not in line:
+            exec(line)
+    imports = time.perf_counter() - start
+    heavy = [m for m in ('google.generativeai', 'pandas', 'openpyxl', 'numpy') if m in sys.modules]
+    print(json.dumps({'imports': imports, 'heavy': heavy}))
+    sys.exit()
+
+marks = {}
+enqueue = ScriptRunContext.enqueue
+
+def timed_enqueue(self, msg):
+    if 'first_paint' not in marks and msg.HasField('delta') and 'main-header' in str(msg.delta):
+        marks['first_paint'] = time.perf_counter() - marks['start']
+    return enqueue(self, msg)
+
+ScriptRunContext.enqueue = timed_enqueue
+sessions = []
+for _ in range(2):
+    marks.clear()
+    at = AppTest.from_file(app, default_timeout=120)
+    marks['start'] = time.perf_counter()
+    at.run()
+    sessions.append({'first_paint': marks.get('first_paint'), 'run': time.perf_counter() - marks['start']})
+print(json.dumps({'sessions': sessions}))
+'''
+
+
+def _probe(app: str, mode: str) -> dict:
+    out = subprocess.run([sys.executable, '-c', PROBE, app, mode], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv):
+    app = argv[0] if argv else os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app.py')
+    runs = int(argv[1]) if len(argv) > 1 else 5
+
+    results = [dict(_probe(app, 'imports'), **_probe(app, 'sessions')) for _ in range(runs)]
+    ms = lambda values: f"{statistics.median(values) * 1000:7.0f} ms"
+    print(f"{app} ({runs} cold processes, median)")
+    print(f"  imports:                   {ms([r['imports'] for r in results])}   "
+          f"heavy modules loaded: {', '.join(results[0]['heavy']) or 'none'}")
+    print(f"  first paint, cold session: {ms([r['sessions'][0]['first_paint'] for r in results])}")
+    print(f"  full run,    cold session: {ms([r['sessions'][0]['run'] for r in results])}")
+    print(f"  first paint, warm session: {ms([r['sessions'][1]['first_paint'] for r in results])}")
+    print(f"  full run,    warm session: {ms([r['sessions'][1]['run'] for r in results])}")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
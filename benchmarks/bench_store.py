@@ -0,0 +1,54 @@
+"""
+Import cost of the merged export store: full history vs. small deltas.
+
+    python -m benchmarks.bench_store [n_posts] [n_days]   (default: 20000 1095)
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.synthetic import make_export
+from postpro.ingest import parse_linkedin_xlsx
+from postpro.store import ExportStore
+
+
+def _timed(store, digest, parsed):
+    start = time.perf_counter()
+    counts = store.import_export(digest, parsed)
+    return (time.perf_counter() - start) * 1000, counts
+
+
+def main(argv):
+    n_posts = int(argv[0]) if argv else 20_000
+    n_days = int(argv[1]) if len(argv) > 1 else 1095
+    parsed = parse_linkedin_xlsx(make_export(n_posts, n_days=n_days))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = ExportStore(os.path.join(tmp, 'exports.sqlite'))
+        ms, counts = _timed(store, 'full', parsed)
+        print(f"first import, {n_posts} posts / {n_days} days: {ms:.1f} ms ({counts['new_posts']} new)")
+
+        ms, _ = _timed(store, 'full', parsed)
+        print(f"same file again (digest hit): {ms:.2f} ms")
+
+        ms, counts = _timed(store, 'unchanged', parsed)
+        print(f"re-export, nothing changed: {ms:.1f} ms ({counts['changed_posts']} changed)")
+
+        rng = random.Random(1)
+        posts = [dict(p) for p in parsed['posts']]
+        for post in rng.sample(posts, len(posts) // 100):
+            post['engagements'] = (post['engagements'] or 0) + 1
+        ms, counts = _timed(store, 'delta', dict(parsed, posts=posts))
+        print(f"re-export, 1% of posts changed: {ms:.1f} ms ({counts['changed_posts']} changed)")
+
+        fresh = ExportStore(os.path.join(tmp, 'exports.sqlite'))
+        ms, counts = _timed(fresh, 'restart', dict(parsed, posts=posts))
+        print(f"re-export after restart (loads stored state): {ms:.1f} ms "
+              f"({counts['changed_posts']} changed)")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
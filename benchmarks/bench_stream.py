@@ -0,0 +1,47 @@
+"""
+Time-to-first-insight: streamed vs blocking analysis against a mock model.
+
+The mock waits `latency` before the first token, then emits the answer at
+`chars_per_second` (~4 chars per token), like a real generation.
+
+    python -m benchmarks.bench_stream [latency] [chars_per_second]   (default: 0.5 400)
+"""
+
+import statistics
+import sys
+import time
+
+from postpro.analyzer import stream_analysis
+from postpro.fakes import FakeGenerativeModel
+
+FIRST_INSIGHT = {'score', 'verdict', 'risk_level'}
+
+
+def measure(model, stream: bool, runs: int = 5):
+    first, total = [], []
+    for i in range(runs):
+        start = time.perf_counter()
+        seen = None
+        for result in stream_analysis(f"anchor {i}", f"draft {i}", "key", model=model, stream=stream):
+            if seen is None and FIRST_INSIGHT <= result.keys():
+                seen = time.perf_counter() - start
+        total.append(time.perf_counter() - start)
+        first.append(seen)
+    return statistics.median(first), statistics.median(total)
+
+
+def main(argv):
+    latency = float(argv[0]) if argv else 0.5
+    cps = float(argv[1]) if len(argv) > 1 else 400.0
+    model = FakeGenerativeModel(latency=latency, chars_per_second=cps)
+
+    blocking_first, blocking_total = measure(model, stream=False)
+    stream_first, stream_total = measure(model, stream=True)
+    print(f"{'mode':>9} {'first insight (s)':>18} {'complete (s)':>13}")
+    print(f"{'blocking':>9} {blocking_first:>18.3f} {blocking_total:>13.3f}")
+    print(f"{'streaming':>9} {stream_first:>18.3f} {stream_total:>13.3f}")
+    print(f"time-to-first-insight: {blocking_first / stream_first:.1f}x faster")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
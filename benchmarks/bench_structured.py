@@ -0,0 +1,81 @@
+"""
+Wasted calls on malformed model answers: old fence-stripping parser vs. repair + validation.
+
+Replays benchmarks/data/malformed_responses.jsonl (answers with fences,
+chatter, trailing commas, Python literals, truncation, wrong field types,
+missing fields). A failed parse used to mean a full re-run; now it means
+a local repair, a follow-up asking for the missing fields, or - only when
+nothing is salvageable - a re-run.
+
+    python -m benchmarks.bench_structured
+"""
+
+import json
+import os
+from collections import Counter
+
+from postpro.analyzer import complete_result
+from postpro.fakes import FakeResponse, fake_result
+
+CORPUS = os.path.join(os.path.dirname(__file__), 'data', 'malformed_responses.jsonl')
+
+
+def legacy_parse(text: str) -> dict:
+    """parse_response() as it was before the structured-output pipeline."""
+    result_text = text.strip()
+    if result_text.startswith("```"):
+        result_text = result_text.split("```")[1]
+        if result_text.startswith("json"):
+            result_text = result_text[4:]
+    if result_text.endswith("```"):
+        result_text = result_text[:-3]
+    return json.loads(result_text.strip())
+
+
+class FollowUpModel:
+    """Answers follow-up requests with a well-formed result and counts them."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def generate_content(self, prompt, **kwargs):
+        self.calls += 1
+        return FakeResponse(json.dumps(fake_result(prompt)))
+
+
+def main():
+    with open(CORPUS, encoding='utf-8') as f:
+        corpus = [json.loads(line) for line in f]
+
+    legacy_failures = Counter()
+    outcomes = Counter()
+    by_kind = {}
+    for case in corpus:
+        try:
+            legacy_parse(case['text'])
+        except json.JSONDecodeError:
+            legacy_failures[case['kind']] += 1
+
+        model = FollowUpModel()
+        try:
+            complete_result(model, 'prompt', case['text'])
+            outcome = 'follow-up' if model.calls else 'parsed/repaired'
+        except ValueError:
+            outcome = 're-run'
+        outcomes[outcome] += 1
+        by_kind.setdefault(case['kind'], Counter())[outcome] += 1
+
+    n = len(corpus)
+    print(f"{n} recorded answers")
+    print(f"legacy parser: {sum(legacy_failures.values())} failed -> "
+          f"{sum(legacy_failures.values())} full re-runs")
+    print(f"structured:    {outcomes['parsed/repaired']} parsed or repaired locally, "
+          f"{outcomes['follow-up']} missing-field follow-ups, {outcomes['re-run']} full re-runs")
+    print()
+    for kind, counts in by_kind.items():
+        print(f"  {kind:<22} legacy {'fail' if legacy_failures[kind] else 'ok  '}  ->  "
+              + ", ".join(f"{k} {v}" for k, v in sorted(counts.items())))
+
+
+if __name__ == '__main__':
+    main()
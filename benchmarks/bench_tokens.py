@@ -0,0 +1,98 @@
+"""
+Input tokens per analysis: the original prompt vs. the compact, budgeted one.
+
+Short posts come from the lint benchmark's generator; long-form posts
+(articles pasted as drafts) show the effect of the per-post budgets.
+
+    python -m benchmarks.bench_tokens [n_pairs]   (default: 500)
+"""
+
+import random
+import statistics
+import sys
+
+from benchmarks.bench_lint import WORDS, make_drafts
+from postpro.analyzer import build_prompt
+from postpro.tokens import count_tokens
+
+# The analysis prompt as it was before compaction
+LEGACY_PREFIX = """You are a Strategic LinkedIn Editor for a Senior Executive.
+Your task is to validate if the [New Draft] matches the DNA of the [Anchor Post].
+
+CONTEXT:
+The user's audience consists of senior professionals - Founders, CEOs, and executives.
+
+FATAL ERRORS to flag:
+1. "Junior" advice (basic tips that sound inexperienced)
+2. "Bot Speak" (words like: delve, landscape, unlock, game-changer, leverage, synergy)
+3. "Wall of Text" (paragraphs > 3 lines without breaks)
+4. Tone mismatch (formal vs casual, story vs data)
+
+ANALYSIS FRAMEWORK:
+1. Visual Physics: Line breaks, paragraph density, white space, overall structure
+2. Tonal DNA: Cynicism vs Optimism, Direct vs Storytelling, Personal vs Professional
+3. Hook Geometry: Does the first sentence create similar psychological impact?
+4. Authority Level: Does it sound like the same seniority level?
+
+[ANCHOR POST - This performed well]:
+{anchor}
+
+---
+
+"""
+
+LEGACY_SUFFIX = """[NEW DRAFT - Analyze this]:
+{draft}
+
+Compare the draft to the anchor and provide your analysis.
+
+OUTPUT: Return ONLY valid JSON (no markdown, no explanation before/after, no ```json tags):
+{{
+    "score": <number 0-100>,
+    "verdict": "<one sentence explaining the main gap>",
+    "risk_level": "<Low/Medium/High>",
+    "analysis": {{
+        "visual_physics": "<brief assessment>",
+        "tonal_dna": "<brief assessment>",
+        "hook_comparison": "<brief assessment>"
+    }},
+    "fatal_errors": ["<list any fatal errors found, empty array if none>"],
+    "fix_suggestions": ["<specific actionable suggestion 1>", "<suggestion 2>", "<suggestion 3>"],
+    "rewritten_hook": "<rewritten first 2-3 lines that match anchor's style>"
+}}"""
+
+
+def legacy_prompt(anchor: str, draft: str) -> str:
+    return LEGACY_PREFIX.format(anchor=anchor) + LEGACY_SUFFIX.format(draft=draft)
+
+
+def make_long_posts(n: int, seed: int = 1) -> list:
+    """Long-form posts of 25-60 paragraphs."""
+    rng = random.Random(seed)
+    return [
+        '\n\n'.join(
+            ' '.join(rng.choice(WORDS) for _ in range(rng.randint(20, 60))).capitalize() + '. More detail follows.'
+            for _ in range(rng.randint(25, 60))
+        )
+        for _ in range(n)
+    ]
+
+
+def _report(label, pairs):
+    before = [count_tokens(legacy_prompt(a, d)) for a, d in pairs]
+    after = [count_tokens(build_prompt(a, d)) for a, d in pairs]
+    saved = 1 - sum(after) / sum(before)
+    print(f"{label}: mean {statistics.mean(before):,.0f} -> {statistics.mean(after):,.0f} input tokens "
+          f"({saved:.0%} fewer), max {max(before):,} -> {max(after):,}")
+
+
+def main(argv):
+    n = int(argv[0]) if argv else 500
+    posts = make_drafts(2 * n)
+    _report(f"{n} typical pairs", list(zip(posts[:n], posts[n:])))
+    long_posts = make_long_posts(n // 5 or 1)
+    _report(f"{len(long_posts)} long-form drafts", list(zip(posts, long_posts)))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,82 @@
+"""
+Variant search: model calls and wall time against N, versus scoring every variant.
+
+A wall-of-text draft with bot speak gets N variants from a pool of
+suggested hooks. optimize() pre-scores them locally and runs successive
+halving over three anchors. The exhaustive baseline sends every variant
+that passes the local checks to the model against every anchor. The mock
+model's scores are a hash of the prompt, so they have nothing to do with
+the local score: that is the worst case for the local pre-filter, and
+the regret column shows what it costs.
+
+    python -m benchmarks.bench_variants [latency_s] [n ...]   (default: 0.02 8 32 128 512)
+"""
+
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from postpro.analyzer import analyze_posts
+from postpro.providers import MockProvider
+from postpro.variants import generate_variants, local_score, optimize
+
+DRAFT = (
+    "We need to leverage our synergies to unlock growth in this ever-evolving landscape. "
+    "Here is what I learned after ten years of building companies.\n"
+    "First, hire slowly. Second, fire fast. Third, never stop talking to customers. Most founders "
+    "skip the third one and it costs them everything. I did too, for years, and it nearly killed us. "
+    "That is the lesson. It is simple. It is hard.\n"
+    "What would you add?"
+)
+ANCHORS = [
+    "I almost shut the company down.\n\nThen one customer called.\n\nShe said one thing.\n\nWe kept going.",
+    "Nobody tells you this about hiring.\n\nThe best people interview badly.\n\nHire for the work, not the show.",
+    "We lost our biggest customer on a Tuesday.\n\nBy Friday we had rebuilt the product.\n\nHere is how.",
+]
+OPENERS = ('I almost', 'Nobody told me I would', 'Ten years ago I', 'Last week I', 'The day I',
+           'Most founders never', 'I was wrong when I', 'Our board asked why we')
+ENDINGS = ('lost our best customer.', 'stopped talking to customers.', 'hired too fast.',
+           'nearly shut the company down.', 'ignored the one email that mattered.',
+           'fired a friend.', 'said no to a $2M deal.', 'learned to listen.')
+SUGGESTED = [f"{o} {e}" for o in OPENERS for e in ENDINGS]
+
+
+def exhaustive(variants: list, model) -> tuple:
+    """({variant: mean score}, calls) for the original and every locally passing variant."""
+    passing = [variants[0]['text']] + [v['text'] for v in variants[1:] if local_score(v['text']) is not None]
+    pairs = [(anchor, text) for text in passing for anchor in ANCHORS]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda p: analyze_posts(p[0], p[1], '', model=model), pairs))
+    totals = {}
+    for (_, text), result in zip(pairs, results):
+        totals.setdefault(text, []).append(result['score'])
+    means = {text: sum(s) / len(s) for text, s in totals.items()}
+    return means, len(pairs)
+
+
+def main(argv):
+    latency = float(argv[0]) if argv else 0.02
+    sizes = [int(a) for a in argv[1:]] or [8, 32, 128, 512]
+    print(f"{len(ANCHORS)} anchors, mock model {latency * 1000:.0f} ms per call, 8 calls in parallel")
+    print(f"{'N':>5} {'calls':>6} {'rounds':>6} {'time':>7} {'best':>6} | {'exhaustive calls':>16} "
+          f"{'time':>7} {'best':>6} | {'regret':>6} {'rank':>5}")
+    for n in sizes:
+        model = MockProvider(latency=latency)
+        start = time.perf_counter()
+        result = optimize(DRAFT, ANCHORS, '', n=n, suggested_hooks=SUGGESTED, concurrency=8, model=model)
+        elapsed = time.perf_counter() - start
+        chosen = result['best'][0]
+
+        baseline = MockProvider(latency=latency)
+        start = time.perf_counter()
+        means, calls = exhaustive(generate_variants(DRAFT, n, SUGGESTED), baseline)
+        baseline_elapsed = time.perf_counter() - start
+        ranking = sorted(means.values(), reverse=True)
+        chosen_mean = means[chosen['text']]
+        print(f"{n:>5} {model.calls:>6} {result['rounds']:>6} {elapsed:>6.2f}s {chosen_mean:>6.1f} | "
+              f"{calls:>16} {baseline_elapsed:>6.2f}s {ranking[0]:>6.1f} | "
+              f"{ranking[0] - chosen_mean:>6.1f} {ranking.index(chosen_mean) + 1:>5}")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,50 @@
+"""
+Record model answers for the benchmark suite to replay offline.
+
+Runs the suite's (anchor, draft) pairs through a real backend, half of
+them streamed, and appends every answer, including any follow-up for
+missing fields, to a cassette with its timing and token counts. Gemini
+reads the key from GEMINI_API_KEY / GOOGLE_API_KEY, OpenAI from
+OPENAI_API_KEY. The mock backend records to the committed
+mock_cassette.jsonl fixture instead, for trying the plumbing without a
+key; its answers are canned and its timings are not realistic.
+
+    python -m benchmarks.record_responses [backend] [model] [n_pairs]   (default: gemini - 40)
+"""
+
+import os
+import sys
+
+from benchmarks.suite import CASSETTE, MOCK_CASSETTE, analysis_pairs
+from postpro.analyzer import stream_analysis
+from postpro.cli import KEY_VARIABLES
+from postpro.providers import MockProvider, get_provider
+from postpro.replay import RecordingModel
+
+
+def main(argv):
+    backend = argv[0] if argv else 'gemini'
+    model = argv[1] if len(argv) > 1 and argv[1] != '-' else None
+    n = int(argv[2]) if len(argv) > 2 else 40
+    api_key = next((os.environ[v] for v in KEY_VARIABLES.get(backend, ()) if os.environ.get(v)), '')
+    if backend == 'mock':
+        inner = MockProvider(latency=0.4, chars_per_second=2000)
+    else:
+        inner = get_provider(backend, api_key, model)
+    if inner.needs_key and not api_key:
+        sys.exit(f"Set {' or '.join(KEY_VARIABLES[backend])} to record from {backend}")
+
+    path = MOCK_CASSETTE if backend == 'mock' else CASSETTE
+    recorder = RecordingModel(inner, path)
+    failed = 0
+    for i, (anchor, draft) in enumerate(analysis_pairs(n)):
+        result = {}
+        for result in stream_analysis(anchor, draft, api_key, model=recorder, stream=bool(i % 2)):
+            pass
+        failed += 'error' in result
+        print(f"\r{i + 1}/{n} recorded", end='', file=sys.stderr)
+    print(f"\n{recorder.recorded} answers appended to {path} ({failed} errors)")
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
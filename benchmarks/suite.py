@@ -0,0 +1,255 @@
+"""
+Regression suite: parse time, analysis latency, rerun cost and peak memory.
+
+Every case runs offline. Exports come from the synthetic generator, model
+answers are replayed from benchmarks/data/analysis_cassette.jsonl (see
+benchmarks.record_responses), and the app is driven by Streamlit's
+AppTest. That cassette is recorded against a real model and not
+committed; without it the committed mock_cassette.jsonl fixture is
+replayed, whose canned answers and timings only cover our own overhead.
+
+Results can be appended to a history file, one line per run, tagged with
+the commit. Each run is checked against benchmarks/thresholds.json, which
+sets an absolute ceiling per metric and the slowdown allowed against a
+previous run. Any breach makes the exit status 1.
+
+    python -m benchmarks.suite [--only parse|analysis|rerun] [--save] [--against COMMIT]
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from datetime import datetime, timezone
+
+from benchmarks.bench_lint import make_drafts
+from benchmarks.synthetic import make_export
+from postpro.analyzer import analyze_posts, stream_analysis
+from postpro.cache import ExportCache, default_cache_dir
+from postpro.ingest import parse_linkedin_xlsx
+from postpro.providers import MockProvider
+from postpro.replay import RecordingModel, ReplayModel
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CASSETTE = os.path.join(ROOT, 'benchmarks', 'data', 'analysis_cassette.jsonl')
+# Answers of the mock model for the same pairs: a plumbing fixture, not real model output
+MOCK_CASSETTE = os.path.join(ROOT, 'benchmarks', 'data', 'mock_cassette.jsonl')
+THRESHOLDS = os.path.join(ROOT, 'benchmarks', 'thresholds.json')
+HISTORY = os.environ.get('POSTPRO_BENCH_HISTORY', os.path.join(ROOT, '.benchmarks', 'history.jsonl'))
+ANCHORS = (
+    "I almost shut the company down.\n\nThen one customer called.\n\nShe said one thing.\n\nWe kept going.",
+    "Nobody tells you this about hiring.\n\nThe best people interview badly.\n\nHire for the work, not the show.",
+)
+
+
+def analysis_pairs(n: int, seed: int = 0) -> list:
+    """The (anchor, draft) pairs the suite analyses; record_responses records the same ones."""
+    return [(ANCHORS[i % len(ANCHORS)], draft) for i, draft in enumerate(make_drafts(n, seed))]
+
+
+def timed(fn, rounds: int, warmup: int = 1) -> dict:
+    """min/p50/mean/stdev of fn() over rounds, in ms.
+
+    Regression checks use min: the least noisy estimate of the cost itself.
+    """
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return {'min': min(times), 'p50': statistics.median(times), 'mean': statistics.mean(times),
+            'stdev': statistics.stdev(times) if len(times) > 1 else 0.0}
+
+
+def peak_mb(fn) -> float:
+    """Peak Python heap allocated while fn() runs, in MB."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 2 ** 20
+    finally:
+        tracemalloc.stop()
+
+
+def bench_parse(rounds: int) -> dict:
+    metrics = {}
+    for name, args in (('small', (200, 365, 0, 10)), ('large', (5000, 3650, 0, 50))):
+        data = make_export(*args)
+        metrics[f'parse.{name}.min_ms'] = timed(lambda: parse_linkedin_xlsx(data), rounds)['min']
+    metrics['parse.large.peak_mb'] = peak_mb(lambda: parse_linkedin_xlsx(data))
+    return metrics
+
+
+def _cassette(n: int) -> str:
+    if os.path.exists(CASSETTE):
+        return CASSETTE
+    if os.path.exists(MOCK_CASSETTE):
+        print(f"no cassette at {CASSETTE}; replaying the mock fixture", file=sys.stderr)
+        return MOCK_CASSETTE
+    print(f"no cassette at {CASSETTE}; recording one from the mock model", file=sys.stderr)
+    path = os.path.join(tempfile.mkdtemp(), 'cassette.jsonl')
+    recorder = RecordingModel(MockProvider(latency=0.05, chars_per_second=20000), path)
+    for i, (anchor, draft) in enumerate(analysis_pairs(n)):
+        for _ in stream_analysis(anchor, draft, '', model=recorder, stream=bool(i % 2)):
+            pass
+    return path
+
+
+def bench_analysis(rounds: int, n: int = 40) -> dict:
+    path = _cassette(n)
+    pairs = analysis_pairs(n)
+    instant = ReplayModel(path, latency='none')
+
+    def blocking():
+        for anchor, draft in pairs:
+            analyze_posts(anchor, draft, '', model=instant)
+
+    def streamed():
+        for anchor, draft in pairs:
+            for _ in stream_analysis(anchor, draft, '', model=instant):
+                pass
+
+    metrics = {
+        'analysis.overhead_ms': timed(blocking, rounds)['min'] / n,
+        'analysis.stream_overhead_ms': timed(streamed, rounds)['min'] / n,
+    }
+    replay = ReplayModel(path, latency='sampled', scale=0.25, seed=0)
+    latencies, first_fields = [], []
+    for anchor, draft in pairs:
+        start = time.perf_counter()
+        first = None
+        for result in stream_analysis(anchor, draft, '', model=replay):
+            if first is None and result.get('partial'):
+                first = time.perf_counter() - start
+        latencies.append((time.perf_counter() - start) * 1000)
+        first_fields.append((first or 0) * 1000)
+    latencies.sort()
+    metrics.update({
+        'analysis.replay_p50_ms': statistics.median(latencies),
+        'analysis.replay_p95_ms': latencies[int(len(latencies) * 0.95)],
+        'analysis.first_field_p50_ms': statistics.median(first_fields),
+        'analysis.cache_misses': instant.misses + replay.misses,
+    })
+    return metrics
+
+
+def bench_rerun(rounds: int) -> dict:
+    os.environ.setdefault('POSTPRO_CACHE_DIR', tempfile.mkdtemp())
+    from streamlit.testing.v1 import AppTest
+
+    # Deprecation notices are logged on every rerun
+    logging.getLogger('streamlit.deprecation_util').disabled = True
+
+    # The app looks the export up by its data_key handle, as after an upload
+    parsed = parse_linkedin_xlsx(make_export(2000, 1500))
+    ExportCache(os.path.join(default_cache_dir(), 'exports')).set('suite', parsed)
+    at = AppTest.from_file(os.path.join(ROOT, 'app.py'), default_timeout=120)
+    at.session_state['data_key'] = 'suite'
+    start = time.perf_counter()
+    at.run()
+    first = (time.perf_counter() - start) * 1000
+    if at.exception:
+        raise RuntimeError(f"app raised: {at.exception[0].value}")
+    return {
+        'rerun.first_ms': first,
+        'rerun.min_ms': timed(at.run, rounds)['min'],
+        'rerun.peak_mb': peak_mb(at.run),
+    }
+
+
+SUITES = {'parse': bench_parse, 'analysis': bench_analysis, 'rerun': bench_rerun}
+
+
+def commit_id() -> str:
+    """Short HEAD hash, with -dirty when the tree has uncommitted changes."""
+    try:
+        head = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'diff', '--quiet', 'HEAD'], cwd=ROOT).returncode
+        return head + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def load_history(path: str = HISTORY) -> list:
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def baseline_for(history: list, against: str = None) -> dict:
+    """Metrics of the newest run for commit against (or the newest run at all)."""
+    for run in reversed(history):
+        if against is None or run['commit'].startswith(against):
+            return run
+    return None
+
+
+def check(metrics: dict, thresholds: dict, baseline: dict = None) -> list:
+    """(metric, value, previous, limit, failure or None) per metric."""
+    default = thresholds.get('default', {})
+    rows = []
+    for name, value in sorted(metrics.items()):
+        rule = dict(default, **thresholds.get(name, {}))
+        previous = (baseline or {}).get('metrics', {}).get(name)
+        failure = None
+        if rule.get('max') is not None and value > rule['max']:
+            failure = f"over the {rule['max']} ceiling"
+        elif (previous is not None and rule.get('regress') is not None and
+              value > previous * (1 + rule['regress']) and value - previous > rule.get('min_delta', 0)):
+            failure = f"+{(value / previous - 1) if previous else 1:.0%} vs {baseline['commit']}"
+        rows.append((name, value, previous, rule.get('max'), failure))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the offline benchmark and regression suite.")
+    parser.add_argument('--only', choices=sorted(SUITES), action='append', help="run only these suites")
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--save', action='store_true', help="append this run to the history file")
+    parser.add_argument('--against', help="compare with the newest saved run of this commit")
+    parser.add_argument('--history', default=HISTORY)
+    args = parser.parse_args(argv)
+    warnings.simplefilter('ignore')
+
+    metrics = {}
+    for name in args.only or SUITES:
+        print(f"running {name}...", file=sys.stderr)
+        metrics.update(SUITES[name](args.rounds))
+
+    with open(THRESHOLDS, encoding='utf-8') as f:
+        thresholds = json.load(f)
+    baseline = baseline_for(load_history(args.history), args.against)
+    rows = check(metrics, thresholds, baseline)
+    print(f"{'metric':<32} {'value':>10} {'previous':>10} {'ceiling':>9}")
+    for name, value, previous, limit, failure in rows:
+        previous = f"{previous:.2f}" if previous is not None else '-'
+        limit = f"{limit:g}" if limit is not None else '-'
+        print(f"{name:<32} {value:>10.2f} {previous:>10} {limit:>9}  {'FAIL ' + failure if failure else ''}")
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+        with open(args.history, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'commit': commit_id(), 'time': datetime.now(timezone.utc).isoformat(),
+                                'python': sys.version.split()[0], 'metrics': metrics}) + '\n')
+    failures = [row for row in rows if row[4]]
+    if failures:
+        print(f"{len(failures)} regression(s)", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Synthetic LinkedIn Content exports for benchmarks.
+
+Mirrors the layout of a real export: TOP POSTS with a preamble above the
+'Post URL' header and two side-by-side blocks, DEMOGRAPHICS and ENGAGEMENT.
+
+    python -m benchmarks.synthetic n_posts [n_days] [demographics] -o export.xlsx
+"""
+
+import argparse
+import random
+from datetime import date, timedelta
+from io import BytesIO
+
+import openpyxl
+
+JOB_TITLES = ['Founder', 'Chief Executive Officer', 'Software Engineer', 'Product Manager',
+              'Consultant', 'Marketing Manager', 'Investor', 'Director']
+DEMOGRAPHIC_VALUES = {
+    'Job titles': JOB_TITLES,
+    'Locations': ['Tel Aviv', 'New York', 'London', 'Berlin', 'San Francisco', 'Singapore'],
+    'Industries': ['Software Development', 'Venture Capital', 'Financial Services', 'IT Services'],
+    'Seniority': ['Senior', 'Director', 'CXO', 'Owner', 'Entry'],
+    'Company size': ['1-10', '11-50', '51-200', '201-500', '1001-5000', '10001+'],
+}
+
+
+def demographic_rows(rng: random.Random, per_category: int) -> list:
+    """per_category (kind, value, percentage) rows for every demographic category."""
+    rows = []
+    for kind, values in DEMOGRAPHIC_VALUES.items():
+        for i in range(per_category):
+            value = values[i % len(values)] + (f' {i // len(values) + 1}' if i >= len(values) else '')
+            rows.append([kind, value, round(rng.random() / 4, 4)])
+    return rows
+
+
+def make_export(n_posts: int, n_days: int = None, seed: int = 0, demographics: int = None) -> bytes:
+    """Return the bytes of an export with n_posts rows in each TOP POSTS block.
+
+    n_days sets the ENGAGEMENT rows (default n_posts). demographics sets
+    the rows per category across every category in DEMOGRAPHIC_VALUES;
+    by default there are only job titles and three locations.
+    """
+    rng = random.Random(seed)
+    n_days = n_days or n_posts
+    start = date(2020, 1, 1)
+
+    workbook = openpyxl.Workbook(write_only=True)
+
+    top = workbook.create_sheet('TOP POSTS')
+    top.append(['Maximum of 50 posts available to include in this list'])
+    top.append([])
+    top.append(['Post URL', 'Post publish date', 'Engagements', None,
+                'Post URL', 'Post publish date', 'Impressions'])
+    for i in range(n_posts):
+        day = (start + timedelta(days=rng.randrange(n_days))).strftime('%m/%d/%Y')
+        url = f'https://www.linkedin.com/feed/update/urn:li:activity:{7000000000000000000 + i}'
+        top.append([url, day, rng.randint(0, 2000), None,
+                    url, day, rng.randint(100, 200000)])
+
+    demo = workbook.create_sheet('DEMOGRAPHICS')
+    demo.append(['Top Demographics', 'Value', 'Percentage'])
+    if demographics is not None:
+        for row in demographic_rows(rng, demographics):
+            demo.append(row)
+    else:
+        for title in JOB_TITLES:
+            demo.append(['Job titles', title, round(rng.random() / 4, 4)])
+        for location in ['Tel Aviv', 'New York', 'London']:
+            demo.append(['Locations', location, round(rng.random() / 4, 4)])
+
+    engagement = workbook.create_sheet('ENGAGEMENT')
+    engagement.append(['Date', 'Impressions', 'Engagements'])
+    for i in range(n_days):
+        day = (start + timedelta(days=i)).strftime('%m/%d/%Y')
+        engagement.append([day, rng.randint(0, 50000), rng.randint(0, 800)])
+
+    out = BytesIO()
+    workbook.save(out)
+    return out.getvalue()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic LinkedIn Content export.")
+    parser.add_argument('n_posts', type=int)
+    parser.add_argument('n_days', type=int, nargs='?')
+    parser.add_argument('demographics', type=int, nargs='?', help="rows per demographic category")
+    parser.add_argument('-o', '--output', required=True)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    with open(args.output, 'wb') as f:
+        f.write(make_export(args.n_posts, args.n_days, args.seed, args.demographics))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,6 @@
+"""
+PostPro core - reusable pieces behind the Streamlit app.
+
+Nothing here imports Streamlit; batch jobs can use the modules directly
+or through the command line (python -m postpro --help).
+"""
@@ -0,0 +1,5 @@
+import sys
+
+from postpro.cli import main
+
+sys.exit(main())
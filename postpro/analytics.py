@@ -0,0 +1,114 @@
+"""
+Columnar engagement analytics for the Dashboard.
+
+The export's daily trends and per-post metrics are turned into typed
+pandas frames once per upload; every derived view (rolling averages,
+engagement rate, weekday heatmap, percentile ranks) is a vectorised
+operation over those columns.
+"""
+
+import numpy as np
+import pandas as pd
+
+WEEKDAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+
+
+def _block(parsed, name: str):
+    """A block as typed columns for a ColumnarExport, else its list of records."""
+    if hasattr(parsed, 'table'):
+        return parsed.table(name)
+    return parsed.get(name, [])
+
+
+def trends_frame(records) -> pd.DataFrame:
+    """Daily trends (records or columns) as a date-indexed frame of int64 columns (missing values are 0)."""
+    frame = pd.DataFrame(records)
+    if frame.empty or 'Date' not in frame.columns:
+        return pd.DataFrame(columns=['Impressions', 'Engagements'], dtype='int64')
+    frame['Date'] = pd.to_datetime(frame['Date'], errors='coerce')
+    frame = frame.dropna(subset=['Date'])
+    metrics = [c for c in frame.columns if c != 'Date']
+    frame[metrics] = frame[metrics].apply(pd.to_numeric, errors='coerce').fillna(0).astype('int64')
+    return frame.groupby('Date', sort=True)[metrics].sum()
+
+
+def posts_frame(parsed: dict) -> pd.DataFrame:
+    """One row per post with engagements and impressions joined by URL."""
+    records = _block(parsed, 'posts')
+    if len(records):
+        frame = pd.DataFrame(records)
+    else:
+        engagement = pd.DataFrame(_block(parsed, 'top_by_engagement'),
+                                  columns=['url', 'date', 'engagements'])
+        impressions = pd.DataFrame(_block(parsed, 'top_by_impressions'),
+                                   columns=['url', 'date', 'impressions'])
+        frame = engagement.merge(impressions, on='url', how='outer', suffixes=('', '_imp'))
+        frame['date'] = frame['date'].fillna(frame.pop('date_imp'))
+    frame['date'] = pd.to_datetime(frame['date'], errors='coerce')
+    for name in ('engagements', 'impressions'):
+        frame[name] = pd.to_numeric(frame[name], errors='coerce').astype('float64')
+    return frame
+
+
+def engagement_rate(engagements, impressions) -> np.ndarray:
+    """engagements / impressions, NaN where impressions are missing or zero."""
+    engagements = np.asarray(engagements, dtype=np.float64)
+    impressions = np.asarray(impressions, dtype=np.float64)
+    out = np.full(engagements.shape, np.nan)
+    np.divide(engagements, impressions, out=out, where=impressions > 0)
+    return out
+
+
+def rolling(trends: pd.DataFrame, windows=(7, 28)) -> pd.DataFrame:
+    """Impressions, engagements, daily engagement rate and their N-day rolling means."""
+    out = trends[['Impressions', 'Engagements']].astype('float64')
+    out['Rate'] = engagement_rate(out['Engagements'], out['Impressions'])
+    for days in windows:
+        window = f'{days}D'
+        out[f'Impressions {days}d'] = out['Impressions'].rolling(window).mean()
+        # Rate over the window is total engagements / total impressions, not a mean of ratios
+        out[f'Rate {days}d'] = engagement_rate(
+            out['Engagements'].rolling(window).sum(), out['Impressions'].rolling(window).sum()
+        )
+    return out
+
+
+def weekday_heatmap(trends: pd.DataFrame, column: str = 'Impressions') -> pd.DataFrame:
+    """Mean of column by weekday (rows) and month (columns).
+
+    The export only has daily granularity, so month stands in for the
+    hour-of-day axis a finer export would allow.
+    """
+    index = trends.index
+    frame = pd.DataFrame({
+        'weekday': index.dayofweek,
+        'month': index.month,
+        'value': trends[column].to_numpy(dtype=np.float64),
+    })
+    table = frame.pivot_table(index='weekday', columns='month', values='value', aggfunc='mean')
+    table = table.reindex(index=range(7), columns=range(1, 13))
+    table.index = WEEKDAYS
+    table.columns = [pd.Timestamp(2000, m, 1).strftime('%b') for m in table.columns]
+    return table
+
+
+def percentile_ranks(posts: pd.DataFrame) -> pd.DataFrame:
+    """Posts with engagement rate and 0-100 percentile ranks of each metric."""
+    out = posts.copy()
+    out['rate'] = engagement_rate(out['engagements'], out['impressions'])
+    for name in ('engagements', 'impressions', 'rate'):
+        out[f'{name}_pct'] = out[name].rank(pct=True, method='max') * 100
+    return out.sort_values('engagements', ascending=False, na_position='last')
+
+
+def dashboard(parsed) -> dict:
+    """Every derived Dashboard frame for one parsed export (a dict or a ColumnarExport)."""
+    trends = trends_frame(_block(parsed, 'trends'))
+    posts = posts_frame(parsed)
+    result = {'trends': trends, 'posts': percentile_ranks(posts)}
+    if {'Impressions', 'Engagements'} <= set(trends.columns) and not trends.empty:
+        result['rolling'] = rolling(trends)
+        result['heatmap'] = weekday_heatmap(trends)
+        weekday = trends['Impressions'].groupby(trends.index.dayofweek).mean()
+        result['weekday'] = weekday.reindex(range(7)).set_axis(WEEKDAYS)
+    return result
@@ -0,0 +1,319 @@
+"""
+DNA analysis: prompt construction and the Gemini round-trip.
+
+The prompt is split into an anchor prefix (instructions + anchor) and a
+draft suffix, so the prefix can be built once and reused across drafts.
+"""
+
+import json
+import threading
+import time
+from concurrent.futures import Future
+from datetime import timedelta
+from functools import lru_cache
+
+from postpro.cache import AnalysisCache, analysis_key
+from postpro.schema import ANALYSIS_SCHEMA, missing_fields_prompt, repair_json, validate
+from postpro.stream import PartialJSONParser
+from postpro.tokens import count_tokens, fit_post, usage
+from postpro.tracing import tracer
+
+MODEL_NAME = 'gemini-2.5-flash'
+# Bump whenever the analysis prompt changes so cached results are not reused
+PROMPT_VERSION = '3'
+# Constrained decoding: Gemini can only emit JSON matching the schema
+GENERATION_CONFIG = {'response_mime_type': 'application/json', 'response_schema': ANALYSIS_SCHEMA}
+
+# Input budgets per post; typical posts are far below, long-form ones get compacted
+ANCHOR_TOKENS = 900
+DRAFT_TOKENS = 1200
+# Gemini refuses explicit context caches below this many tokens. An anchor
+# prefix is the instructions (~150 tokens) plus at most ANCHOR_TOKENS, so
+# only the longest anchors get one; the rest rely on implicit caching
+MIN_CACHE_TOKENS = 1024
+
+PREFIX_TEMPLATE = """You are a strategic LinkedIn editor for a senior executive whose audience is founders, CEOs and executives.
+Judge whether the NEW DRAFT matches the DNA of the ANCHOR POST, which performed well.
+
+Fatal errors: junior-sounding advice; bot speak (delve, landscape, unlock, game-changer, leverage, synergy); walls of text (paragraphs over 3 lines); tone mismatch (formal/casual, story/data).
+Compare: visual physics (line breaks, density, white space, structure); tonal DNA (cynical/optimistic, direct/storytelling, personal/professional); hook geometry (same psychological impact in the first sentence?); authority (same seniority?).
+
+ANCHOR POST:
+{anchor}
+
+---
+
+"""
+
+SUFFIX_TEMPLATE = """NEW DRAFT:
+{draft}
+
+Reply with only this JSON, no markdown:
+{{"score": <0-100>, "verdict": "<one sentence on the main gap>", "risk_level": "<Low|Medium|High>", "analysis": {{"visual_physics": "<brief>", "tonal_dna": "<brief>", "hook_comparison": "<brief>"}}, "fatal_errors": ["<fatal errors, [] if none>"], "fix_suggestions": ["<3 specific, actionable fixes>"], "rewritten_hook": "<first 2-3 lines rewritten in the anchor's style>"}}"""
+
+_RETRYABLE_ERRORS = ('ResourceExhausted', 'ServiceUnavailable', 'DeadlineExceeded',
+                     'InternalServerError', 'TooManyRequests')
+
+# Clients and models are pooled per API key; nothing goes through genai.configure(),
+# whose process-wide key would bill one user's requests to another
+_clients = {}
+_models = {}
+_models_lock = threading.Lock()
+
+
+@lru_cache(maxsize=256)
+def build_prefix(anchor: str) -> str:
+    """Instruction block plus anchor - the part shared by every draft."""
+    return PREFIX_TEMPLATE.format(anchor=fit_post(anchor, ANCHOR_TOKENS))
+
+
+def build_suffix(draft: str) -> str:
+    """Draft section plus the output contract."""
+    return SUFFIX_TEMPLATE.format(draft=fit_post(draft, DRAFT_TOKENS))
+
+
+def build_prompt(anchor: str, draft: str) -> str:
+    """Full analysis prompt for one (anchor, draft) pair."""
+    return build_prefix(anchor) + build_suffix(draft)
+
+
+def get_client(api_key: str, service: str = 'Generative'):
+    """Long-lived API client for one Gemini service, authenticated with api_key only."""
+    from google.ai import generativelanguage as glm
+
+    with _models_lock:
+        client = _clients.get((api_key, service))
+        if client is None:
+            client = getattr(glm, f'{service}ServiceClient')(client_options={'api_key': api_key})
+            _clients[api_key, service] = client
+        return client
+
+
+def _bind(model, api_key: str):
+    # GenerativeModel falls back to the global default client only while _client is unset
+    model._client = get_client(api_key)
+    return model
+
+
+def get_model(api_key: str, model_name: str = MODEL_NAME):
+    """Long-lived GenerativeModel for (api_key, model_name), created on first use."""
+    # The SDK takes about a second to import; only pay for it once Gemini is used
+    import google.generativeai as genai
+
+    with _models_lock:
+        model = _models.get((api_key, model_name))
+    if model is None:
+        model = _bind(genai.GenerativeModel(model_name, generation_config=GENERATION_CONFIG), api_key)
+        with _models_lock:
+            model = _models.setdefault((api_key, model_name), model)
+    return model
+
+
+class ContextCache:
+    """Gemini context caches for anchor prefixes, one per (api_key, anchor).
+
+    Gemini only caches prefixes of at least MIN_CACHE_TOKENS (counted
+    locally), which with the ANCHOR_TOKENS budget means long anchors
+    only. For typical anchors, and whenever the API refuses, we fall back
+    to the local prefix cache and send the full prompt; the input tokens
+    are then only discounted by Gemini's implicit caching of repeated
+    prefixes, which the fixed prefix/suffix order keeps eligible.
+    """
+
+    def __init__(self, ttl: float = 600, min_tokens: int = MIN_CACHE_TOKENS):
+        self.ttl = ttl
+        self.min_tokens = min_tokens
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def model_for(self, api_key: str, anchor: str):
+        """A model bound to the cached anchor prefix, or None."""
+        prefix = build_prefix(anchor)
+        if count_tokens(prefix) < self.min_tokens:
+            return None
+        key = (api_key, prefix)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                future, owner = entry[1], False
+            else:
+                # Refresh a little before the server-side cache expires
+                future, owner = Future(), True
+                self._entries[key] = (now + self.ttl * 0.9, future)
+        if not owner:
+            # Another thread is creating (or created) this cache; other anchors are not held up
+            return future.result()
+        try:
+            import google.generativeai as genai
+
+            # CachedContent.create() only knows the global client, so go through this key's own
+            request = genai.protos.CreateCachedContentRequest(cached_content=genai.protos.CachedContent(
+                model=f"models/{MODEL_NAME}",
+                contents=[genai.protos.Content(role='user', parts=[genai.protos.Part(text=prefix)])],
+                ttl=timedelta(seconds=self.ttl),
+            ))
+            content = get_client(api_key, 'Cache').create_cached_content(request)
+            model = _bind(genai.GenerativeModel(MODEL_NAME, generation_config=GENERATION_CONFIG), api_key)
+            model._cached_content = content.name
+        except Exception:
+            model = None
+        future.set_result(model)
+        return model
+
+
+def is_rate_limit(error: Exception) -> bool:
+    """True for quota / HTTP 429 errors from the API."""
+    text = f"{type(error).__name__} {error}"
+    return 'ResourceExhausted' in text or '429' in text or 'TooManyRequests' in text
+
+
+def is_retryable(error: Exception) -> bool:
+    """True for transient errors worth retrying."""
+    return (is_rate_limit(error) or type(error).__name__ in _RETRYABLE_ERRORS
+            or getattr(error, 'retryable', False))
+
+
+def parse_response(text: str) -> dict:
+    """Decode the model's JSON answer, repairing fences, chatter and truncation."""
+    return repair_json(text)
+
+
+def model_id(model) -> str:
+    """Bare model id of a client or provider, for pricing."""
+    name = getattr(model, 'model', None) or getattr(model, 'name', None) or MODEL_NAME
+    return name.split('/')[-1]
+
+
+def _answered_by(model, default: str) -> str:
+    # A router (see providers.FallbackRouter) is billed as the model that answered
+    answered = getattr(model, 'answered_by', None)
+    return default if answered is None else model_id(answered)
+
+
+def request_usage(model_id: str, prompt: str, result_text: str, response=None,
+                  cached_tokens: int = 0) -> dict:
+    """Token/cost record for one call; the API's own counts win over local estimates."""
+    metadata = getattr(response, 'usage_metadata', None)
+    if metadata is not None and getattr(metadata, 'prompt_token_count', 0):
+        return usage(model_id, metadata.prompt_token_count, metadata.candidates_token_count,
+                     getattr(metadata, 'cached_content_token_count', 0) or 0, measured=True)
+    input_tokens = count_tokens(prompt) + cached_tokens
+    return usage(model_id, input_tokens, count_tokens(result_text), cached_tokens)
+
+
+def complete_result(model, prompt: str, result_text: str) -> dict:
+    """Validated result for a raw answer, re-requesting only fields it lacks.
+
+    Raises json.JSONDecodeError when the answer has no usable JSON at all
+    and ValueError when fields are still missing after one follow-up.
+    """
+    result, missing = validate(parse_response(result_text))
+    if not missing:
+        return result
+    try:
+        extra = parse_response(model.generate_content(missing_fields_prompt(prompt, result, missing)).text)
+    except json.JSONDecodeError:
+        extra = {}
+    result, missing = validate(dict(extra, **result))
+    if missing:
+        raise ValueError(f"AI response is missing {', '.join(missing)}")
+    return result
+
+
+def stream_analysis(anchor: str, draft: str, api_key: str, cache: AnalysisCache = None,
+                    model=None, context_cache: ContextCache = None, linter=None,
+                    stream: bool = True):
+    """Yield the analysis as it is generated.
+
+    Intermediate snapshots hold the top-level fields completed so far and
+    carry "partial": True; the last item is the full result (or an error
+    dict). With stream=False the model is called in one shot and only the
+    final item is yielded.
+
+    model overrides the Gemini client with any provider from
+    postpro.providers (or a FakeGenerativeModel in tests).
+    With a context_cache, the anchor prefix is served from a Gemini context
+    cache when possible and only the draft suffix is sent.
+    With a linter, drafts failing its hard rules are rejected locally
+    ({"error": ..., "gated": True}) without calling the API.
+    Errors come back as {"error": ...}; transient ones are flagged "retryable".
+    """
+    
+    if linter is not None:
+        passed, report = linter.gate(draft)
+        if not passed:
+            hard = [i['message'] for i in report['issues'] if i['severity'] == 'hard']
+            yield {"error": "Blocked by local checks: " + "; ".join(hard), "gated": True,
+                   "issues": report['issues']}
+            return
+    
+    key = analysis_key(anchor, draft, PROMPT_VERSION, getattr(model, 'name', MODEL_NAME))
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+    
+    result_text = ""
+    try:
+        prompt = None
+        cached_tokens = 0
+        if model is None and context_cache is not None:
+            model = context_cache.model_for(api_key, anchor)
+            if model is not None:
+                prompt = build_suffix(draft)
+                cached_tokens = count_tokens(build_prefix(anchor))
+        billed_model = model_id(model)
+        if model is None:
+            model = get_model(api_key)
+        if prompt is None:
+            prompt = build_prompt(anchor, draft)
+        
+        with tracer.span('llm.request', model=billed_model, stream=stream,
+                         **{'prompt.bytes': len(prompt.encode('utf-8'))}) as span:
+            if stream:
+                parser = PartialJSONParser()
+                response = None
+                chunks = model.generate_content(prompt, stream=True)
+                billed_model = _answered_by(model, billed_model)
+                for response in chunks:
+                    text = response.text
+                    result_text += text
+                    if parser.feed(text):
+                        yield dict(parser.fields, partial=True)
+            else:
+                response = model.generate_content(prompt)
+                billed_model = _answered_by(model, billed_model)
+                result_text = response.text
+            span.set(model=billed_model, **{'response.bytes': len(result_text.encode('utf-8'))})
+        
+        with tracer.span('response.parse'):
+            result = complete_result(model, prompt, result_text)
+        if cache is not None:
+            cache.set(key, result)
+        yield dict(result, usage=request_usage(billed_model, prompt, result_text, response, cached_tokens))
+        
+    except json.JSONDecodeError as e:
+        yield {"error": f"Failed to parse AI response: {str(e)}", "raw": result_text}
+    except Exception as e:
+        error = {"error": str(e)}
+        if is_retryable(e):
+            error["retryable"] = True
+            error["rate_limited"] = is_rate_limit(e)
+        yield error
+
+
+def analyze_posts(anchor: str, draft: str, api_key: str, cache: AnalysisCache = None,
+                  model=None, context_cache: ContextCache = None, linter=None) -> dict:
+    """Send anchor and draft to the model (Gemini by default) for comparison analysis.
+
+    Blocking counterpart of stream_analysis, which documents the options.
+    """
+    result = {}
+    with tracer.span('analyze_posts') as span:
+        for result in stream_analysis(anchor, draft, api_key, cache=cache, model=model,
+                                      context_cache=context_cache, linter=linter, stream=False):
+            pass
+        span.set(error='error' in result)
+    return result
@@ -0,0 +1,148 @@
+"""
+Batch scoring: many drafts against one anchor, concurrently.
+
+Calls go through a thread pool capped at a configurable concurrency, are
+paced by a token bucket, and transient failures are retried with jittered
+exponential backoff. Results are yielded as they complete.
+"""
+
+import csv
+import io
+import itertools
+import json
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from postpro.analyzer import analyze_posts
+
+
+class TokenBucket:
+    """Thread-safe token bucket: rate tokens per second, bursting to capacity."""
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def penalize(self, seconds: float):
+        """Push the bucket into debt after a 429 so every worker backs off."""
+        with self._lock:
+            self._tokens = min(self._tokens, 0) - seconds * self.rate
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 30.0) -> float:
+    """Full-jitter exponential backoff for the given retry attempt (0-based)."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+def score_with_retry(anchor: str, draft: str, api_key: str, bucket: TokenBucket = None,
+                     retries: int = 4, base_delay: float = 1.0, **kwargs) -> dict:
+    """analyze_posts with throttling and retry on transient errors."""
+    result = {}
+    for attempt in range(retries + 1):
+        if bucket is not None:
+            bucket.acquire()
+        result = analyze_posts(anchor, draft, api_key, **kwargs)
+        if not result.get("retryable") or attempt == retries:
+            break
+        delay = backoff_delay(attempt, base_delay)
+        if result.get("rate_limited") and bucket is not None:
+            bucket.penalize(delay)
+        time.sleep(delay)
+    result.pop("retryable", None)
+    result.pop("rate_limited", None)
+    return result
+
+
+def score_drafts(anchor: str, drafts: list, api_key: str, concurrency: int = 4,
+                 requests_per_second: float = 2.0, retries: int = 4,
+                 base_delay: float = 1.0, **kwargs):
+    """Yield (index, result) for each draft as soon as its analysis completes.
+
+    Extra keyword arguments (cache, model) are passed to analyze_posts.
+    """
+    jobs = ((i, anchor, draft) for i, draft in enumerate(drafts))
+    yield from score_stream(jobs, api_key, concurrency, requests_per_second, retries,
+                            base_delay, **kwargs)
+
+
+def score_stream(jobs, api_key: str, concurrency: int = 4, requests_per_second: float = 2.0,
+                 retries: int = 4, base_delay: float = 1.0, **kwargs):
+    """Yield (key, result) for an iterable of (key, anchor, draft) jobs.
+
+    Jobs are pulled lazily with at most two per worker in flight, so an
+    input of any length is scored in constant memory. Results come back
+    in completion order.
+    """
+    bucket = TokenBucket(requests_per_second) if requests_per_second else None
+    jobs = iter(jobs)
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        pending = {}
+
+        def fill():
+            for key, anchor, draft in itertools.islice(jobs, 2 * concurrency - len(pending)):
+                future = pool.submit(score_with_retry, anchor, draft, api_key, bucket,
+                                     retries, base_delay, **kwargs)
+                pending[future] = key
+
+        fill()
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future.result()
+            fill()
+
+
+def split_drafts(text: str) -> list:
+    """Split pasted text into drafts separated by lines of '---'."""
+    drafts, current = [], []
+    for line in text.splitlines():
+        if line.strip() == '---':
+            drafts.append('\n'.join(current))
+            current = []
+        else:
+            current.append(line)
+    drafts.append('\n'.join(current))
+    return [d.strip() for d in drafts if d.strip()]
+
+
+def load_drafts(filename: str, data: bytes) -> list:
+    """Drafts from an uploaded CSV or JSONL file.
+
+    CSV uses a 'draft' or 'text' column (else the first column); JSONL rows
+    may be strings or objects with a 'draft' or 'text' field.
+    """
+    text = data.decode('utf-8-sig')
+    drafts = []
+    if filename.lower().endswith('.jsonl'):
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            if isinstance(row, dict):
+                row = row.get('draft') or row.get('text') or ''
+            drafts.append(str(row))
+    else:
+        reader = csv.DictReader(io.StringIO(text))
+        fields = reader.fieldnames or []
+        column = next((f for f in fields if f.strip().lower() in ('draft', 'text')), fields[0] if fields else None)
+        if column is not None:
+            drafts = [row[column] or '' for row in reader]
+    return [d.strip() for d in drafts if d and d.strip()]
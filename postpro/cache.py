@@ -0,0 +1,229 @@
+"""
+Content-addressed result cache for DNA analyses.
+
+Two tiers: a small in-memory LRU in front of a SQLite table on disk.
+Entries are keyed by a hash of everything that can change the model's
+answer, so a repeated (anchor, draft) pair never hits the API twice.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def default_cache_dir() -> str:
+    """Directory for on-disk caches (override with POSTPRO_CACHE_DIR)."""
+    path = os.environ.get("POSTPRO_CACHE_DIR") or os.path.join(
+        os.path.expanduser("~"), ".cache", "postpro"
+    )
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def analysis_key(anchor: str, draft: str, prompt_version: str, model_name: str) -> str:
+    """Stable SHA-256 key for one analysis request."""
+    payload = json.dumps([prompt_version, model_name, anchor, draft], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class AnalysisCache:
+    """LRU memory tier backed by a SQLite tier with TTL and size eviction."""
+
+    def __init__(self, path: str = None, max_memory: int = 256,
+                 max_disk: int = 5000, ttl: float = 7 * 24 * 3600):
+        self.max_memory = max_memory
+        self.max_disk = max_disk
+        self.ttl = ttl
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results(accessed)")
+            self._db.commit()
+
+    def get(self, key: str):
+        """Return the cached result for key, or None."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created, value = entry
+                if now - created <= self.ttl:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, created FROM results WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    if now - row[1] <= self.ttl:
+                        self._db.execute("UPDATE results SET accessed = ? WHERE key = ?", (now, key))
+                        self._db.commit()
+                        value = json.loads(row[0])
+                        self._remember(key, row[1], value)
+                        self.hits += 1
+                        self.disk_hits += 1
+                        return value
+                    self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+                    self._db.commit()
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: dict):
+        """Store a result in both tiers."""
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, value)
+            if self._db is None:
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now, now),
+            )
+            self._evict_disk(now)
+            self._db.commit()
+
+    def clear(self):
+        """Drop every cached entry."""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+
+    def stats(self) -> dict:
+        """Hit/miss counters and tier sizes."""
+        with self._lock:
+            disk_size = 0
+            if self._db is not None:
+                disk_size = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "hit_rate": self.hits / total if total else 0.0,
+                "memory_entries": len(self._memory),
+                "disk_entries": disk_size,
+            }
+
+    def _remember(self, key, created, value):
+        self._memory[key] = (created, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self, now):
+        self._db.execute("DELETE FROM results WHERE created < ?", (now - self.ttl,))
+        count = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        if count > self.max_disk:
+            self._db.execute(
+                "DELETE FROM results WHERE key IN ("
+                "SELECT key FROM results ORDER BY accessed ASC LIMIT ?)",
+                (count - self.max_disk,),
+            )
+
+
+def upload_digest(data: bytes) -> str:
+    """SHA-256 of an uploaded file's bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+class ExportCache:
+    """Parsed exports keyed by upload digest, shared by every session.
+
+    Exports are held as compact ColumnarExports (see postpro.columnar),
+    bounded by a byte budget with LRU eviction. When a directory is given,
+    each export is also saved there and reopened memory-mapped, so an
+    evicted export or a restarted server skips the parse and worker
+    processes share the same pages.
+    """
+
+    def __init__(self, path: str = None, max_bytes: int = 256 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._memory = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if path:
+            os.makedirs(path, exist_ok=True)
+
+    def get(self, digest: str):
+        """Return the ColumnarExport for digest, or None."""
+        with self._lock:
+            entry = self._memory.get(digest)
+            if entry is not None:
+                self._memory.move_to_end(digest)
+                self.hits += 1
+                return entry
+        export = self._load(digest)
+        with self._lock:
+            if export is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return self._remember(digest, export)
+
+    def set(self, digest: str, parsed):
+        """Store a successfully parsed export; returns its shared ColumnarExport."""
+        from postpro.columnar import compact
+
+        export = compact(parsed)
+        if self.path:
+            export.save(self._target(digest))
+            export = self._load(digest) or export
+        with self._lock:
+            return self._remember(digest, export)
+
+    def stats(self) -> dict:
+        """Hit/miss counters and memory use."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._memory),
+                "bytes": self._bytes,
+            }
+
+    def _remember(self, digest, export):
+        # Another session may have stored the same digest first; keep one copy
+        current = self._memory.get(digest)
+        if current is not None:
+            self._memory.move_to_end(digest)
+            return current
+        self._memory[digest] = export
+        self._bytes += export.nbytes
+        while self._bytes > self.max_bytes and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last=False)
+            self._bytes -= evicted.nbytes
+        return export
+
+    def _target(self, digest):
+        return os.path.join(self.path, f"{digest}.columns")
+
+    def _load(self, digest):
+        if not self.path:
+            return None
+        from postpro.columnar import ColumnarExport
+
+        return ColumnarExport.load(self._target(digest))
@@ -0,0 +1,217 @@
+"""
+Command-line interface: score drafts and parse exports without a browser.
+
+    python -m postpro score drafts.jsonl -o results.jsonl --anchor-file best.txt --workers 8
+    python -m postpro parse Content_export.xlsx > export.json
+
+Drafts are read as a stream (one JSON string, or an object with "draft"
+or "text" and optionally "id" and "anchor", per line) and every result
+is appended to the output as soon as it completes. The output doubles as
+the checkpoint: rerunning the same command skips drafts that already have
+a result and retries the ones that failed, keeping one line per id.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from postpro.batch import score_stream
+from postpro.cache import AnalysisCache, default_cache_dir
+from postpro.ingest import parse_linkedin_xlsx
+from postpro.lint import default_linter
+from postpro.providers import PROVIDERS, get_provider
+from postpro.tokens import total_usage
+from postpro.tracing import tracer
+
+KEY_VARIABLES = {'gemini': ('GEMINI_API_KEY', 'GOOGLE_API_KEY'), 'openai': ('OPENAI_API_KEY',)}
+
+
+def load_results(path: str):
+    """(ids with a successful result, {id: failure line}) from a previous run's output.
+
+    The file is compacted to the last successful line per id. Failures
+    are taken out of it: the caller retries them and writes back the ones
+    it did not get to. A torn last line (the previous run was killed
+    mid-write) is cut off.
+    """
+    done, failed = set(), {}
+    if not os.path.exists(path):
+        return done, failed
+    with open(path, 'rb') as f:
+        data = f.read()
+    end = data.rfind(b'\n') + 1
+    lines = data[:end].decode('utf-8').splitlines()
+    kept = {}
+    for number, line in enumerate(lines):
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if not isinstance(row, dict) or 'id' not in row:
+            kept[None, number] = line
+        elif 'error' in row:
+            if row['id'] not in done:
+                failed[row['id']] = line
+        else:
+            done.add(row['id'])
+            failed.pop(row['id'], None)
+            kept.pop(row['id'], None)
+            kept[row['id']] = line
+    if end < len(data) or len(kept) < len(lines):
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.writelines(line + '\n' for line in kept.values())
+        os.replace(tmp, path)
+    return done, failed
+
+
+def read_jobs(lines, anchor: str, done: set, reject):
+    """(id, anchor, draft) for each input line whose id is not in done yet; bad lines go to reject(id, message)."""
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            reject(number, f"Invalid JSON on line {number}: {e}")
+            continue
+        if not isinstance(row, dict):
+            row = {'draft': row}
+        job_id = row.get('id', number)
+        if job_id in done:
+            continue
+        # A repeated id in the input would write a second line for it
+        done.add(job_id)
+        draft = str(row.get('draft') or row.get('text') or '').strip()
+        job_anchor = row.get('anchor') or anchor
+        if not draft:
+            reject(job_id, "No draft text")
+        elif not job_anchor:
+            reject(job_id, "No anchor: pass --anchor/--anchor-file or an \"anchor\" field")
+        else:
+            yield job_id, job_anchor, draft
+
+
+def _api_key(args) -> str:
+    if args.api_key:
+        return args.api_key
+    for name in ('POSTPRO_API_KEY',) + KEY_VARIABLES.get(args.backend, ()):
+        if os.environ.get(name):
+            return os.environ[name]
+    return ''
+
+
+def score(args) -> int:
+    anchor = args.anchor
+    if args.anchor_file:
+        with open(args.anchor_file, encoding='utf-8') as f:
+            anchor = f.read().strip()
+
+    api_key = _api_key(args)
+    model = get_provider(args.backend, api_key, args.model, args.base_url, escalate_to=args.escalate_to)
+    if model.needs_key and not api_key:
+        print(f"No API key for {args.backend}: pass --api-key or set "
+              + " / ".join(('POSTPRO_API_KEY',) + KEY_VARIABLES.get(args.backend, ())), file=sys.stderr)
+        return 2
+    cache = None if args.no_cache else AnalysisCache(os.path.join(default_cache_dir(), 'analysis.sqlite'))
+    linter = default_linter() if args.lint else None
+
+    to_stdout = args.output == '-'
+    done, failed = (set(), {}) if to_stdout or args.restart else load_results(args.output)
+    resumed = len(done)
+    if args.restart and not to_stdout and os.path.exists(args.output):
+        os.remove(args.output)
+    source = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8-sig')
+    out = sys.stdout if to_stdout else open(args.output, 'a', encoding='utf-8')
+
+    counts = {'scored': 0, 'errors': 0}
+    usages = []
+    start = time.monotonic()
+
+    def write(job_id, result):
+        failed.pop(job_id, None)
+        out.write(json.dumps(dict({'id': job_id}, **result), ensure_ascii=False, default=str) + '\n')
+        out.flush()
+        counts['errors' if 'error' in result else 'scored'] += 1
+        usages.append(result.get('usage'))
+        n = counts['scored'] + counts['errors']
+        if args.progress and n % args.progress == 0:
+            print(f"{n} done ({n / (time.monotonic() - start):.1f}/s)", file=sys.stderr)
+
+    try:
+        jobs = read_jobs(source, anchor, done, lambda job_id, message: write(job_id, {'error': message}))
+        for job_id, result in score_stream(jobs, api_key, concurrency=args.workers,
+                                           requests_per_second=args.rps, retries=args.retries,
+                                           cache=cache, model=model, linter=linter):
+            write(job_id, result)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if out is not sys.stdout:
+            # Failures from earlier runs that were not retried this time
+            out.writelines(line + '\n' for line in failed.values())
+            out.close()
+
+    totals = total_usage(usages)
+    print(f"{counts['scored']} scored, {counts['errors']} failed, {resumed} already done "
+          f"in {time.monotonic() - start:.1f}s · {totals['input_tokens'] + totals['output_tokens']:,} tokens"
+          f" · ${totals['cost_usd']:.4f}", file=sys.stderr)
+    return 1 if counts['errors'] else 0
+
+
+def parse(args) -> int:
+    with open(args.export, 'rb') as f:
+        parsed = parse_linkedin_xlsx(f)
+    text = json.dumps(parsed, ensure_ascii=False, default=str, indent=args.indent)
+    if args.output == '-':
+        print(text)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    if 'error' in parsed:
+        print(f"Could not parse {args.export}: {parsed['error']}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='postpro', description=__doc__.split('\n\n')[0].strip())
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    p = commands.add_parser('score', help='score a JSONL file of drafts against an anchor post')
+    p.add_argument('input', help="drafts, one JSON value per line ('-' for stdin)")
+    p.add_argument('-o', '--output', required=True, help="results JSONL, appended to ('-' for stdout)")
+    anchor = p.add_mutually_exclusive_group()
+    anchor.add_argument('--anchor', help='anchor post text')
+    anchor.add_argument('--anchor-file', help='file holding the anchor post')
+    p.add_argument('--backend', choices=PROVIDERS, default='gemini')
+    p.add_argument('--model', help="model name (backend default if omitted)")
+    p.add_argument('--base-url', help='endpoint for openai/ollama backends')
+    p.add_argument('--escalate-to', help='stronger model for uncertain results')
+    p.add_argument('--api-key', help='API key (default: POSTPRO_API_KEY or the backend\'s usual variable)')
+    p.add_argument('-w', '--workers', type=int, default=4, help='parallel requests (default: 4)')
+    p.add_argument('--rps', type=float, default=2.0, help='requests per second, 0 for unlimited (default: 2)')
+    p.add_argument('--retries', type=int, default=4, help='retries on rate limits and 5xx (default: 4)')
+    p.add_argument('--lint', action='store_true', help='reject drafts failing the local hard rules without a request')
+    p.add_argument('--no-cache', action='store_true', help='skip the on-disk result cache')
+    p.add_argument('--restart', action='store_true', help='discard previous results instead of resuming')
+    p.add_argument('--progress', type=int, default=0, metavar='N', help='report progress every N drafts')
+    p.set_defaults(run=score)
+
+    p = commands.add_parser('parse', help='parse a LinkedIn Content export to JSON')
+    p.add_argument('export', help='the exported .xlsx file')
+    p.add_argument('-o', '--output', default='-', help="JSON output (default: stdout)")
+    p.add_argument('--indent', type=int, default=None)
+    p.set_defaults(run=parse)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return args.run(args)
+    finally:
+        if tracer.exporter is not None:
+            tracer.exporter.flush()
@@ -0,0 +1,240 @@
+"""
+Compact, read-only columnar form of a parsed export.
+
+parse_linkedin_xlsx() returns lists of dicts, which cost a few hundred
+bytes per row. ColumnarExport keeps each block as typed NumPy columns
+instead:
+- dates as int32 days since 1970
+- counts as int32 (int64 if they overflow), with a sentinel for missing
+- fractions as float64
+- every string (URLs, demographic values) as an int32 code into one
+  UTF-8 dictionary shared by all blocks
+
+A saved export is a directory of .npy files that loads memory-mapped, so
+every session, and every worker process on the host, shares the same
+pages. It still answers the parsed-export dict interface
+(["top_by_engagement"], .get("trends")), building records only when
+asked; table() hands the columns to pandas without that detour.
+"""
+
+import json
+import os
+import re
+import shutil
+import threading
+from datetime import date, datetime
+
+import numpy as np
+
+FORMAT_VERSION = 1
+MISSING_INT = np.iinfo(np.int32).min
+_EPOCH = date(1970, 1, 1).toordinal()
+_ISO_DAY = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+
+def _kind(values: list) -> str:
+    present = [v for v in values if v is not None]
+    if not present:
+        return 'int'
+    if all(isinstance(v, (date, datetime)) for v in present):
+        return 'date'
+    if all(isinstance(v, str) for v in present):
+        return 'date' if all(_ISO_DAY.match(v) for v in present) else 'str'
+    if all(isinstance(v, int) and not isinstance(v, bool) for v in present):
+        return 'int'
+    if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present):
+        return 'float'
+    return 'str'
+
+
+def _day_number(value) -> int:
+    if value is None:
+        return MISSING_INT
+    if isinstance(value, str):
+        value = date.fromisoformat(value)
+    elif isinstance(value, datetime):
+        value = value.date()
+    return value.toordinal() - _EPOCH
+
+
+class _Strings:
+    """Builds the shared string dictionary while encoding."""
+
+    def __init__(self):
+        self.codes = {}
+
+    def encode(self, values: list) -> np.ndarray:
+        return np.fromiter(
+            (-1 if v is None else self.codes.setdefault(str(v), len(self.codes)) for v in values),
+            dtype=np.int32, count=len(values),
+        )
+
+    def arrays(self):
+        blobs = [s.encode('utf-8') for s in self.codes]
+        offsets = np.zeros(len(blobs) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in blobs], out=offsets[1:])
+        return np.frombuffer(b''.join(blobs), dtype=np.uint8).copy(), offsets
+
+
+class ColumnarExport:
+    """One parsed export as typed columns; build with compact() or load()."""
+
+    __slots__ = ('schema', 'columns', 'string_data', 'string_offsets', '_decoded', '_lock')
+
+    def __init__(self, schema: dict, columns: dict, string_data: np.ndarray, string_offsets: np.ndarray):
+        self.schema = schema
+        self.columns = columns
+        self.string_data = string_data
+        self.string_offsets = string_offsets
+        self._decoded = None
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the arrays (mapped from disk when loaded with mmap)."""
+        return (sum(a.nbytes for a in self.columns.values())
+                + self.string_data.nbytes + self.string_offsets.nbytes)
+
+    def strings(self) -> list:
+        """The string dictionary, decoded once on first use."""
+        if self._decoded is None:
+            with self._lock:
+                if self._decoded is None:
+                    data = self.string_data.tobytes()
+                    offsets = self.string_offsets.tolist()
+                    self._decoded = [data[a:b].decode('utf-8') for a, b in zip(offsets, offsets[1:])]
+        return self._decoded
+
+    def __len__(self):
+        return len(self.schema)
+
+    def __iter__(self):
+        return iter(self.schema)
+
+    def keys(self):
+        return self.schema.keys()
+
+    def __contains__(self, block):
+        return block in self.schema
+
+    def __getitem__(self, block) -> list:
+        if block not in self.schema:
+            raise KeyError(block)
+        return self.records(block)
+
+    def get(self, block, default=None):
+        return self.records(block) if block in self.schema else default
+
+    def rows(self, block: str) -> int:
+        return self.schema[block]['rows']
+
+    def records(self, block: str, limit: int = None) -> list:
+        """Rows of block as dicts, exactly as parse_linkedin_xlsx() returned them."""
+        n = self.rows(block) if limit is None else min(limit, self.rows(block))
+        strings = None
+        decoded = {}
+        for name, kind in self.schema[block]['columns']:
+            values = self.columns[f'{block}.{name}'][:n].tolist()
+            if kind == 'str':
+                strings = strings or self.strings()
+                values = [None if v < 0 else strings[v] for v in values]
+            elif kind == 'date':
+                values = [None if v == MISSING_INT else date.fromordinal(v + _EPOCH) for v in values]
+            elif kind == 'int':
+                values = [None if v == MISSING_INT else v for v in values]
+            elif kind == 'float':
+                values = [None if v != v else v for v in values]
+            decoded[name] = values
+        names = list(decoded)
+        return [dict(zip(names, row)) for row in zip(*decoded.values())]
+
+    def table(self, block: str) -> dict:
+        """Columns of block ready for pandas.
+
+        Dates become datetime64[D], strings object arrays, and integer
+        columns with missing values float64 with NaN. Arrays without missing
+        values are returned as they are stored (views of the mapped file).
+        """
+        if block not in self.schema:
+            return {}
+        out = {}
+        for name, kind in self.schema[block]['columns']:
+            column = self.columns[f'{block}.{name}']
+            if kind == 'str':
+                strings = self.strings()
+                out[name] = np.array([None if v < 0 else strings[v] for v in column.tolist()], dtype=object)
+            elif kind in ('date', 'int'):
+                missing = column == MISSING_INT
+                if kind == 'date':
+                    days = column.astype('datetime64[D]')
+                    out[name] = np.where(missing, np.datetime64('NaT'), days) if missing.any() else days
+                else:
+                    out[name] = np.where(missing, np.nan, column) if missing.any() else column
+            else:
+                out[name] = column
+        return out
+
+    def save(self, path: str):
+        """Write to the directory path atomically (a no-op if it exists)."""
+        if os.path.isdir(path):
+            return
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        os.makedirs(tmp, exist_ok=True)
+        for name, column in self.columns.items():
+            np.save(os.path.join(tmp, f'{name}.npy'), column)
+        np.save(os.path.join(tmp, '_strings.data.npy'), self.string_data)
+        np.save(os.path.join(tmp, '_strings.offsets.npy'), self.string_offsets)
+        with open(os.path.join(tmp, 'schema.json'), 'w', encoding='utf-8') as f:
+            json.dump({'version': FORMAT_VERSION, 'blocks': self.schema}, f)
+        try:
+            os.rename(tmp, path)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True):
+        """Open a saved export, memory-mapped by default; None if missing or from another version."""
+        try:
+            with open(os.path.join(path, 'schema.json'), encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get('version') != FORMAT_VERSION:
+            return None
+        mode = 'r' if mmap else None
+        load = lambda name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mode)
+        schema = meta['blocks']
+        columns = {f'{block}.{name}': load(f'{block}.{name}')
+                   for block, spec in schema.items() for name, _ in spec['columns']}
+        return cls(schema, columns, load('_strings.data'), load('_strings.offsets'))
+
+
+def compact(parsed: dict) -> ColumnarExport:
+    """ColumnarExport of a parsed export (one from parse_linkedin_xlsx() or ExportStore.merged())."""
+    if isinstance(parsed, ColumnarExport):
+        return parsed
+    strings = _Strings()
+    schema, columns = {}, {}
+    for block, records in parsed.items():
+        if not isinstance(records, list):
+            continue
+        names = list(dict.fromkeys(name for record in records for name in record))
+        spec = []
+        for name in names:
+            values = [record.get(name) for record in records]
+            kind = _kind(values)
+            if kind == 'str':
+                column = strings.encode(values)
+            elif kind == 'date':
+                column = np.array([_day_number(v) for v in values], dtype=np.int32)
+            elif kind == 'float':
+                column = np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+            else:
+                ints = [MISSING_INT if v is None else v for v in values]
+                fits = all(MISSING_INT < v <= np.iinfo(np.int32).max for v in ints if v != MISSING_INT)
+                column = np.array(ints, dtype=np.int32 if fits else np.int64)
+            spec.append([name, kind])
+            columns[f'{block}.{name}'] = column
+        schema[block] = {'rows': len(records), 'columns': spec}
+    data, offsets = strings.arrays()
+    return ColumnarExport(schema, columns, data, offsets)
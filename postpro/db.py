@@ -0,0 +1,58 @@
+"""
+Pooled SQLite connections in WAL mode.
+
+WAL lets the Streamlit sessions read while one of them writes; the pool
+hands each thread an already-configured connection instead of paying the
+connect/PRAGMA cost on every rerun.
+"""
+
+import queue
+import sqlite3
+from contextlib import contextmanager
+
+
+class ConnectionPool:
+    """Fixed-size pool of SQLite connections to one database file."""
+
+    def __init__(self, path: str, size: int = 4, timeout: float = 30.0):
+        self.path = path
+        self.timeout = timeout
+        self._pool = queue.LifoQueue(maxsize=size)
+        for _ in range(size):
+            self._pool.put(self._connect())
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False,
+                               isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection (autocommit mode) for the duration of the block."""
+        conn = self._pool.get(timeout=self.timeout)
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._pool.put(conn)
+
+    @contextmanager
+    def transaction(self):
+        """Borrow a connection inside BEGIN IMMEDIATE ... COMMIT."""
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+
+    def close(self):
+        while not self._pool.empty():
+            self._pool.get_nowait().close()
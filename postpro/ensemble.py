@@ -0,0 +1,84 @@
+"""
+Multi-anchor ensemble scoring.
+
+A draft is scored against several anchors in parallel and the per-anchor
+scores are combined into a weighted mean with its spread, so one noisy
+anchor can't swing the verdict.
+"""
+
+import math
+from concurrent.futures import ThreadPoolExecutor
+
+from postpro.batch import TokenBucket, score_with_retry
+from postpro.tokens import total_usage
+
+
+def combine_scores(results: list, weights: list = None) -> dict:
+    """Weighted mean, standard deviation and range of successful scores."""
+    scored = [
+        (float(r['score']), w)
+        for r, w in zip(results, weights or [1.0] * len(results))
+        if 'error' not in r and isinstance(r.get('score'), (int, float))
+    ]
+    if not scored:
+        return {"error": "No anchor produced a score"}
+    total = sum(w for _, w in scored) or len(scored)
+    mean = sum(s * w for s, w in scored) / total
+    variance = sum(w * (s - mean) ** 2 for s, w in scored) / total
+    scores = [s for s, _ in scored]
+    return {
+        "score": round(mean, 1),
+        "stdev": round(math.sqrt(variance), 1),
+        "variance": round(variance, 1),
+        "min": min(scores),
+        "max": max(scores),
+        "n": len(scored),
+    }
+
+
+def score_ensemble(draft: str, anchors: list, api_key: str, weights: list = None,
+                   requests_per_second: float = None, scheduler=None, session: str = '',
+                   **kwargs) -> dict:
+    """Score draft against every anchor concurrently and combine the results.
+
+    weights (e.g. each anchor's engagements) bias the mean toward stronger
+    anchors. Extra keyword arguments go to analyze_posts; pass a shared
+    context_cache to reuse each anchor's prompt prefix across drafts.
+    With a scheduler (postpro.scheduler), the calls are queued there under
+    session instead of running on a private pool.
+    The combined result carries the weakest anchor's verdict, risk and
+    suggestions, since that is the gap worth fixing first.
+    """
+    if not anchors:
+        return {"error": "No anchors to score against"}
+    if scheduler is not None:
+        jobs = [scheduler.submit_analysis(anchor, draft, api_key, session, stream=False, **kwargs)
+                for anchor in anchors]
+        results = [job.result() for job in jobs]
+    else:
+        bucket = TokenBucket(requests_per_second) if requests_per_second else None
+        with ThreadPoolExecutor(max_workers=len(anchors)) as pool:
+            futures = [
+                pool.submit(score_with_retry, anchor, draft, api_key, bucket, **kwargs)
+                for anchor in anchors
+            ]
+            results = [f.result() for f in futures]
+
+    combined = combine_scores(results, weights)
+    if "error" in combined:
+        errors = [r['error'] for r in results if 'error' in r]
+        if errors:
+            combined["error"] = errors[0]
+        return combined
+
+    weakest = min((r for r in results if 'error' not in r), key=lambda r: r.get('score', 0))
+    score = combined["score"]
+    combined.update({
+        "risk_level": 'Low' if score >= 70 else 'Medium' if score >= 40 else 'High',
+        "verdict": weakest.get('verdict', ''),
+        "fix_suggestions": weakest.get('fix_suggestions', []),
+        "rewritten_hook": weakest.get('rewritten_hook', ''),
+        "anchors": results,
+        "usage": total_usage(r.get('usage') for r in results),
+    })
+    return combined
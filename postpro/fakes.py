@@ -0,0 +1,81 @@
+"""
+Local stand-ins for the Gemini client, for tests and benchmarks.
+"""
+
+import hashlib
+import json
+import threading
+import time
+
+
+class FakeRateLimitError(Exception):
+    """Mimics google.api_core's ResourceExhausted (HTTP 429)."""
+
+    def __init__(self, message="429 Resource has been exhausted (e.g. check quota)."):
+        super().__init__(message)
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    """Deterministic drop-in for genai.GenerativeModel.
+
+    The score is derived from a hash of the prompt, so the same (anchor, draft)
+    always scores the same. latency simulates time to first token,
+    chars_per_second the generation speed (0 = instant), and
+    rate_limit_every makes every Nth call fail with a 429.
+    generate_content(..., stream=True) yields the answer in chunk_size pieces.
+    """
+
+    def __init__(self, latency: float = 0.0, rate_limit_every: int = 0,
+                 chars_per_second: float = 0.0, chunk_size: int = 16):
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.chars_per_second = chars_per_second
+        self.chunk_size = chunk_size
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt, stream: bool = False, **kwargs):
+        with self._lock:
+            self.calls += 1
+            calls = self.calls
+        if self.latency:
+            time.sleep(self.latency)
+        if self.rate_limit_every and calls % self.rate_limit_every == 0:
+            raise FakeRateLimitError()
+        text = json.dumps(fake_result(prompt), indent=2)
+        if stream:
+            return self._stream(text)
+        if self.chars_per_second:
+            time.sleep(len(text) / self.chars_per_second)
+        return FakeResponse(text)
+
+    def _stream(self, text):
+        for i in range(0, len(text), self.chunk_size):
+            chunk = text[i:i + self.chunk_size]
+            if self.chars_per_second:
+                time.sleep(len(chunk) / self.chars_per_second)
+            yield FakeResponse(chunk)
+
+
+def fake_result(prompt: str) -> dict:
+    """A well-formed analysis whose score is a stable function of prompt."""
+    score = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8], 16) % 101
+    risk = "Low" if score >= 70 else "Medium" if score >= 40 else "High"
+    return {
+        "score": score,
+        "verdict": f"Fake verdict for a {risk.lower()}-risk draft.",
+        "risk_level": risk,
+        "analysis": {
+            "visual_physics": "Fake visual assessment.",
+            "tonal_dna": "Fake tonal assessment.",
+            "hook_comparison": "Fake hook assessment.",
+        },
+        "fatal_errors": [],
+        "fix_suggestions": ["Fake suggestion 1", "Fake suggestion 2", "Fake suggestion 3"],
+        "rewritten_hook": "A fake hook.",
+    }
@@ -0,0 +1,184 @@
+"""
+Durable analysis history with running aggregates.
+
+Every analysis is appended to SQLite under its owner (the workspace or
+session it came from), and every read is scoped to one owner. Count,
+score sum and the score-band histogram are kept in a per-owner totals
+row plus a per-owner, per-day rollup, each updated in O(1) inside the
+same transaction as the append, so reading the dashboard never scans
+the history.
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import date, datetime, timedelta
+
+from postpro.db import ConnectionPool
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY,
+    owner TEXT NOT NULL DEFAULT '',
+    score REAL NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS history_owner ON history (owner, id);
+CREATE TABLE IF NOT EXISTS owner_totals (
+    owner TEXT PRIMARY KEY,
+    count INTEGER NOT NULL,
+    total REAL NOT NULL,
+    high INTEGER NOT NULL,
+    medium INTEGER NOT NULL,
+    low INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS owner_daily (
+    owner TEXT NOT NULL,
+    day TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    total REAL NOT NULL,
+    high INTEGER NOT NULL,
+    medium INTEGER NOT NULL,
+    low INTEGER NOT NULL,
+    PRIMARY KEY (owner, day)
+);
+"""
+
+# Databases from before history was scoped: every old score goes to owner ''
+MIGRATION = """
+ALTER TABLE history ADD COLUMN owner TEXT NOT NULL DEFAULT '';
+DROP TABLE IF EXISTS totals;
+DROP TABLE IF EXISTS daily;
+"""
+
+BANDS = ('high', 'medium', 'low')
+
+
+def score_band(score: float) -> str:
+    """'high' for 70+, 'medium' for 40-70, 'low' below 40."""
+    return 'high' if score >= 70 else 'medium' if score >= 40 else 'low'
+
+
+def _summary(count: int, total: float, high: int, medium: int, low: int) -> dict:
+    return {
+        'count': count,
+        'mean': total / count if count else 0.0,
+        'high': high,
+        'medium': medium,
+        'low': low,
+    }
+
+
+class HistoryStore:
+    """Append-only score history with O(1) totals and a bounded recent tail per owner."""
+
+    def __init__(self, path: str, tail: int = 200, max_owners: int = 1024):
+        self.pool = ConnectionPool(path, size=2)
+        self.tail_size = tail
+        self.max_owners = max_owners
+        self._lock = threading.Lock()
+        self._owners = OrderedDict()
+        with self.pool.transaction() as conn:
+            columns = [r['name'] for r in conn.execute("PRAGMA table_info(history)")]
+            if columns and 'owner' not in columns:
+                for statement in MIGRATION.strip().split(';\n'):
+                    conn.execute(statement.rstrip(';'))
+            for statement in SCHEMA.strip().split(';\n'):
+                conn.execute(statement.rstrip(';'))
+            if columns and 'owner' not in columns:
+                self._rebuild(conn)
+
+    def _rebuild(self, conn):
+        conn.execute(
+            "INSERT INTO owner_totals SELECT owner, COUNT(*), SUM(score), "
+            "SUM(score >= 70), SUM(score >= 40 AND score < 70), SUM(score < 40) FROM history GROUP BY owner"
+        )
+        conn.execute(
+            "INSERT INTO owner_daily SELECT owner, date(created, 'unixepoch', 'localtime'), COUNT(*), SUM(score), "
+            "SUM(score >= 70), SUM(score >= 40 AND score < 70), SUM(score < 40) FROM history GROUP BY 1, 2"
+        )
+
+    def _state(self, owner: str):
+        """[totals, tail] for owner, loaded on first use; call with the lock held."""
+        state = self._owners.get(owner)
+        if state is not None:
+            self._owners.move_to_end(owner)
+            return state
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                "SELECT count, total, high, medium, low FROM owner_totals WHERE owner = ?", (owner,)
+            ).fetchone()
+            recent = conn.execute(
+                "SELECT score, created FROM history WHERE owner = ? ORDER BY id DESC LIMIT ?",
+                (owner, self.tail_size),
+            ).fetchall()
+        state = [
+            list(row) if row else [0, 0.0, 0, 0, 0],
+            deque(({'score': r['score'], 'timestamp': r['created']} for r in reversed(recent)),
+                  maxlen=self.tail_size),
+        ]
+        self._owners[owner] = state
+        while len(self._owners) > self.max_owners:
+            self._owners.popitem(last=False)
+        return state
+
+    def append(self, score: float, created: float = None, owner: str = ''):
+        """Record one analysis score for owner."""
+        created = time.time() if created is None else created
+        band = score_band(score)
+        flags = [int(band == b) for b in BANDS]
+        day = datetime.fromtimestamp(created).date().isoformat()
+        with self._lock:
+            totals, tail = self._state(owner)
+            with self.pool.transaction() as conn:
+                conn.execute("INSERT INTO history (owner, score, created) VALUES (?, ?, ?)",
+                             (owner, score, created))
+                conn.execute(
+                    "INSERT INTO owner_totals VALUES (?, 1, ?, ?, ?, ?) ON CONFLICT(owner) DO UPDATE SET "
+                    "count = count + 1, total = total + excluded.total, high = high + excluded.high, "
+                    "medium = medium + excluded.medium, low = low + excluded.low",
+                    (owner, score, *flags),
+                )
+                conn.execute(
+                    "INSERT INTO owner_daily VALUES (?, ?, 1, ?, ?, ?, ?) ON CONFLICT(owner, day) DO UPDATE SET "
+                    "count = count + 1, total = total + excluded.total, high = high + excluded.high, "
+                    "medium = medium + excluded.medium, low = low + excluded.low",
+                    (owner, day, score, *flags),
+                )
+            totals[0] += 1
+            totals[1] += score
+            for i, flag in enumerate(flags, 2):
+                totals[i] += flag
+            tail.append({'score': score, 'timestamp': created})
+
+    def summary(self, owner: str = '') -> dict:
+        """All-time count, mean and band counts for owner."""
+        with self._lock:
+            return _summary(*self._state(owner)[0])
+
+    def window(self, days: int, today: date = None, owner: str = '') -> dict:
+        """Count, mean and band counts over the last `days` days (including today)."""
+        today = today or date.today()
+        since = (today - timedelta(days=days - 1)).isoformat()
+        with self.pool.connection() as conn:
+            row = conn.execute(
+                "SELECT COALESCE(SUM(count), 0), COALESCE(SUM(total), 0), COALESCE(SUM(high), 0), "
+                "COALESCE(SUM(medium), 0), COALESCE(SUM(low), 0) FROM owner_daily WHERE owner = ? AND day >= ?",
+                (owner, since),
+            ).fetchone()
+        return _summary(*row)
+
+    def daily(self, days: int = 30, owner: str = '') -> list:
+        """Per-day rollups for the most recent `days` days that had analyses, oldest first."""
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT day, count, total, high, medium, low FROM owner_daily WHERE owner = ? "
+                "ORDER BY day DESC LIMIT ?",
+                (owner, days),
+            ).fetchall()
+        return [dict(_summary(*tuple(r)[1:]), day=r['day']) for r in reversed(rows)]
+
+    def tail(self, owner: str = '') -> list:
+        """owner's most recent scores, oldest first, as {'score', 'timestamp'} dicts."""
+        with self._lock:
+            return list(self._state(owner)[1])
@@ -0,0 +1,393 @@
+"""
+Streaming ingestion of LinkedIn Content exports.
+
+The workbook is opened once and each sheet is walked row by row straight
+off the zipped XML, so nothing is materialised beyond the columns we keep.
+openpyxl's read-only mode is the fallback for packages we can't read.
+"""
+
+import posixpath
+import zipfile
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from io import BytesIO
+from xml.etree.ElementTree import iterparse
+from xml.parsers import expat
+
+from postpro.tracing import tracer
+
+TOP_POSTS = 'TOP POSTS'
+DEMOGRAPHICS = 'DEMOGRAPHICS'
+ENGAGEMENT = 'ENGAGEMENT'
+
+
+def _to_int(value):
+    """Coerce exported counts ('1,234', 12.0, None) to int or None."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value)
+    try:
+        return int(float(str(value).replace(',', '').strip()))
+    except ValueError:
+        return None
+
+
+def _to_float(value):
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip()
+    try:
+        if text.endswith('%'):
+            return float(text[:-1]) / 100
+        return float(text)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=8192)
+def _parse_date(text: str):
+    """'12/31/2024' or '2024-12-31' to a date; anything else is returned as-is."""
+    try:
+        if '/' in text:
+            month, day, year = text.strip().split('/')
+        else:
+            year, month, day = text.strip().split('-')
+        return date(int(year), int(month), int(day))
+    except ValueError:
+        return text
+
+
+def _to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return _parse_date(value)
+    return value
+
+
+_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_EXPAT_NS = _NS[1:-1] + ' '
+_PKG_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+# Built-in number formats that render as dates
+_DATE_FORMAT_IDS = set(range(14, 23)) | {45, 46, 47}
+
+
+def _column_index(ref: str) -> int:
+    n = 0
+    for ch in ref:
+        if ch <= '9':
+            break
+        n = n * 26 + ord(ch) - 64
+    return n - 1
+
+
+class _XlsxReader:
+    """Minimal streaming reader for the cell values of an .xlsx package.
+
+    Sheet XML is fed through expat in fixed-size chunks, so memory stays
+    flat however many rows the export has.
+    """
+
+    def __init__(self, source):
+        self.zip = zipfile.ZipFile(source)
+        self.sheets = self._sheet_paths()
+        self.sheetnames = list(self.sheets)
+        self.shared = self._shared_strings()
+        self.date_styles, self.epoch = self._date_styles()
+
+    def _sheet_paths(self):
+        rels = {}
+        with self.zip.open('xl/_rels/workbook.xml.rels') as f:
+            for _, el in iterparse(f):
+                if el.tag == _PKG_REL_NS + 'Relationship':
+                    target = el.get('Target')
+                    if target.startswith('/'):
+                        target = target[1:]
+                    else:
+                        target = posixpath.normpath(posixpath.join('xl', target))
+                    rels[el.get('Id')] = target
+        sheets = {}
+        with self.zip.open('xl/workbook.xml') as f:
+            for _, el in iterparse(f):
+                if el.tag == _NS + 'sheet':
+                    sheets[el.get('name')] = rels[el.get(_REL_NS + 'id')]
+        return sheets
+
+    def _shared_strings(self):
+        if 'xl/sharedStrings.xml' not in self.zip.namelist():
+            return []
+        strings = []
+        with self.zip.open('xl/sharedStrings.xml') as f:
+            for _, el in iterparse(f):
+                if el.tag == _NS + 'si':
+                    strings.append(''.join(t.text or '' for t in el.iter(_NS + 't')))
+                    el.clear()
+        return strings
+
+    def _date_styles(self):
+        epoch = datetime(1899, 12, 30)
+        with self.zip.open('xl/workbook.xml') as f:
+            for _, el in iterparse(f):
+                if el.tag == _NS + 'workbookPr' and el.get('date1904') in ('1', 'true'):
+                    epoch = datetime(1904, 1, 1)
+        if 'xl/styles.xml' not in self.zip.namelist():
+            return set(), epoch
+
+        custom_dates = set()
+        styles = []
+        with self.zip.open('xl/styles.xml') as f:
+            in_xfs = False
+            for event, el in iterparse(f, events=('start', 'end')):
+                if el.tag == _NS + 'cellXfs':
+                    in_xfs = event == 'start'
+                elif event == 'end' and el.tag == _NS + 'numFmt':
+                    code = (el.get('formatCode') or '').lower()
+                    code = code.split(';')[0].replace('"', '')
+                    if any(ch in code for ch in 'dmy') and 'general' not in code:
+                        custom_dates.add(int(el.get('numFmtId')))
+                elif event == 'end' and in_xfs and el.tag == _NS + 'xf':
+                    styles.append(int(el.get('numFmtId', 0)))
+        date_ids = _DATE_FORMAT_IDS | custom_dates
+        return {i for i, fmt in enumerate(styles) if fmt in date_ids}, epoch
+
+    def rows(self, name):
+        """Yield each row of sheet name as a tuple of cell values."""
+        shared, date_styles, epoch = self.shared, self.date_styles, self.epoch
+        cell_tag, row_tag = _EXPAT_NS + 'c', _EXPAT_NS + 'row'
+        text_tags = (_EXPAT_NS + 'v', _EXPAT_NS + 't')
+        done = []
+        row = []
+        text = []
+        cell = {}
+        capture = [False]
+
+        def start(tag, attrs):
+            if tag == cell_tag:
+                cell['t'] = attrs.get('t')
+                cell['s'] = attrs.get('s')
+                cell['r'] = attrs.get('r')
+                text.clear()
+            elif tag in text_tags:
+                capture[0] = True
+
+        def end(tag):
+            if tag in text_tags:
+                capture[0] = False
+            elif tag == cell_tag:
+                kind = cell['t']
+                raw = ''.join(text)
+                if kind in ('inlineStr', 'str', 'e'):
+                    value = raw
+                elif not text:
+                    value = None
+                elif kind == 's':
+                    value = shared[int(raw)]
+                elif kind == 'b':
+                    value = raw == '1'
+                else:
+                    value = float(raw) if ('.' in raw or 'E' in raw) else int(raw)
+                    if cell['s'] is not None and int(cell['s']) in date_styles:
+                        value = epoch + timedelta(days=value)
+                i = _column_index(cell['r']) if cell['r'] else len(row)
+                if i > len(row):
+                    row.extend([None] * (i - len(row)))
+                row.append(value)
+            elif tag == row_tag:
+                done.append(tuple(row))
+                row.clear()
+
+        def characters(data):
+            if capture[0]:
+                text.append(data)
+
+        parser = expat.ParserCreate(namespace_separator=' ')
+        parser.buffer_text = True
+        parser.StartElementHandler = start
+        parser.EndElementHandler = end
+        parser.CharacterDataHandler = characters
+        with self.zip.open(self.sheets[name]) as f:
+            while True:
+                chunk = f.read(1 << 16)
+                parser.Parse(chunk, not chunk)
+                yield from done
+                done.clear()
+                if not chunk:
+                    break
+
+    def close(self):
+        self.zip.close()
+
+
+class _OpenpyxlReader:
+    """Fallback reader over openpyxl's read-only mode."""
+
+    def __init__(self, source):
+        import openpyxl
+
+        self.workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+        self.sheetnames = self.workbook.sheetnames
+
+    def rows(self, name):
+        sheet = self.workbook[name]
+        # Exports often carry a missing or stale <dimension>; without this
+        # openpyxl pre-scans the whole sheet to work out its extent.
+        sheet.reset_dimensions()
+        return sheet.iter_rows(values_only=True)
+
+    def close(self):
+        self.workbook.close()
+
+
+def _open_workbook(source):
+    try:
+        return _XlsxReader(source)
+    except KeyError:
+        source.seek(0)
+        return _OpenpyxlReader(source)
+
+
+def _read_top_posts(rows):
+    """Both TOP POSTS blocks (engagements in A:C, impressions in E:G)."""
+    engagement = {'url': [], 'date': [], 'engagements': []}
+    impressions = {'url': [], 'date': [], 'impressions': []}
+
+    for row in rows:
+        if 'Post URL' in row:
+            break
+    else:
+        return None, None
+
+    for row in rows:
+        row = tuple(row) + (None,) * (7 - len(row))
+        url = row[0]
+        if isinstance(url, str) and 'linkedin.com' in url:
+            engagement['url'].append(url)
+            engagement['date'].append(_to_date(row[1]))
+            engagement['engagements'].append(_to_int(row[2]))
+        url = row[4]
+        if isinstance(url, str) and 'linkedin.com' in url:
+            impressions['url'].append(url)
+            impressions['date'].append(_to_date(row[5]))
+            impressions['impressions'].append(_to_int(row[6]))
+
+    return engagement, impressions
+
+
+def _read_table(rows):
+    """Sheet whose first row is a header, as a dict of column lists."""
+    header = next(rows, None)
+    if header is None:
+        return {}
+    names = [(i, str(name)) for i, name in enumerate(header) if name is not None]
+    columns = {name: [] for _, name in names}
+    for row in rows:
+        if not any(cell is not None for cell in row):
+            continue
+        for i, name in names:
+            columns[name].append(row[i] if i < len(row) else None)
+    return columns
+
+
+def iter_export(source):
+    """Yield (block, columns) for every block in the export, in one pass.
+
+    Blocks are 'engagement', 'impressions', 'demographics' and 'trends'.
+    Each columns value maps a column name to a list of typed values.
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = BytesIO(source)
+    workbook = _open_workbook(source)
+    try:
+        if TOP_POSTS not in workbook.sheetnames:
+            raise ValueError("Could not find Post URL header in file")
+        rows = workbook.rows(TOP_POSTS)
+        engagement, impressions = _read_top_posts(rows)
+        if engagement is None:
+            raise ValueError("Could not find Post URL header in file")
+        yield 'engagement', engagement
+        yield 'impressions', impressions
+
+        if DEMOGRAPHICS in workbook.sheetnames:
+            demo = _read_table(workbook.rows(DEMOGRAPHICS))
+            if 'Percentage' in demo:
+                demo['Percentage'] = [_to_float(v) for v in demo['Percentage']]
+            yield 'demographics', demo
+
+        if ENGAGEMENT in workbook.sheetnames:
+            trends = _read_table(workbook.rows(ENGAGEMENT))
+            for name, values in trends.items():
+                if name == 'Date':
+                    trends[name] = [_to_date(v) for v in values]
+                else:
+                    trends[name] = [_to_int(v) for v in values]
+            yield 'trends', trends
+    finally:
+        workbook.close()
+
+
+def read_export(source) -> dict:
+    """All export blocks as columnar dicts."""
+    return dict(iter_export(source))
+
+
+def _records(columns: dict, limit: int = None) -> list:
+    names = list(columns)
+    if not names:
+        return []
+    rows = zip(*(columns[name] for name in names))
+    if limit is not None:
+        rows = (row for _, row in zip(range(limit), rows))
+    return [dict(zip(names, row)) for row in rows]
+
+
+def _join_posts(engagement: dict, impressions: dict) -> dict:
+    """Outer join of the two TOP POSTS blocks on URL."""
+    rows = {}
+    for url, day, value in zip(engagement['url'], engagement['date'], engagement['engagements']):
+        rows[url] = [day, value, None]
+    for url, day, value in zip(impressions['url'], impressions['date'], impressions['impressions']):
+        row = rows.setdefault(url, [day, None, None])
+        row[2] = value
+    return {
+        'url': list(rows),
+        'date': [r[0] for r in rows.values()],
+        'engagements': [r[1] for r in rows.values()],
+        'impressions': [r[2] for r in rows.values()],
+    }
+
+
+def parse_linkedin_xlsx(uploaded_file) -> dict:
+    """Parse LinkedIn Content export XLSX file."""
+    with tracer.span('parse_linkedin_xlsx') as span:
+        try:
+            data = uploaded_file.read() if hasattr(uploaded_file, 'read') else uploaded_file
+            if isinstance(data, (bytes, bytearray)):
+                span.set(bytes=len(data))
+            blocks = read_export(data)
+
+            demographics = []
+            demo = blocks.get('demographics', {})
+            if {'Top Demographics', 'Value', 'Percentage'} <= set(demo):
+                demographics = [
+                    {'Value': value, 'Percentage': pct}
+                    for kind, value, pct in zip(demo['Top Demographics'], demo['Value'], demo['Percentage'])
+                    if kind == 'Job titles'
+                ][:5]
+
+            return {
+                "top_by_engagement": _records(blocks['engagement'], 10),
+                "top_by_impressions": _records(blocks['impressions'], 10),
+                "demographics": demographics,
+                "trends": _records(blocks.get('trends', {})),
+                "posts": _records(_join_posts(blocks['engagement'], blocks['impressions'])),
+            }
+
+        except Exception as e:
+            span.set(error=str(e))
+            return {"error": str(e)}
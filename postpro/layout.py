@@ -0,0 +1,212 @@
+"""
+Feed text layout: where LinkedIn folds a post behind "...see more".
+
+Text is wrapped the way the feed does it - greedy word wrap at the
+device's text width, blank lines taking a line each - using glyph
+advances from a real font (Pillow's bundled Aileron, or the font in
+POSTPRO_FONT). Advances are measured once per glyph in em units and
+cached, so every device and font size shares one cache; emoji, marks and
+glyphs the font lacks get fixed widths. Only the lines up to the fold are
+laid out, which keeps a draft well under a millisecond.
+"""
+
+import os
+import re
+import threading
+import unicodedata
+
+# Feed text box per device: CSS px width, font size, visible lines and the
+# label LinkedIn appends to the last visible line
+DEVICES = {
+    'iphone': {'label': 'iPhone', 'width': 358, 'font_size': 14, 'lines': 3, 'more': '…more'},
+    'android': {'label': 'Android', 'width': 380, 'font_size': 14, 'lines': 3, 'more': '…more'},
+    'iphone_se': {'label': 'iPhone SE', 'width': 343, 'font_size': 14, 'lines': 3, 'more': '…more'},
+    'desktop': {'label': 'Desktop', 'width': 523, 'font_size': 14, 'lines': 3, 'more': '…see more'},
+}
+
+# Colour emoji render about 1.25em wide on iOS and Android
+EMOJI_EM = 1.25
+FALLBACK_EM = 0.55
+_FALLBACK = {'—': 1.0, '–': 0.5, '•': 0.35, '→': 1.0, '←': 1.0, '€': 0.56, '£': 0.56,
+             '“': 0.4, '”': 0.4, '‘': 0.22, '’': 0.22, '\t': 1.0}
+_ZWJ = '‍'
+_TOKEN = re.compile(r'\S+|[^\S\n]+')
+_MEASURE_SIZE = 256
+
+
+def _is_emoji(cp: int) -> bool:
+    return cp >= 0x1F000 or 0x2600 <= cp <= 0x27BF or 0x2B00 <= cp <= 0x2BFF
+
+
+class GlyphMetrics:
+    """Glyph advances in em units, measured once per character."""
+
+    def __init__(self, font_path: str = None):
+        from PIL import ImageFont
+
+        font_path = font_path or os.environ.get('POSTPRO_FONT')
+        if font_path:
+            self.font = ImageFont.truetype(font_path, _MEASURE_SIZE)
+        else:
+            self.font = ImageFont.load_default(_MEASURE_SIZE)
+        # A glyph that renders exactly like an unassigned code point is the font's .notdef box
+        self._notdef = self._shape('\U000E0FFF')
+        self._advances = {}
+        self._words = {}
+        self._lock = threading.Lock()
+
+    def _shape(self, ch: str):
+        return self.font.getbbox(ch), bytes(self.font.getmask(ch))
+
+    def _measure(self, ch: str) -> float:
+        cp = ord(ch)
+        category = unicodedata.category(ch)
+        if category in ('Mn', 'Me', 'Cf') or 0xFE00 <= cp <= 0xFE0F or 0x1F3FB <= cp <= 0x1F3FF:
+            return 0.0
+        if 0x1F1E6 <= cp <= 0x1F1FF:
+            # Regional indicators pair up into one flag
+            return EMOJI_EM / 2
+        if _is_emoji(cp):
+            return EMOJI_EM
+        if self._shape(ch) != self._notdef:
+            return self.font.getlength(ch) / _MEASURE_SIZE
+        base = unicodedata.normalize('NFD', ch)[0]
+        if base != ch:
+            return self.advance(base)
+        if ch in _FALLBACK:
+            return _FALLBACK[ch]
+        if unicodedata.east_asian_width(ch) in ('W', 'F'):
+            return 1.0
+        return FALLBACK_EM
+
+    def advance(self, ch: str) -> float:
+        """Advance width of one character, in em."""
+        em = self._advances.get(ch)
+        if em is None:
+            with self._lock:
+                em = self._advances[ch] = self._measure(ch)
+        return em
+
+    def width(self, text: str) -> float:
+        """Width of a run of text, in em (no kerning)."""
+        em = self._words.get(text)
+        if em is not None:
+            return em
+        em = 0.0
+        joined = False
+        for ch in text:
+            # The glyph after a zero-width joiner merges into the previous emoji
+            if not joined:
+                em += self._advances.get(ch) if ch in self._advances else self.advance(ch)
+            joined = ch == _ZWJ
+        if len(self._words) > 50_000:
+            self._words.clear()
+        self._words[text] = em
+        return em
+
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> GlyphMetrics:
+    """Process-wide glyph metrics, loaded on first use."""
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                _metrics = GlyphMetrics()
+    return _metrics
+
+
+def wrap(text: str, width_em: float, max_lines: int = None, metrics: GlyphMetrics = None) -> list:
+    """(start, end) offsets of each wrapped line of text.
+
+    Greedy wrap like the browser: words move to the next line whole,
+    spaces at a break are dropped, and a word wider than the line is
+    split between characters. With max_lines, stops once one line more
+    than that is known to exist.
+    """
+    metrics = metrics or get_metrics()
+    lines = []
+    full = lambda: max_lines is not None and len(lines) > max_lines
+    pos = 0
+    for paragraph in text.split('\n'):
+        line_start = line_end = pos
+        used = 0.0
+        wrapped = False
+        for m in _TOKEN.finditer(paragraph):
+            start, end = pos + m.start(), pos + m.end()
+            token = m.group()
+            w = metrics.width(token)
+            if token.isspace():
+                # Spaces may hang past the edge, but never start a wrapped line
+                if not (wrapped and used == 0):
+                    used += w
+                    line_end = end
+                continue
+            if used + w > width_em and used > 0:
+                lines.append((line_start, line_end))
+                if full():
+                    return lines
+                line_start, used, wrapped = start, 0.0, True
+            if w <= width_em:
+                used += w
+            else:
+                # A word wider than the line is split between characters
+                for i, ch in enumerate(token):
+                    advance = metrics.advance(ch)
+                    if used + advance > width_em and used > 0:
+                        lines.append((line_start, start + i))
+                        if full():
+                            return lines
+                        line_start, used, wrapped = start + i, 0.0, True
+                    used += advance
+            line_end = end
+        lines.append((line_start, line_end))
+        if full():
+            return lines
+        pos += len(paragraph) + 1
+    return lines
+
+
+def fold(text: str, device: str = 'iphone', metrics: GlyphMetrics = None) -> dict:
+    """Where the feed cuts text on one device.
+
+    Returns the visible lines, whether the post is cut, and fold: the
+    offset in text of the first character hidden behind the "more" label.
+    """
+    profile = DEVICES[device]
+    metrics = metrics or get_metrics()
+    text = text.rstrip()
+    width_em = profile['width'] / profile['font_size']
+    lines = wrap(text, width_em, profile['lines'], metrics)
+    cut = len(lines) > profile['lines']
+    lines = lines[:profile['lines']]
+    fold_at = lines[-1][1] if lines else 0
+    if cut:
+        # The label shares the last visible line; trim it until both fit
+        start, end = lines[-1]
+        room = width_em - metrics.width(profile['more'])
+        used = 0.0
+        for i in range(start, end):
+            if i == start or text[i - 1] != _ZWJ:
+                used += metrics.advance(text[i])
+            if used > room:
+                end = i
+                break
+        lines[-1] = (start, end)
+        fold_at = end
+    return {
+        'device': device,
+        'label': profile['label'],
+        'lines': [text[start:end].rstrip() for start, end in lines],
+        'cut': cut,
+        'fold': fold_at,
+        'total_chars': len(text),
+    }
+
+
+def fold_all(text: str) -> dict:
+    """fold() for every device profile."""
+    return {device: fold(text, device) for device in DEVICES}
@@ -0,0 +1,248 @@
+"""
+Anchor Library: saved anchor posts, their export metrics, tags and past
+analyses, in SQLite.
+
+Text and tags are full-text indexed with FTS5 (LIKE is the fallback when
+the SQLite build lacks it). Listing uses keyset pagination, so a page
+costs the same however deep into thousands of anchors it is.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+
+from postpro.db import ConnectionPool
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS anchors (
+    id INTEGER PRIMARY KEY,
+    url TEXT UNIQUE,
+    text TEXT NOT NULL DEFAULT '',
+    text_hash TEXT,
+    tags TEXT NOT NULL DEFAULT '',
+    engagements INTEGER,
+    impressions INTEGER,
+    published TEXT,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS anchors_rank ON anchors (COALESCE(engagements, -1) DESC, id DESC);
+CREATE INDEX IF NOT EXISTS anchors_text_hash ON anchors (text_hash);
+
+CREATE TABLE IF NOT EXISTS analyses (
+    id INTEGER PRIMARY KEY,
+    anchor_id INTEGER NOT NULL REFERENCES anchors(id) ON DELETE CASCADE,
+    draft TEXT NOT NULL,
+    score REAL,
+    risk_level TEXT,
+    verdict TEXT,
+    result TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS analyses_anchor ON analyses (anchor_id, id DESC);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS anchors_fts USING fts5(
+    text, tags, content='anchors', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS anchors_ai AFTER INSERT ON anchors BEGIN
+    INSERT INTO anchors_fts (rowid, text, tags) VALUES (new.id, new.text, new.tags);
+END;
+CREATE TRIGGER IF NOT EXISTS anchors_ad AFTER DELETE ON anchors BEGIN
+    INSERT INTO anchors_fts (anchors_fts, rowid, text, tags) VALUES ('delete', old.id, old.text, old.tags);
+END;
+CREATE TRIGGER IF NOT EXISTS anchors_au AFTER UPDATE OF text, tags ON anchors BEGIN
+    INSERT INTO anchors_fts (anchors_fts, rowid, text, tags) VALUES ('delete', old.id, old.text, old.tags);
+    INSERT INTO anchors_fts (rowid, text, tags) VALUES (new.id, new.text, new.tags);
+END;
+"""
+
+_RANK = "COALESCE(a.engagements, -1)"
+
+
+def _text_hash(text: str) -> str:
+    return hashlib.sha1(text.strip().encode('utf-8')).hexdigest() if text.strip() else None
+
+
+def _normalise_tags(tags) -> str:
+    if isinstance(tags, str):
+        tags = tags.split(',')
+    return ', '.join(sorted({t.strip().lower() for t in tags if t.strip()}))
+
+
+def _fts_query(query: str) -> str:
+    """Every whitespace-separated term as a quoted prefix match."""
+    terms = ['"' + term.replace('"', '""') + '"*' for term in query.split()]
+    return ' '.join(terms)
+
+
+class AnchorLibrary:
+    """SQLite-backed store of anchors and their analysis history."""
+
+    def __init__(self, path: str, pool_size: int = 4):
+        self.pool = ConnectionPool(path, size=pool_size)
+        with self.pool.connection() as conn:
+            conn.executescript(SCHEMA)
+            try:
+                conn.executescript(FTS_SCHEMA)
+                self.fts = True
+            except sqlite3.OperationalError:
+                self.fts = False
+
+    def save_anchor(self, text: str, url: str = None, tags=(), engagements: int = None,
+                    impressions: int = None, published=None) -> int:
+        """Insert an anchor, or update the one with the same URL; returns its id."""
+        now = time.time()
+        with self.pool.transaction() as conn:
+            row = conn.execute(
+                "INSERT INTO anchors (url, text, text_hash, tags, engagements, impressions, published, created, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET "
+                "text = CASE WHEN excluded.text != '' THEN excluded.text ELSE anchors.text END, "
+                "text_hash = COALESCE(excluded.text_hash, anchors.text_hash), "
+                "tags = CASE WHEN excluded.tags != '' THEN excluded.tags ELSE anchors.tags END, "
+                "engagements = COALESCE(excluded.engagements, anchors.engagements), "
+                "impressions = COALESCE(excluded.impressions, anchors.impressions), "
+                "published = COALESCE(excluded.published, anchors.published), "
+                "updated = excluded.updated "
+                "RETURNING id",
+                (url, text.strip(), _text_hash(text), _normalise_tags(tags), engagements,
+                 impressions, str(published) if published else None, now, now),
+            ).fetchone()
+            return row[0]
+
+    def import_export(self, parsed: dict) -> int:
+        """Bulk upsert the metrics of every post in a parsed export, in one transaction.
+
+        Posts are joined by URL across the engagement and impressions lists;
+        text and tags already saved are left alone.
+        """
+        posts = {p['url']: dict(p, published=p.get('date')) for p in parsed.get('posts', [])}
+        if not posts:
+            for post in parsed.get('top_by_engagement', []):
+                posts.setdefault(post['url'], {}).update(engagements=post.get('engagements'), published=post.get('date'))
+            for post in parsed.get('top_by_impressions', []):
+                entry = posts.setdefault(post['url'], {})
+                entry['impressions'] = post.get('impressions')
+                entry.setdefault('published', post.get('date'))
+        now = time.time()
+        rows = [
+            (url, p.get('engagements'), p.get('impressions'),
+             str(p['published']) if p.get('published') else None, now, now)
+            for url, p in posts.items()
+        ]
+        with self.pool.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO anchors (url, engagements, impressions, published, created, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET "
+                "engagements = COALESCE(excluded.engagements, anchors.engagements), "
+                "impressions = COALESCE(excluded.impressions, anchors.impressions), "
+                "published = COALESCE(anchors.published, excluded.published), "
+                "updated = excluded.updated",
+                rows,
+            )
+        return len(rows)
+
+    def page(self, after=None, limit: int = 20, query: str = None, with_text_only: bool = False):
+        """One page of anchors, best-performing first.
+
+        after is the cursor returned with the previous page. Returns
+        (anchors, next_cursor); next_cursor is None on the last page.
+        """
+        where, params = [], []
+        joins = ""
+        if query and query.strip():
+            if self.fts:
+                joins = "JOIN anchors_fts f ON f.rowid = a.id"
+                where.append("anchors_fts MATCH ?")
+                params.append(_fts_query(query))
+            else:
+                where.append("(a.text LIKE ? OR a.tags LIKE ?)")
+                params += [f"%{query.strip()}%"] * 2
+        if with_text_only:
+            where.append("a.text != ''")
+        if after is not None:
+            rank, last_id = after
+            where.append(f"({_RANK} < ? OR ({_RANK} = ? AND a.id < ?))")
+            params += [rank, rank, last_id]
+        sql = (
+            f"SELECT a.*, {_RANK} AS rank, "
+            "(SELECT COUNT(*) FROM analyses WHERE anchor_id = a.id) AS analyses "
+            f"FROM anchors a {joins} "
+            + (f"WHERE {' AND '.join(where)} " if where else "")
+            + f"ORDER BY {_RANK} DESC, a.id DESC LIMIT ?"
+        )
+        with self.pool.connection() as conn:
+            rows = [dict(r) for r in conn.execute(sql, params + [limit + 1])]
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = (rows[-1]['rank'], rows[-1]['id'])
+        return rows, next_cursor
+
+    def get(self, anchor_id: int):
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT * FROM anchors WHERE id = ?", (anchor_id,)).fetchone()
+        return dict(row) if row else None
+
+    def texts_by_url(self, urls) -> dict:
+        """{url: text} for the given URLs that have saved text."""
+        urls = list(urls)
+        if not urls:
+            return {}
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                f"SELECT url, text FROM anchors WHERE text != '' AND url IN ({','.join('?' * len(urls))})",
+                urls,
+            ).fetchall()
+        return {r['url']: r['text'] for r in rows}
+
+    def training_rows(self, since: float = 0.0) -> list:
+        """Anchors with text and at least one metric, updated after since."""
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT id, text, engagements, impressions, updated FROM anchors "
+                "WHERE updated > ? AND text != '' AND (engagements IS NOT NULL OR impressions IS NOT NULL)",
+                (since,),
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def find_by_text(self, text: str):
+        """The anchor whose text matches exactly (ignoring outer whitespace), or None."""
+        digest = _text_hash(text)
+        if digest is None:
+            return None
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT * FROM anchors WHERE text_hash = ? LIMIT 1", (digest,)).fetchone()
+        return dict(row) if row else None
+
+    def delete(self, anchor_id: int):
+        with self.pool.transaction() as conn:
+            conn.execute("DELETE FROM anchors WHERE id = ?", (anchor_id,))
+
+    def count(self) -> int:
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM anchors").fetchone()[0]
+
+    def record_analysis(self, anchor_id: int, draft: str, result: dict):
+        """Keep a finished analysis against its anchor."""
+        with self.pool.transaction() as conn:
+            conn.execute(
+                "INSERT INTO analyses (anchor_id, draft, score, risk_level, verdict, result, created) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (anchor_id, draft, result.get('score'), result.get('risk_level'), result.get('verdict'),
+                 json.dumps(result, ensure_ascii=False), time.time()),
+            )
+
+    def analyses(self, anchor_id: int, limit: int = 10) -> list:
+        """Most recent analyses run against an anchor."""
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT id, draft, score, risk_level, verdict, created FROM analyses "
+                "WHERE anchor_id = ? ORDER BY id DESC LIMIT ?",
+                (anchor_id, limit),
+            ).fetchall()
+        return [dict(r) for r in rows]
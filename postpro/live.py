@@ -0,0 +1,123 @@
+"""
+Live-as-you-type analysis.
+
+IncrementalLinter re-lints only the paragraphs that changed since the last
+keystroke. DebouncedWorker runs expensive work (LLM scoring) on a
+background thread once typing pauses, and keeps only the newest request,
+so the script thread never waits on the network.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from postpro.lint import Linter, default_linter
+
+
+class IncrementalLinter:
+    """Linter front-end that memoises per-paragraph results.
+
+    Paragraph stats are position-independent, so an edit only costs a lint
+    of the paragraphs whose text actually changed; the report is then
+    re-assembled from cached pieces.
+    """
+
+    def __init__(self, linter: Linter = None, max_paragraphs: int = 512):
+        self.linter = linter or default_linter()
+        self.max_paragraphs = max_paragraphs
+        self._stats = OrderedDict()
+        self.relinted = 0
+
+    def lint(self, text: str) -> dict:
+        """Same report as Linter.lint(text)."""
+        stats = []
+        relinted = 0
+        for offset, paragraph in self.linter.paragraphs(text):
+            cached = self._stats.get(paragraph)
+            if cached is None:
+                cached = self.linter.paragraph_stats(paragraph)
+                self._stats[paragraph] = cached
+                relinted += 1
+            else:
+                self._stats.move_to_end(paragraph)
+            stats.append((offset, cached))
+        while len(self._stats) > self.max_paragraphs:
+            self._stats.popitem(last=False)
+        self.relinted = relinted
+        return self.linter.assemble(text, stats)
+
+
+class DebouncedWorker:
+    """Run fn(*args) in the background once submissions go quiet for delay seconds.
+
+    Only the latest submission is evaluated; older pending ones are dropped.
+    latest() returns (args, result) for the most recent completed run.
+    The thread exits after idle seconds without work and is started again
+    by the next submit, so an abandoned worker holds no thread.
+    """
+
+    def __init__(self, fn, delay: float = 1.5, idle: float = 30.0):
+        self.fn = fn
+        self.delay = delay
+        self.idle = idle
+        self._pending = None
+        self._submitted = 0.0
+        self._latest = None
+        self._running = False
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = None
+
+    def submit(self, *args):
+        """Queue args for evaluation unless they are already pending or done."""
+        with self._cond:
+            if self._pending == args:
+                return
+            if self._pending is None and self._latest is not None and self._latest[0] == args:
+                return
+            self._pending = args
+            self._submitted = time.monotonic()
+            self._cond.notify()
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def latest(self):
+        """(args, result) of the newest finished evaluation, or None."""
+        with self._cond:
+            return self._latest
+
+    @property
+    def busy(self) -> bool:
+        """True while a submission is waiting or being evaluated."""
+        with self._cond:
+            return self._pending is not None or self._running
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._pending is None and not self._closed:
+                    self._cond.wait(self.idle)
+                if self._closed or self._pending is None:
+                    self._thread = None
+                    return
+                # Wait for a quiet period; every new submit restarts the clock
+                remaining = self._submitted + self.delay - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+                args = self._pending
+                self._pending = None
+                self._running = True
+            try:
+                result = self.fn(*args)
+            except Exception as e:
+                result = {"error": str(e)}
+            with self._cond:
+                self._running = False
+                self._latest = (args, result)
@@ -0,0 +1,175 @@
+"""
+Local reach predictor trained on your own post history.
+
+Every anchor in the library that has both text and export metrics is a
+training example. A post becomes a hashed bag of word uni/bigrams plus
+its visual-physics lint metrics, and two ridge regressions predict
+log engagements and log impressions from it. The model keeps only the
+sufficient statistics (X'X and X'y per target), so a new export updates
+just the posts whose text or metrics changed and refitting is one small
+linear solve. Prediction is a dot product, cheap enough for every
+keystroke.
+"""
+
+import os
+import re
+import threading
+import zlib
+from functools import lru_cache
+
+import numpy as np
+
+from postpro.lint import default_linter
+
+FORMAT_VERSION = 1
+TARGETS = ('engagements', 'impressions')
+_WORD = re.compile(r"\w+")
+_HASHTAG = re.compile(r"#\w+")
+_COUNTS = ('chars', 'words', 'line_breaks', 'paragraphs', 'sentences', 'hook_chars', 'max_paragraph_lines')
+
+
+@lru_cache(maxsize=65536)
+def _word_hash(word: str) -> int:
+    return zlib.crc32(word.encode('utf-8'))
+
+
+def features(text: str, metrics: dict = None, dim: int = 256) -> np.ndarray:
+    """Feature vector for a post: dim hashed word features, structure, then a bias term."""
+    if metrics is None:
+        metrics = default_linter().metrics(text)
+    words = _WORD.findall(text.lower())
+    x = np.zeros(dim + len(_COUNTS) + 5)
+    if words:
+        unigrams = np.fromiter(map(_word_hash, words), dtype=np.uint64, count=len(words))
+        # Bigram hashes are mixed from the word hashes, so each word is hashed once
+        bigrams = (unigrams[:-1] * 1000003 ^ unigrams[1:]) & 0xFFFFFFFF
+        hashes, counts = np.unique(np.concatenate([unigrams, bigrams]), return_counts=True)
+        signs = np.where(hashes & 0x80000000, 1.0, -1.0)
+        x[:dim] = np.bincount((hashes % dim).astype(np.intp), signs * (1.0 + np.log(counts)), minlength=dim)
+        norm = np.sqrt(x[:dim] @ x[:dim])
+        if norm:
+            x[:dim] /= norm
+    x[dim:dim + len(_COUNTS)] = np.log1p([metrics[k] for k in _COUNTS])
+    x[-5:] = (metrics['whitespace_ratio'], metrics['line_break_density'] / 10,
+              '?' in text, np.log1p(len(_HASHTAG.findall(text))), 1.0)
+    return x
+
+
+def _targets(row: dict) -> np.ndarray:
+    return np.array([np.nan if row.get(t) is None else np.log1p(max(row[t], 0)) for t in TARGETS])
+
+
+class ReachPredictor:
+    """Incrementally trained ridge model of engagements and impressions.
+
+    Posts are keyed by anchor id; posts with fewer than min_posts
+    examples for a target get no prediction for it.
+    """
+
+    def __init__(self, dim: int = 256, alpha: float = 1.0, min_posts: int = 5):
+        self.dim = dim
+        self.alpha = alpha
+        self.min_posts = min_posts
+        self.synced = 0.0
+        size = dim + len(_COUNTS) + 5
+        self._A = np.zeros((len(TARGETS), size, size))
+        self._b = np.zeros((len(TARGETS), size))
+        self._n = np.zeros(len(TARGETS), dtype=np.int64)
+        self._rows = {}
+        self._weights = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def _add(self, x, y, sign):
+        for t, value in enumerate(y):
+            if value == value:
+                self._A[t] += sign * np.outer(x, x)
+                self._b[t] += sign * value * x
+                self._n[t] += sign
+
+    def update(self, rows) -> int:
+        """Learn from library rows (id, text, engagements, impressions, updated); returns how many changed."""
+        changed = 0
+        with self._lock:
+            for row in rows:
+                self.synced = max(self.synced, row.get('updated') or 0.0)
+                digest = zlib.crc32(row['text'].encode('utf-8'))
+                y = _targets(row)
+                old = self._rows.get(row['id'])
+                if old is not None:
+                    if old[0] == digest and np.array_equal(old[2], y, equal_nan=True):
+                        continue
+                    self._add(old[1], old[2], -1)
+                    x = old[1] if old[0] == digest else features(row['text'], dim=self.dim)
+                else:
+                    x = features(row['text'], dim=self.dim)
+                if np.isnan(y).all():
+                    self._rows.pop(row['id'], None)
+                else:
+                    self._add(x, y, 1)
+                    self._rows[row['id']] = (digest, x, y)
+                changed += 1
+            if changed:
+                self._weights = None
+        return changed
+
+    def weights(self) -> list:
+        """Fitted weights per target (None where there are too few posts)."""
+        weights = self._weights
+        if weights is None:
+            with self._lock:
+                size = self._b.shape[1]
+                penalty = self.alpha * np.eye(size)
+                penalty[-1, -1] = 0.0  # leave the bias unregularised
+                weights = [
+                    np.linalg.solve(self._A[t] + penalty, self._b[t]) if self._n[t] >= self.min_posts else None
+                    for t in range(len(TARGETS))
+                ]
+                self._weights = weights
+        return weights
+
+    def predict(self, text: str, metrics: dict = None):
+        """{'engagements', 'impressions', 'posts'} expected for text, or None before there is enough history.
+
+        Pass the draft's lint metrics when they are already at hand.
+        """
+        weights = self.weights()
+        if not text.strip() or all(w is None for w in weights):
+            return None
+        x = features(text, metrics, self.dim)
+        out = {t: None if w is None else int(round(np.expm1(max(x @ w, 0.0)))) for t, w in zip(TARGETS, weights)}
+        out['posts'] = int(self._n.max())
+        return out
+
+    def save(self, path: str):
+        """Write the training examples to path atomically (.npz)."""
+        with self._lock:
+            ids = list(self._rows)
+            rows = [self._rows[i] for i in ids]
+            size = self._b.shape[1]
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, 'wb') as f:
+                np.savez(f, version=FORMAT_VERSION, dim=self.dim, synced=self.synced,
+                         ids=np.array(ids, dtype=np.int64),
+                         digests=np.array([r[0] for r in rows], dtype=np.int64),
+                         X=np.array([r[1] for r in rows]).reshape(-1, size),
+                         Y=np.array([r[2] for r in rows]).reshape(-1, len(TARGETS)))
+            os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, **kwargs):
+        """Predictor saved at path, or an empty one if it is missing or from another version."""
+        try:
+            data = np.load(path)
+        except (OSError, ValueError):
+            return cls(**kwargs)
+        if int(data['version']) != FORMAT_VERSION:
+            return cls(**kwargs)
+        predictor = cls(dim=int(data['dim']), **kwargs)
+        predictor.synced = float(data['synced'])
+        for key, digest, x, y in zip(data['ids'].tolist(), data['digests'].tolist(), data['X'], data['Y']):
+            predictor._add(x, y, 1)
+            predictor._rows[key] = (digest, x, y)
+        return predictor
@@ -0,0 +1,297 @@
+"""
+LLM backends behind one small interface.
+
+Every provider exposes generate_content(prompt, stream=False) with the
+same shape as genai.GenerativeModel: a response with .text, or an
+iterator of chunks with .text when streaming. That is the interface
+stream_analysis already accepts through its model argument, so Gemini,
+any OpenAI-compatible HTTP endpoint, a local llama.cpp/Ollama server and
+the in-process mock are interchangeable. Instances are long-lived and
+pooled per (backend, endpoint, key, model) by get_provider().
+"""
+
+import http.client
+import json
+import queue
+import select
+import threading
+from urllib.parse import urlsplit
+
+from postpro.analyzer import MODEL_NAME, get_model, parse_response
+from postpro.fakes import FakeGenerativeModel
+from postpro.schema import validate
+
+PROVIDERS = ('gemini', 'openai', 'ollama', 'mock')
+
+
+class ProviderError(Exception):
+    """Non-2xx answer from an HTTP backend; retryable for 429 and 5xx."""
+
+    def __init__(self, status: int, body: str):
+        super().__init__(f"{status} {body[:300]}")
+        self.status = status
+        self.retryable = status == 429 or status >= 500
+
+
+class Completion:
+    """A response or streamed chunk carrying .text, like genai's."""
+
+    __slots__ = ('text',)
+
+    def __init__(self, text: str):
+        self.text = text
+
+
+class GeminiProvider:
+    """Google Gemini through the shared per-key GenerativeModel."""
+
+    needs_key = True
+
+    def __init__(self, api_key: str, model: str = MODEL_NAME):
+        self.api_key = api_key
+        self.model = model
+        self.name = f"gemini:{model}"
+
+    def generate_content(self, prompt: str, stream: bool = False, **kwargs):
+        return get_model(self.api_key, self.model).generate_content(prompt, stream=stream, **kwargs)
+
+
+class _HTTPPool:
+    """Keep-alive connections to one host, reused across threads."""
+
+    def __init__(self, base_url: str, size: int = 4, timeout: float = 120.0):
+        parts = urlsplit(base_url)
+        self.https = parts.scheme == 'https'
+        self.host = parts.hostname
+        self.port = parts.port
+        self.prefix = parts.path.rstrip('/')
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def _connect(self):
+        cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        return cls(self.host, self.port, timeout=self.timeout)
+
+    def _acquire(self):
+        """An idle connection the server has not closed, or a new one."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            # An idle connection is only readable once the server has closed it
+            if conn.sock is not None and not select.select([conn.sock], [], [], 0)[0]:
+                return conn
+            conn.close()
+
+    def request(self, path: str, body: dict, headers: dict):
+        """POST JSON; returns (connection, response). Call release() when the body is consumed.
+
+        Only a failure to connect or send is retried. Once the request is
+        sent the server may be acting on it, so a POST that fails while
+        waiting for the answer is not sent twice.
+        """
+        conn = self._acquire()
+        payload = json.dumps(body).encode('utf-8')
+        headers = dict(headers, **{'Content-Type': 'application/json'})
+        try:
+            conn.request('POST', self.prefix + path, payload, headers)
+        except (http.client.HTTPException, OSError):
+            conn.close()
+            conn = self._connect()
+            conn.request('POST', self.prefix + path, payload, headers)
+        try:
+            return conn, conn.getresponse()
+        except BaseException:
+            conn.close()
+            raise
+
+    def release(self, conn, response):
+        if response.will_close:
+            conn.close()
+            return
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
+class OpenAICompatibleProvider:
+    """Any /chat/completions endpoint: OpenAI, OpenRouter, vLLM, llama.cpp, Ollama..."""
+
+    needs_key = True
+
+    def __init__(self, api_key: str = None, model: str = 'gpt-4o-mini',
+                 base_url: str = 'https://api.openai.com/v1', json_mode: bool = True):
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url
+        self.json_mode = json_mode
+        self.name = f"openai:{model}@{base_url}"
+        self._pool = _HTTPPool(base_url)
+
+    def _body(self, prompt: str, stream: bool) -> dict:
+        body = {
+            'model': self.model,
+            'messages': [{'role': 'user', 'content': prompt}],
+            'stream': stream,
+        }
+        if self.json_mode:
+            body['response_format'] = {'type': 'json_object'}
+        return body
+
+    def _post(self, prompt: str, stream: bool):
+        headers = {'Authorization': f'Bearer {self.api_key}'} if self.api_key else {}
+        conn, response = self._pool.request('/chat/completions', self._body(prompt, stream), headers)
+        if response.status >= 300:
+            text = response.read().decode('utf-8', 'replace')
+            self._pool.release(conn, response)
+            raise ProviderError(response.status, text)
+        return conn, response
+
+    def generate_content(self, prompt: str, stream: bool = False, **kwargs):
+        conn, response = self._post(prompt, stream)
+        if stream:
+            return self._stream(conn, response)
+        data = json.loads(response.read())
+        self._pool.release(conn, response)
+        return Completion(data['choices'][0]['message'].get('content') or '')
+
+    def _stream(self, conn, response):
+        # Server-sent events: one "data: {...}" line per delta, then "data: [DONE]"
+        try:
+            while True:
+                line = response.readline()
+                if not line:
+                    break
+                line = line.strip()
+                if not line.startswith(b'data:'):
+                    continue
+                data = line[5:].strip()
+                if data == b'[DONE]':
+                    response.read()
+                    break
+                choices = json.loads(data).get('choices') or [{}]
+                text = choices[0].get('delta', {}).get('content')
+                if text:
+                    yield Completion(text)
+        finally:
+            self._pool.release(conn, response)
+
+
+class OllamaProvider(OpenAICompatibleProvider):
+    """Local model server (Ollama or llama.cpp) via its OpenAI-compatible API; no key needed."""
+
+    needs_key = False
+
+    def __init__(self, model: str = 'llama3.1', base_url: str = 'http://localhost:11434/v1',
+                 api_key: str = None):
+        super().__init__(api_key=api_key, model=model, base_url=base_url)
+        self.name = f"ollama:{model}@{base_url}"
+
+
+class MockProvider(FakeGenerativeModel):
+    """In-process deterministic provider for tests, demos and load tests."""
+
+    needs_key = False
+    name = 'mock'
+
+
+def confidence(text: str) -> float:
+    """How much to trust a fast model's answer, from 0 to 1.
+
+    Unparseable or incomplete answers get 0. Otherwise confidence grows
+    with the score's distance from the 40/70 risk-band boundaries, where
+    a stronger model is most likely to disagree.
+    """
+    try:
+        result, missing = validate(parse_response(text))
+    except json.JSONDecodeError:
+        return 0.0
+    if missing:
+        return 0.0
+    score = result['score']
+    return min(1.0, min(abs(score - 40), abs(score - 70)) / 15)
+
+
+class FallbackRouter:
+    """Ask a fast model first; escalate to a stronger one when unsure.
+
+    Most drafts are clear passes or clear failures, which the fast model
+    settles alone; only answers below min_confidence (see confidence())
+    or failed calls pay for the strong model. When streaming, the fast
+    answer is buffered until it has been judged. answered_by is the model
+    that answered the calling thread's last request, so usage is billed
+    at that model's price rather than under the router's name.
+    """
+
+    def __init__(self, fast, strong, min_confidence: float = 0.34):
+        self.fast = fast
+        self.strong = strong
+        self.min_confidence = min_confidence
+        self.name = f"{fast.name}>{strong.name}"
+        self.needs_key = fast.needs_key or strong.needs_key
+        self.calls = 0
+        self.escalations = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def answered_by(self):
+        return getattr(self._local, 'model', None)
+
+    def generate_content(self, prompt: str, stream: bool = False, **kwargs):
+        with self._lock:
+            self.calls += 1
+        try:
+            text = self.fast.generate_content(prompt, **kwargs).text
+        except Exception:
+            text = ''
+        if confidence(text) >= self.min_confidence:
+            self._local.model = self.fast
+            return iter([Completion(text)]) if stream else Completion(text)
+        with self._lock:
+            self.escalations += 1
+        self._local.model = self.strong
+        return self.strong.generate_content(prompt, stream=stream, **kwargs)
+
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def get_provider(kind: str, api_key: str = None, model: str = None, base_url: str = None,
+                 escalate_to: str = None):
+    """Shared provider instance for one backend/endpoint/key/model.
+
+    With escalate_to, returns a FallbackRouter from model to that
+    stronger model on the same backend.
+    """
+    if escalate_to:
+        key = (kind, api_key, model, base_url, escalate_to)
+        with _instances_lock:
+            router = _instances.get(key)
+        if router is None:
+            router = FallbackRouter(get_provider(kind, api_key, model, base_url),
+                                    get_provider(kind, api_key, escalate_to, base_url))
+            with _instances_lock:
+                router = _instances.setdefault(key, router)
+        return router
+
+    key = (kind, api_key, model, base_url)
+    with _instances_lock:
+        provider = _instances.get(key)
+        if provider is None:
+            options = {k: v for k, v in (('model', model), ('base_url', base_url)) if v}
+            if kind == 'gemini':
+                provider = GeminiProvider(api_key, **options)
+            elif kind == 'openai':
+                provider = OpenAICompatibleProvider(api_key, **options)
+            elif kind == 'ollama':
+                provider = OllamaProvider(api_key=api_key, **options)
+            elif kind == 'mock':
+                provider = MockProvider()
+            else:
+                raise ValueError(f"Unknown provider {kind!r}; expected one of {', '.join(PROVIDERS)}")
+            _instances[key] = provider
+        return provider
@@ -0,0 +1,169 @@
+"""
+Record/replay transport for model calls.
+
+RecordingModel wraps any provider and appends each answer to a cassette:
+a JSONL file keyed by a hash of the prompt, with time to first token,
+total time, chunk sizes and the API's token counts. ReplayModel serves
+the same answers offline. It can replay each answer's own timing, sample
+timing from the whole cassette (a realistic latency distribution for any
+prompt), or answer instantly. Record once against the real API, then
+benchmark and regression-test without a key or network.
+"""
+
+import hashlib
+import json
+import random
+import threading
+import time
+from types import SimpleNamespace
+
+from postpro.fakes import FakeResponse
+
+_USAGE_FIELDS = ('prompt_token_count', 'candidates_token_count', 'cached_content_token_count')
+
+
+def prompt_key(prompt) -> str:
+    """Cassette key for a prompt."""
+    return hashlib.sha256(str(prompt).encode('utf-8')).hexdigest()[:32]
+
+
+def _usage(response) -> dict:
+    metadata = getattr(response, 'usage_metadata', None)
+    if metadata is None or not getattr(metadata, 'prompt_token_count', 0):
+        return None
+    return {field: getattr(metadata, field, 0) or 0 for field in _USAGE_FIELDS}
+
+
+def load_cassette(path: str) -> dict:
+    """{prompt key: entry} from a cassette file; later recordings win."""
+    entries = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                entries[entry['key']] = entry
+    return entries
+
+
+class RecordingModel:
+    """Pass calls through to inner and append every answer to the cassette at path."""
+
+    def __init__(self, inner, path: str):
+        self.inner = inner
+        self.path = path
+        self.name = getattr(inner, 'name', 'gemini')
+        self.model = getattr(inner, 'model', None) or self.name
+        self.needs_key = getattr(inner, 'needs_key', True)
+        self.recorded = 0
+        self._lock = threading.Lock()
+
+    def _record(self, prompt, text: str, chunks, ttft: float, total: float, response):
+        entry = {'key': prompt_key(prompt), 'model': self.model, 'text': text, 'chunks': chunks,
+                 'ttft_ms': round(ttft * 1000, 1), 'total_ms': round(total * 1000, 1),
+                 'usage': _usage(response)}
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + '\n')
+            self.recorded += 1
+
+    def generate_content(self, prompt, stream: bool = False, **kwargs):
+        start = time.perf_counter()
+        if not stream:
+            response = self.inner.generate_content(prompt, **kwargs)
+            elapsed = time.perf_counter() - start
+            self._record(prompt, response.text, None, elapsed, elapsed, response)
+            return response
+        return self._stream(prompt, start, kwargs)
+
+    def _stream(self, prompt, start: float, kwargs):
+        chunks, ttft, response = [], None, None
+        for response in self.inner.generate_content(prompt, stream=True, **kwargs):
+            if ttft is None:
+                ttft = time.perf_counter() - start
+            chunks.append(response.text)
+            yield response
+        total = time.perf_counter() - start
+        self._record(prompt, ''.join(chunks), [len(c) for c in chunks], ttft or total, total, response)
+
+
+class ReplayModel:
+    """Serve recorded answers offline.
+
+    latency is 'recorded' (each answer's own timing), 'sampled' (timing
+    drawn from every entry in the cassette, seeded) or 'none'; scale
+    multiplies every delay. Prompts missing from the cassette go to
+    fallback (e.g. a MockProvider) or raise LookupError.
+    """
+
+    needs_key = False
+
+    def __init__(self, path: str, latency: str = 'recorded', scale: float = 1.0, seed: int = 0,
+                 fallback=None):
+        if latency not in ('recorded', 'sampled', 'none'):
+            raise ValueError(f"Unknown latency mode {latency!r}")
+        self.entries = load_cassette(path)
+        self.latency = latency
+        self.scale = scale
+        self.fallback = fallback
+        models = [e['model'] for e in self.entries.values()]
+        self.model = max(set(models), key=models.count) if models else 'replay'
+        self.name = f"replay:{self.model}"
+        self.calls = self.misses = 0
+        self._timings = [(e['ttft_ms'] / 1000, e['total_ms'] / 1000) for e in self.entries.values()]
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _timing(self, entry) -> tuple:
+        if self.latency == 'none' or not self.scale:
+            return 0.0, 0.0
+        if self.latency == 'sampled':
+            with self._lock:
+                ttft, total = self._rng.choice(self._timings)
+        else:
+            ttft, total = entry['ttft_ms'] / 1000, entry['total_ms'] / 1000
+        return ttft * self.scale, total * self.scale
+
+    def generate_content(self, prompt, stream: bool = False, **kwargs):
+        entry = self.entries.get(prompt_key(prompt))
+        with self._lock:
+            self.calls += 1
+            self.misses += entry is None
+        if entry is None:
+            if self.fallback is None:
+                raise LookupError("No recorded answer for this prompt; re-record the cassette")
+            return self.fallback.generate_content(prompt, stream=stream, **kwargs)
+        ttft, total = self._timing(entry)
+        if not stream:
+            time.sleep(total)
+            return self._response(entry, entry['text'])
+        return self._stream(entry, ttft, total)
+
+    def _response(self, entry, text: str):
+        response = FakeResponse(text)
+        if entry.get('usage'):
+            response.usage_metadata = SimpleNamespace(**entry['usage'])
+        return response
+
+    def _stream(self, entry, ttft: float, total: float):
+        text = entry['text']
+        sizes = entry.get('chunks') or [len(text)]
+        pause = max(0.0, total - ttft) / len(sizes)
+        time.sleep(ttft)
+        pos = 0
+        for i, size in enumerate(sizes):
+            if i:
+                time.sleep(pause)
+            chunk = text[pos:pos + size]
+            pos += size
+            # Token counts arrive with the last chunk, as with the real API
+            yield self._response(entry, chunk) if i == len(sizes) - 1 else FakeResponse(chunk)
+
+    def profile(self) -> dict:
+        """Percentiles of the recorded time to first token and total time, in ms."""
+        if not self._timings:
+            return {}
+        ttfts = sorted(t for t, _ in self._timings)
+        totals = sorted(t for _, t in self._timings)
+        pct = lambda values, q: round(values[min(len(values) - 1, int(len(values) * q))] * 1000, 1)
+        return {'entries': len(self._timings), 'ttft_p50_ms': pct(ttfts, 0.5), 'ttft_p95_ms': pct(ttfts, 0.95),
+                'total_p50_ms': pct(totals, 0.5), 'total_p95_ms': pct(totals, 0.95)}
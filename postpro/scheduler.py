@@ -0,0 +1,292 @@
+"""
+Process-wide analysis scheduler for multi-user deployments.
+
+Every session submits its model calls here instead of making them on its
+own script thread. A fixed pool of workers serves the queue, with at
+most per_key calls in flight per API key (and optional per-key request
+pacing). Queues are fair: API keys take turns, and within a key each
+session takes turns, so one user's 200-draft batch cannot starve
+everyone else's single analysis. Identical in-flight requests are
+coalesced: the second submitter gets the first one's Job and both read
+the same stream.
+"""
+
+import contextvars
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+
+from postpro.analyzer import MODEL_NAME, PROMPT_VERSION, stream_analysis
+from postpro.batch import TokenBucket, backoff_delay
+from postpro.cache import analysis_key
+from postpro.tracing import tracer
+
+
+class Job:
+    """One scheduled call; a handle shared by every request it coalesced.
+
+    Items are published as the call produces them (partial snapshots,
+    then the final result); any number of readers can stream() them.
+    """
+
+    def __init__(self, key, api_key: str, session: str, fn):
+        self.key = key
+        self.api_key = api_key
+        self.session = session
+        self.fn = fn
+        # Run in the submitter's context, so its tracing (and parent span) carries over
+        self.context = contextvars.copy_context()
+        self.subscribers = 1
+        self.enqueued = time.monotonic()
+        self.started = None
+        self.finished = None
+        self._items = []
+        self._callbacks = []
+        self._cond = threading.Condition()
+
+    def publish(self, item):
+        with self._cond:
+            self._items.append(item)
+            self._cond.notify_all()
+
+    def finish(self):
+        with self._cond:
+            self.finished = time.monotonic()
+            self._cond.notify_all()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback(self)
+
+    def done(self) -> bool:
+        return self.finished is not None
+
+    def stream(self, timeout: float = None):
+        """Yield every item published so far, then new ones until the job finishes."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        seen = 0
+        while True:
+            with self._cond:
+                while seen == len(self._items) and self.finished is None:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError("Analysis did not finish in time")
+                    self._cond.wait(remaining)
+                items = self._items[seen:]
+                finished = self.finished is not None
+            seen += len(items)
+            yield from items
+            if finished and seen == len(self._items):
+                return
+
+    def result(self, timeout: float = None) -> dict:
+        """The final item, waiting for it if necessary."""
+        result = {}
+        for result in self.stream(timeout):
+            pass
+        return result
+
+    def add_done_callback(self, fn):
+        """Call fn(job) once finished (immediately if it already is)."""
+        with self._cond:
+            if self.finished is None:
+                self._callbacks.append(fn)
+                return
+        fn(self)
+
+    @property
+    def wait_ms(self):
+        """Time spent queued before a worker picked the job up."""
+        end = self.started if self.started is not None else time.monotonic()
+        return (end - self.enqueued) * 1000
+
+
+def as_completed(jobs):
+    """Yield jobs in the order they finish."""
+    finished = queue.Queue()
+    jobs = list(jobs)
+    for job in jobs:
+        job.add_done_callback(finished.put)
+    for _ in jobs:
+        yield finished.get()
+
+
+def key_label(api_key: str) -> str:
+    """Printable name for an API key in metrics (never the key itself)."""
+    return f"…{api_key[-4:]}" if api_key else 'no key'
+
+
+class AnalysisScheduler:
+    """Shared worker pool with per-key concurrency caps, fair queues and coalescing."""
+
+    def __init__(self, workers: int = 16, per_key: int = 4, requests_per_second: float = None,
+                 retries: int = 4, base_delay: float = 1.0, window: int = 1024):
+        self.workers = workers
+        self.per_key = per_key
+        self.requests_per_second = requests_per_second
+        self.retries = retries
+        self.base_delay = base_delay
+        # api_key -> session -> deque of jobs; both levels rotate for round-robin
+        self._queues = OrderedDict()
+        self._running = {}
+        self._inflight = {}
+        self._buckets = {}
+        self._cond = threading.Condition()
+        self.submitted = 0
+        self.coalesced = 0
+        self.completed = 0
+        self._waits = deque(maxlen=window)
+        self._runs = deque(maxlen=window)
+        self._threads = [threading.Thread(target=self._work, daemon=True) for _ in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, key, api_key: str, session: str, fn) -> Job:
+        """Queue fn (a generator function) under key; an identical in-flight key shares its Job."""
+        with self._cond:
+            self.submitted += 1
+            job = self._inflight.get(key) if key is not None else None
+            if job is not None:
+                job.subscribers += 1
+                self.coalesced += 1
+                return job
+            job = Job(key, api_key, session, fn)
+            if key is not None:
+                self._inflight[key] = job
+            sessions = self._queues.setdefault(api_key, OrderedDict())
+            sessions.setdefault(session, deque()).append(job)
+            self._cond.notify()
+            return job
+
+    def submit_analysis(self, anchor: str, draft: str, api_key: str, session: str = '',
+                        model=None, stream: bool = True, **kwargs) -> Job:
+        """stream_analysis as a scheduled Job, retried on transient errors.
+
+        Extra keyword arguments (cache, context_cache, linter) go to
+        stream_analysis. Requests for the same (anchor, draft, model, key,
+        stream) while one is in flight share it; a blocking request never
+        joins a streamed one, since it expects no partial results.
+        """
+        key = (analysis_key(anchor, draft, PROMPT_VERSION, getattr(model, 'name', MODEL_NAME)),
+               api_key, id(model), kwargs.get('linter') is not None, stream)
+
+        def run():
+            bucket = self._bucket(api_key)
+            for attempt in range(self.retries + 1):
+                if bucket is not None:
+                    bucket.acquire()
+                result = {}
+                for result in stream_analysis(anchor, draft, api_key, model=model, stream=stream, **kwargs):
+                    if result.get('partial'):
+                        yield result
+                if not result.get('retryable') or attempt == self.retries:
+                    break
+                delay = backoff_delay(attempt, self.base_delay)
+                if result.get('rate_limited') and bucket is not None:
+                    bucket.penalize(delay)
+                time.sleep(delay)
+            result.pop('retryable', None)
+            result.pop('rate_limited', None)
+            yield result
+
+        return self.submit(key, api_key, session, run)
+
+    def _bucket(self, api_key: str):
+        if not self.requests_per_second:
+            return None
+        with self._cond:
+            bucket = self._buckets.get(api_key)
+            if bucket is None:
+                bucket = self._buckets[api_key] = TokenBucket(self.requests_per_second)
+            return bucket
+
+    def _next_job(self):
+        """Next runnable job, rotating keys and sessions (call with the lock held)."""
+        for api_key, sessions in self._queues.items():
+            if self._running.get(api_key, 0) >= self.per_key:
+                continue
+            session, jobs = next(iter(sessions.items()))
+            job = jobs.popleft()
+            if jobs:
+                sessions.move_to_end(session)
+            else:
+                del sessions[session]
+            if sessions:
+                self._queues.move_to_end(api_key)
+            else:
+                del self._queues[api_key]
+            self._running[api_key] = self._running.get(api_key, 0) + 1
+            return job
+        return None
+
+    def _run(self, job: Job):
+        with tracer.span('scheduler.job', wait_ms=job.wait_ms, subscribers=job.subscribers):
+            try:
+                for item in job.fn():
+                    job.publish(item)
+            except Exception as e:
+                job.publish({"error": str(e)})
+
+    def _work(self):
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None:
+                    self._cond.wait()
+                    job = self._next_job()
+                job.started = time.monotonic()
+            job.context.run(self._run, job)
+            with self._cond:
+                self._running[job.api_key] -= 1
+                if self._inflight.get(job.key) is job:
+                    del self._inflight[job.key]
+                self.completed += 1
+                self._waits.append(job.wait_ms)
+                self._runs.append((time.monotonic() - job.started) * 1000)
+                self._cond.notify_all()
+            job.finish()
+
+    def position(self, job: Job) -> int:
+        """Other jobs waiting on job's API key (0 once it is running)."""
+        with self._cond:
+            if job.started is not None:
+                return 0
+            sessions = self._queues.get(job.api_key, {})
+            return sum(len(jobs) for jobs in sessions.values()) - 1
+
+    def stats(self) -> dict:
+        """Queue depth, concurrency and wait/run time percentiles."""
+        with self._cond:
+            waits = sorted(self._waits)
+            runs = sorted(self._runs)
+            by_key = {
+                key_label(api_key): {
+                    'queued': sum(len(jobs) for jobs in self._queues.get(api_key, {}).values()),
+                    'running': self._running.get(api_key, 0),
+                    'sessions': len(self._queues.get(api_key, {})),
+                }
+                for api_key in set(self._queues) | {k for k, n in self._running.items() if n}
+            }
+            stats = {
+                'workers': self.workers,
+                'per_key': self.per_key,
+                'queued': sum(k['queued'] for k in by_key.values()),
+                'running': sum(self._running.values()),
+                'submitted': self.submitted,
+                'coalesced': self.coalesced,
+                'completed': self.completed,
+                'keys': by_key,
+            }
+        pct = lambda values, q: values[min(len(values) - 1, int(len(values) * q))] if values else 0.0
+        stats.update({'wait_p50_ms': pct(waits, 0.5), 'wait_p95_ms': pct(waits, 0.95),
+                      'wait_max_ms': waits[-1] if waits else 0.0, 'run_p50_ms': pct(runs, 0.5)})
+        return stats
+
+
+def scheduler_from_env() -> AnalysisScheduler:
+    """Scheduler sized by POSTPRO_WORKERS / POSTPRO_KEY_CONCURRENCY / POSTPRO_KEY_RPS."""
+    rps = float(os.environ.get('POSTPRO_KEY_RPS', '0')) or None
+    return AnalysisScheduler(workers=int(os.environ.get('POSTPRO_WORKERS', '16')),
+                             per_key=int(os.environ.get('POSTPRO_KEY_CONCURRENCY', '4')),
+                             requests_per_second=rps)
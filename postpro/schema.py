@@ -0,0 +1,222 @@
+"""
+The analysis output contract: schema, validation and local repair.
+
+ANALYSIS_SCHEMA is sent to backends that support constrained decoding
+(Gemini's response_schema). Everything else goes through repair_json()
+and validate(), which fix the usual ways a model breaks JSON - fences,
+chatter, trailing commas, Python literals, truncation - and coerce
+fields to their contract types, so a slightly malformed answer no
+longer costs a full re-run. Fields that cannot be salvaged are reported
+as missing, and only those are re-requested.
+"""
+
+import ast
+import json
+import re
+
+RISK_LEVELS = ('Low', 'Medium', 'High')
+ANALYSIS_KEYS = ('visual_physics', 'tonal_dna', 'hook_comparison')
+
+ANALYSIS_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'score': {'type': 'integer'},
+        'verdict': {'type': 'string'},
+        'risk_level': {'type': 'string', 'enum': list(RISK_LEVELS)},
+        'analysis': {
+            'type': 'object',
+            'properties': {key: {'type': 'string'} for key in ANALYSIS_KEYS},
+            'required': list(ANALYSIS_KEYS),
+        },
+        'fatal_errors': {'type': 'array', 'items': {'type': 'string'}},
+        'fix_suggestions': {'type': 'array', 'items': {'type': 'string'}},
+        'rewritten_hook': {'type': 'string'},
+    },
+    'required': ['score', 'verdict', 'risk_level', 'analysis', 'fatal_errors',
+                 'fix_suggestions', 'rewritten_hook'],
+}
+
+REQUIRED = tuple(ANALYSIS_SCHEMA['required'])
+
+_FENCE = re.compile(r"```(?:json|JSON)?\s*(.*?)(?:```|$)", re.DOTALL)
+_TRAILING_COMMA = re.compile(r",(\s*[}\]])")
+_SMART_QUOTES = str.maketrans({'“': '"', '”': '"'})
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+# A key without its value; only meaningful when the innermost open container is an object
+_DANGLING_KEY = re.compile(r'([,{])\s*"[^"]*"\s*:?\s*$')
+_DANGLING_SEPARATOR = re.compile(r'[,:]\s*$')
+# A number or literal running into the end of the text
+_OPEN_SCALAR = re.compile(r'[\w.+-]+\Z')
+
+
+def _close_truncated(text: str) -> str:
+    """Close any brackets left open at the end of a truncated answer.
+
+    A string, number or literal cut off mid-way is dropped rather than
+    closed, so a half written field counts as missing instead of passing
+    as complete (a score cut at "8" may have been 85).
+    """
+    stack = []
+    in_string = escape = False
+    string_start = 0
+    for i, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == '\\':
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+            string_start = i
+        elif ch in '{[':
+            stack.append('}' if ch == '{' else ']')
+        elif ch in '}]' and stack:
+            stack.pop()
+    if in_string:
+        text = text[:string_start]
+    elif stack:
+        # Nothing delimits the last scalar, so it may be missing digits or letters
+        text = _OPEN_SCALAR.sub('', text)
+    text = text.rstrip()
+    # A dangling key, colon or comma cannot be completed; drop it. In an
+    # array a trailing string is a finished element and stays
+    if stack and stack[-1] == '}':
+        text = _DANGLING_KEY.sub(r'\1', text)
+    text = _DANGLING_SEPARATOR.sub('', text)
+    return text + ''.join(reversed(stack))
+
+
+def repair_json(text: str) -> dict:
+    """Best-effort decode of a model's JSON object.
+
+    Raises json.JSONDecodeError when nothing object-like can be recovered.
+    """
+    # Trailing whitespace stays: it tells a finished number from a cut-off one
+    text = text.lstrip()
+    try:
+        result = json.loads(text)
+        if isinstance(result, dict):
+            return result
+    except json.JSONDecodeError:
+        pass
+
+    fenced = _FENCE.search(text)
+    if fenced:
+        text = fenced.group(1)
+    start = text.find('{')
+    if start < 0:
+        raise json.JSONDecodeError("No JSON object in response", text, 0)
+    end = text.rfind('}')
+    # The whole tail first (possibly truncated), then up to the last brace (trailing chatter)
+    candidates = [text[start:]]
+    if end > start:
+        candidates.append(text[start:end + 1])
+
+    for candidate in candidates:
+        for attempt in (candidate, candidate.translate(_SMART_QUOTES)):
+            attempt = _TRAILING_COMMA.sub(r'\1', attempt)
+            for fixed in (attempt, _close_truncated(attempt)):
+                try:
+                    result = json.loads(fixed, strict=False)
+                except json.JSONDecodeError:
+                    try:
+                        # Single quotes and True/False/None: the model wrote a Python dict
+                        result = ast.literal_eval(fixed)
+                    except (ValueError, SyntaxError, MemoryError, RecursionError):
+                        continue
+                if isinstance(result, dict):
+                    return result
+    raise json.JSONDecodeError("Could not repair JSON response", text, start)
+
+
+def _as_text(value):
+    if isinstance(value, str):
+        return value.strip() or None
+    if isinstance(value, (list, tuple)):
+        return ' '.join(str(v) for v in value) or None
+    return None if value is None else str(value)
+
+
+def _as_list(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        lines = [re.sub(r'^\s*(?:[-*•]|\d+[.)])\s*', '', line) for line in value.split('\n')]
+        return [line.strip() for line in lines if line.strip()]
+    if isinstance(value, (list, tuple)):
+        return [str(v).strip() for v in value if v is not None and str(v).strip()]
+    return None
+
+
+def _as_score(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        score = float(value)
+    else:
+        match = _NUMBER.search(str(value or ''))
+        if not match:
+            return None
+        score = float(match.group())
+        # "8.5/10" style answers
+        if re.search(r'/\s*10\b', str(value)) and score <= 10:
+            score *= 10
+    return int(round(min(100.0, max(0.0, score))))
+
+
+def _as_risk(value, score):
+    text = str(value or '').strip().lower()
+    for level in RISK_LEVELS:
+        if text.startswith(level.lower()):
+            return level
+    if score is not None:
+        return 'Low' if score >= 70 else 'Medium' if score >= 40 else 'High'
+    return None
+
+
+def validate(result: dict):
+    """Coerce a decoded answer to the contract.
+
+    Returns (clean, missing): clean holds every field that could be
+    salvaged, missing names the required fields that could not.
+    """
+    clean = {}
+    score = _as_score(result.get('score'))
+    if score is not None:
+        clean['score'] = score
+    for name in ('verdict', 'rewritten_hook'):
+        text = _as_text(result.get(name))
+        if text is not None:
+            clean[name] = text
+    risk = _as_risk(result.get('risk_level'), score)
+    if risk is not None:
+        clean['risk_level'] = risk
+
+    analysis = result.get('analysis')
+    if isinstance(analysis, dict):
+        parts = {key: _as_text(analysis.get(key)) for key in ANALYSIS_KEYS}
+        if all(parts.values()):
+            clean['analysis'] = parts
+
+    fatal = _as_list(result.get('fatal_errors'))
+    # An omitted or null list of fatal errors means there were none
+    clean['fatal_errors'] = fatal or []
+    suggestions = _as_list(result.get('fix_suggestions'))
+    if suggestions:
+        clean['fix_suggestions'] = suggestions
+
+    missing = [name for name in REQUIRED if name not in clean]
+    return clean, missing
+
+
+def missing_fields_prompt(prompt: str, partial: dict, missing: list) -> str:
+    """Follow-up prompt asking only for the fields an answer lacked."""
+    return (
+        prompt
+        + "\n\nYou already returned this partial analysis:\n"
+        + json.dumps(partial, ensure_ascii=False)
+        + "\n\nReturn ONLY a JSON object with these missing fields, in the same format: "
+        + ", ".join(missing)
+    )
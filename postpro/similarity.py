@@ -0,0 +1,224 @@
+"""
+Vector index over post history for finding stylistically similar anchors.
+
+Posts are embedded by a pluggable embedder into unit-length float32 rows
+of one NumPy matrix (optionally memory-mapped from disk), so a top-K
+cosine search is a single matrix-vector product.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import zlib
+
+import numpy as np
+
+from postpro.analyzer import get_client
+
+_WORD = re.compile(r"\w+|[^\w\s]")
+
+
+class HashingEmbedder:
+    """Local, dependency-free embedder using the hashing trick.
+
+    Word uni/bigrams capture vocabulary; character trigrams (including
+    punctuation and line breaks) capture style. Counts are sublinear and
+    every vector is L2-normalised.
+    """
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def _features(self, text: str):
+        lowered = text.lower()
+        words = _WORD.findall(lowered)
+        feats = words + [a + ' ' + b for a, b in zip(words, words[1:])]
+        feats += ['#' + lowered[i:i + 3] for i in range(len(lowered) - 2)]
+        return feats
+
+    def embed(self, texts) -> np.ndarray:
+        """(len(texts), dim) float32 matrix of unit vectors."""
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            counts = {}
+            for feat in self._features(text):
+                h = zlib.crc32(feat.encode('utf-8'))
+                key = (h % self.dim, 1.0 if h & 0x80000000 else -1.0)
+                counts[key] = counts.get(key, 0) + 1
+            for (col, sign), n in counts.items():
+                out[row, col] += sign * (1.0 + np.log(n))
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return out / norms
+
+
+class GeminiEmbedder:
+    """Remote embedder backed by Gemini's embedding endpoint."""
+
+    def __init__(self, api_key: str, model: str = 'models/text-embedding-004', dim: int = 768):
+        self.api_key = api_key
+        self.model = model
+        self.dim = dim
+
+    def embed(self, texts) -> np.ndarray:
+        import google.generativeai as genai
+
+        result = genai.embed_content(model=self.model, content=list(texts),
+                                     task_type='semantic_similarity', client=get_client(self.api_key))
+        vectors = np.asarray(result['embedding'], dtype=np.float32).reshape(len(texts), -1)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+
+def text_digest(text: str) -> str:
+    """Stable id for a post that has no URL yet."""
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class VectorIndex:
+    """Growable float32 matrix of post embeddings with top-K cosine search.
+
+    Each row has an id (the post URL, or a text digest for unpublished
+    posts) and a metadata dict (engagements, impressions, text...).
+    Re-adding an id with unchanged text is free; changed text re-embeds
+    just that row, and changed metadata never copies a mapped matrix.
+    """
+
+    def __init__(self, embedder=None):
+        self.embedder = embedder or HashingEmbedder()
+        self.ids = []
+        self.meta = []
+        self._digests = []
+        self._rows = {}
+        self._matrix = np.zeros((0, self.embedder.dim), dtype=np.float32)
+        self._engagements = np.zeros(0, dtype=np.float64)
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """The live (size, dim) slice of the embedding matrix."""
+        return self._matrix[:self._size]
+
+    def add(self, ids, texts, meta=None) -> int:
+        """Insert or update posts; returns how many rows changed (re-embedded or new metadata)."""
+        meta = meta or [{} for _ in ids]
+        with self._lock:
+            todo = []
+            updated = 0
+            for post_id, text, info in zip(ids, texts, meta):
+                digest = text_digest(text)
+                info = dict(info, text=text)
+                row = self._rows.get(post_id)
+                if row is not None:
+                    # Metadata and engagements live in RAM; only a new text touches the matrix
+                    if self.meta[row] != info:
+                        self.meta[row] = info
+                        self._engagements[row] = info.get('engagements') or 0
+                        updated += self._digests[row] == digest
+                    if self._digests[row] == digest:
+                        continue
+                todo.append((post_id, text, info, digest))
+            if not todo:
+                return updated
+
+            vectors = self.embedder.embed([t for _, t, _, _ in todo])
+            self._ensure_writable()
+            for (post_id, text, info, digest), vector in zip(todo, vectors):
+                row = self._rows.get(post_id)
+                if row is None:
+                    row = self._append_row()
+                    self._rows[post_id] = row
+                    self.ids.append(post_id)
+                    self.meta.append(info)
+                    self._digests.append(digest)
+                    self._engagements[row] = info.get('engagements') or 0
+                else:
+                    self._digests[row] = digest
+                self._matrix[row] = vector
+            return updated + len(todo)
+
+    def search(self, query, k: int = 5, min_engagements: int = None, exclude_ids=()) -> list:
+        """Top-k posts by cosine similarity to query (text or unit vector).
+
+        min_engagements keeps only proven posts; each hit is a dict with
+        id, similarity and the post's metadata.
+        """
+        if isinstance(query, str):
+            query = self.embedder.embed([query])[0]
+        with self._lock:
+            if not self._size:
+                return []
+            sims = self.matrix @ np.asarray(query, dtype=np.float32)
+            if min_engagements is not None or exclude_ids:
+                mask = np.ones(self._size, dtype=bool)
+                if min_engagements is not None:
+                    mask &= self._engagements[:self._size] >= min_engagements
+                for post_id in exclude_ids:
+                    if post_id in self._rows:
+                        mask[self._rows[post_id]] = False
+                sims = np.where(mask, sims, -np.inf)
+            k = min(k, self._size)
+            top = np.argpartition(-sims, k - 1)[:k]
+            top = top[np.argsort(-sims[top])]
+            return [
+                dict(self.meta[row], id=self.ids[row], similarity=float(sims[row]))
+                for row in top if np.isfinite(sims[row])
+            ]
+
+    def save(self, path: str):
+        """Write the matrix as .npy plus a JSON sidecar under directory path."""
+        os.makedirs(path, exist_ok=True)
+        with self._lock:
+            # Write then rename, so a reader mapping the old file is never clobbered
+            vectors = os.path.join(path, 'vectors.npy')
+            with open(vectors + '.tmp', 'wb') as f:
+                np.save(f, np.ascontiguousarray(self.matrix))
+            with open(os.path.join(path, 'meta.json.tmp'), 'w', encoding='utf-8') as f:
+                json.dump({'dim': self.embedder.dim, 'ids': self.ids, 'meta': self.meta,
+                           'digests': self._digests}, f, ensure_ascii=False, default=str)
+            os.replace(vectors + '.tmp', vectors)
+            os.replace(os.path.join(path, 'meta.json.tmp'), os.path.join(path, 'meta.json'))
+
+    @classmethod
+    def load(cls, path: str, embedder=None, mmap: bool = True):
+        """Load a saved index; the matrix is memory-mapped read-only by default."""
+        index = cls(embedder)
+        meta_path = os.path.join(path, 'meta.json')
+        if not os.path.exists(meta_path):
+            return index
+        with open(meta_path, encoding='utf-8') as f:
+            saved = json.load(f)
+        if saved['dim'] != index.embedder.dim:
+            return index
+        index._matrix = np.load(os.path.join(path, 'vectors.npy'), mmap_mode='r' if mmap else None)
+        index.ids = saved['ids']
+        index.meta = saved['meta']
+        index._digests = saved['digests']
+        index._rows = {post_id: row for row, post_id in enumerate(index.ids)}
+        index._engagements = np.array([m.get('engagements') or 0 for m in index.meta], dtype=np.float64)
+        index._size = len(index.ids)
+        return index
+
+    def _ensure_writable(self):
+        """Copy a memory-mapped matrix into RAM before the first write."""
+        if not self._matrix.flags.writeable:
+            self._matrix = np.array(self._matrix)
+
+    def _append_row(self) -> int:
+        if self._size == len(self._matrix):
+            capacity = max(64, 2 * len(self._matrix))
+            grown = np.zeros((capacity, self.embedder.dim), dtype=np.float32)
+            grown[:self._size] = self._matrix[:self._size]
+            self._matrix = grown
+            engagements = np.zeros(capacity, dtype=np.float64)
+            engagements[:self._size] = self._engagements[:self._size]
+            self._engagements = engagements
+        self._size += 1
+        return self._size - 1
@@ -0,0 +1,258 @@
+"""
+Merged store of successive LinkedIn exports.
+
+Each export only covers a window, so monthly uploads are merged into one
+SQLite database: posts are deduplicated by URL and keep their latest
+metrics, with a snapshot row written only when the metrics changed.
+"Latest" means the newest data, not the last upload: each export is
+dated by its newest trend or post date, and an older archive uploaded
+later only fills in posts and days the store has not seen.
+Imports compare incoming rows against an in-memory map of what is
+stored and write only the delta; an export already imported is skipped
+by digest.
+"""
+
+import threading
+import time
+
+from postpro.db import ConnectionPool
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY,
+    digest TEXT UNIQUE NOT NULL,
+    imported REAL NOT NULL,
+    as_of TEXT,
+    posts INTEGER NOT NULL,
+    new_posts INTEGER NOT NULL,
+    changed_posts INTEGER NOT NULL,
+    changed_days INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS posts (
+    url TEXT PRIMARY KEY,
+    published TEXT,
+    engagements INTEGER,
+    impressions INTEGER,
+    first_snapshot INTEGER NOT NULL REFERENCES snapshots(id),
+    last_snapshot INTEGER NOT NULL REFERENCES snapshots(id)
+);
+CREATE TABLE IF NOT EXISTS post_history (
+    url TEXT NOT NULL REFERENCES posts(url),
+    snapshot INTEGER NOT NULL REFERENCES snapshots(id),
+    engagements INTEGER,
+    impressions INTEGER,
+    PRIMARY KEY (url, snapshot)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS daily (
+    day TEXT PRIMARY KEY,
+    impressions INTEGER,
+    engagements INTEGER,
+    snapshot INTEGER NOT NULL REFERENCES snapshots(id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS demographics (
+    position INTEGER PRIMARY KEY,
+    value TEXT,
+    percentage REAL
+);
+"""
+
+
+def _day(value) -> str:
+    return value.isoformat() if hasattr(value, 'isoformat') else (str(value) if value else None)
+
+
+def as_of(parsed: dict) -> str:
+    """Date of the newest data in an export: its last trend day or post date."""
+    days = [_day(r.get('Date')) for r in parsed.get('trends', [])]
+    days += [_day(p.get('date')) for key in ('posts', 'top_by_engagement', 'top_by_impressions')
+             for p in parsed.get(key, [])]
+    return max((d[:10] for d in days if d), default='')
+
+
+class ExportStore:
+    """All imported exports merged by post URL and trend date."""
+
+    def __init__(self, path: str):
+        self.pool = ConnectionPool(path, size=2)
+        self._lock = threading.Lock()
+        self._posts = None
+        self._days = None
+        with self.pool.connection() as conn:
+            conn.executescript(SCHEMA)
+            columns = [r['name'] for r in conn.execute("PRAGMA table_info(snapshots)")]
+            if 'as_of' not in columns:
+                conn.execute("ALTER TABLE snapshots ADD COLUMN as_of TEXT")
+
+    def _load_state(self, conn):
+        # Loaded once per process; afterwards only the delta touches the database.
+        # Each row remembers the as-of date of the snapshot that wrote it
+        if self._posts is None:
+            self._posts = {
+                r['url']: ((r['published'], r['engagements'], r['impressions']), r['as_of'] or '')
+                for r in conn.execute(
+                    "SELECT p.url, p.published, p.engagements, p.impressions, s.as_of FROM posts p "
+                    "JOIN snapshots s ON s.id = p.last_snapshot"
+                )
+            }
+            self._days = {
+                r['day']: ((r['impressions'], r['engagements']), r['as_of'] or '')
+                for r in conn.execute(
+                    "SELECT d.day, d.impressions, d.engagements, s.as_of FROM daily d "
+                    "JOIN snapshots s ON s.id = d.snapshot"
+                )
+            }
+
+    def import_export(self, digest: str, parsed: dict) -> dict:
+        """Merge one parsed export; returns counts of what changed.
+
+        An export whose digest was imported before is skipped entirely.
+        Stored metrics are only overwritten by an export at least as new;
+        an older one only fills in what is missing.
+        """
+        with self._lock, self.pool.transaction() as conn:
+            seen = conn.execute("SELECT * FROM snapshots WHERE digest = ?", (digest,)).fetchone()
+            if seen is not None:
+                return dict(seen, skipped=True)
+            self._load_state(conn)
+
+            dated = as_of(parsed)
+            newest = conn.execute("SELECT COALESCE(MAX(as_of), '') FROM snapshots").fetchone()[0]
+            snapshot = conn.execute(
+                "INSERT INTO snapshots (digest, imported, as_of, posts, new_posts, changed_posts, changed_days) "
+                "VALUES (?, ?, ?, 0, 0, 0, 0)",
+                (digest, time.time(), dated),
+            ).lastrowid
+
+            new_posts, changed_posts, filled_posts, history = [], [], [], []
+            incoming = parsed.get('posts', [])
+            for post in incoming:
+                row = (_day(post.get('date')), post.get('engagements'), post.get('impressions'))
+                stored, stored_as_of = self._posts.get(post['url'], (None, ''))
+                if stored == row:
+                    continue
+                if stored is None:
+                    new_posts.append((post['url'], row))
+                    history.append((post['url'], row))
+                    continue
+                # The newer export's values win; the other one only fills gaps
+                newer = dated >= stored_as_of
+                new, old = (row, stored) if newer else (stored, row)
+                merged = tuple(old[i] if new[i] is None else new[i] for i in range(3))
+                if stored == merged:
+                    continue
+                if newer:
+                    changed_posts.append((post['url'], merged))
+                    history.append((post['url'], merged))
+                else:
+                    filled_posts.append((post['url'], merged))
+
+            conn.executemany(
+                "INSERT INTO posts (url, published, engagements, impressions, first_snapshot, last_snapshot) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(url, *row, snapshot, snapshot) for url, row in new_posts],
+            )
+            conn.executemany(
+                "UPDATE posts SET published = ?, engagements = ?, impressions = ?, last_snapshot = ? WHERE url = ?",
+                [(*row, snapshot, url) for url, row in changed_posts],
+            )
+            # Gap-filling from an older export keeps the post dated by its newer snapshot
+            conn.executemany(
+                "UPDATE posts SET published = ?, engagements = ?, impressions = ? WHERE url = ?",
+                [(*row, url) for url, row in filled_posts],
+            )
+            conn.executemany(
+                "INSERT INTO post_history (url, snapshot, engagements, impressions) VALUES (?, ?, ?, ?)",
+                [(url, snapshot, row[1], row[2]) for url, row in history],
+            )
+
+            changed_days = []
+            for record in parsed.get('trends', []):
+                day = _day(record.get('Date'))
+                if day is None:
+                    continue
+                row = (record.get('Impressions'), record.get('Engagements'))
+                stored, stored_as_of = self._days.get(day, (None, ''))
+                if stored != row and (stored is None or dated >= stored_as_of):
+                    changed_days.append((day, row))
+            conn.executemany(
+                "INSERT INTO daily (day, impressions, engagements, snapshot) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(day) DO UPDATE SET impressions = excluded.impressions, "
+                "engagements = excluded.engagements, snapshot = excluded.snapshot",
+                [(day, *row, snapshot) for day, row in changed_days],
+            )
+
+            if parsed.get('demographics') and dated >= newest:
+                conn.execute("DELETE FROM demographics")
+                conn.executemany(
+                    "INSERT INTO demographics (position, value, percentage) VALUES (?, ?, ?)",
+                    [(i, d['Value'], d['Percentage']) for i, d in enumerate(parsed['demographics'])],
+                )
+
+            counts = {
+                'posts': len(incoming),
+                'new_posts': len(new_posts),
+                'changed_posts': len(changed_posts) + len(filled_posts),
+                'changed_days': len(changed_days),
+            }
+            conn.execute(
+                "UPDATE snapshots SET posts = :posts, new_posts = :new_posts, "
+                "changed_posts = :changed_posts, changed_days = :changed_days WHERE id = :id",
+                dict(counts, id=snapshot),
+            )
+
+        # Only touch the in-memory state once the transaction has committed
+        for url, row in new_posts + changed_posts:
+            self._posts[url] = (row, dated)
+        for url, row in filled_posts:
+            self._posts[url] = (row, self._posts[url][1])
+        for day, row in changed_days:
+            self._days[day] = (row, dated)
+        return dict(counts, id=snapshot, digest=digest, skipped=False)
+
+    def version(self) -> int:
+        """Id of the latest snapshot; changes whenever merged data may have."""
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT COALESCE(MAX(id), 0) FROM snapshots").fetchone()[0]
+
+    def snapshots(self) -> list:
+        with self.pool.connection() as conn:
+            return [dict(r) for r in conn.execute("SELECT * FROM snapshots ORDER BY id")]
+
+    def post_history(self, url: str) -> list:
+        """Metrics of one post at every snapshot where they changed, oldest data first."""
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT s.imported, h.engagements, h.impressions FROM post_history h "
+                "JOIN snapshots s ON s.id = h.snapshot WHERE h.url = ? ORDER BY s.as_of, h.snapshot",
+                (url,),
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def merged(self) -> dict:
+        """The merged data in the same shape as parse_linkedin_xlsx()."""
+        with self.pool.connection() as conn:
+            posts = [
+                {'url': r['url'], 'date': r['published'], 'engagements': r['engagements'],
+                 'impressions': r['impressions']}
+                for r in conn.execute("SELECT url, published, engagements, impressions FROM posts")
+            ]
+            trends = [
+                {'Date': r['day'], 'Impressions': r['impressions'], 'Engagements': r['engagements']}
+                for r in conn.execute("SELECT day, impressions, engagements FROM daily ORDER BY day")
+            ]
+            demographics = [
+                {'Value': r['value'], 'Percentage': r['percentage']}
+                for r in conn.execute("SELECT value, percentage FROM demographics ORDER BY position")
+            ]
+
+        def top(metric):
+            ranked = sorted((p for p in posts if p[metric] is not None), key=lambda p: p[metric], reverse=True)
+            return [{'url': p['url'], 'date': p['date'], metric: p[metric]} for p in ranked[:10]]
+
+        return {
+            "top_by_engagement": top('engagements'),
+            "top_by_impressions": top('impressions'),
+            "demographics": demographics,
+            "trends": trends,
+            "posts": posts,
+        }
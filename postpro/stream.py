@@ -0,0 +1,103 @@
+"""
+Incremental JSON parsing for streamed model output.
+
+The model returns one JSON object. PartialJSONParser consumes it chunk by
+chunk and reports each top-level field the moment its value is complete,
+so score/verdict/risk_level can render long before the suggestions arrive.
+"""
+
+import json
+
+
+class PartialJSONParser:
+    """Streaming scanner for a single top-level JSON object.
+
+    Text before the opening brace (e.g. a ```json fence) is ignored. Each
+    character is scanned once, so feeding a whole response costs O(n).
+    """
+
+    def __init__(self):
+        self.buffer = ''
+        self.fields = {}
+        self.done = False
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect = 'key'
+        self._key = None
+        self._token_start = None
+
+    def feed(self, chunk: str) -> dict:
+        """Consume chunk; return the fields completed by it (possibly empty)."""
+        self.buffer += chunk
+        completed = {}
+        buf = self.buffer
+        i = self._pos
+        n = len(buf)
+        while i < n and not self.done:
+            ch = buf[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        if self._expect == 'key':
+                            self._key = json.loads(buf[self._token_start:i + 1])
+                            self._expect = 'colon'
+                        elif self._expect == 'value':
+                            self._complete(buf[self._token_start:i + 1], completed)
+                i += 1
+                continue
+
+            if self._depth == 0:
+                if ch == '{':
+                    self._depth = 1
+                    self._expect = 'key'
+                i += 1
+                continue
+
+            if self._depth == 1:
+                if self._expect == 'scalar' and (ch in ',}' or ch.isspace()):
+                    self._complete(buf[self._token_start:i], completed)
+                if ch == '"':
+                    self._in_string = True
+                    self._token_start = i
+                elif ch == ':':
+                    self._expect = 'value'
+                elif ch == ',':
+                    self._expect = 'key'
+                elif ch == '}':
+                    self._depth = 0
+                    self.done = True
+                elif ch in '{[':
+                    self._depth += 1
+                    self._token_start = i
+                elif not ch.isspace() and self._expect == 'value':
+                    self._expect = 'scalar'
+                    self._token_start = i
+            else:
+                if ch == '"':
+                    self._in_string = True
+                elif ch in '{[':
+                    self._depth += 1
+                elif ch in '}]':
+                    self._depth -= 1
+                    if self._depth == 1:
+                        self._complete(buf[self._token_start:i + 1], completed)
+            i += 1
+        self._pos = i
+        return completed
+
+    def _complete(self, raw: str, completed: dict):
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            value = raw
+        self.fields[self._key] = value
+        completed[self._key] = value
+        self._expect = 'comma'
@@ -0,0 +1,112 @@
+"""
+Local token accounting and input budgets.
+
+count_tokens() estimates what a BPE tokenizer would produce without a
+network call or a tokenizer dependency: short ASCII words are one token,
+longer and non-Latin words several, punctuation one each. That is close
+enough to real counts on English posts for budgeting; when the API
+reports actual usage, that is used instead. fit_post() brings an
+over-budget post under its budget while keeping the hook, the closing
+line and the paragraph structure.
+"""
+
+import re
+
+# USD per million tokens (input, output); unknown models report no cost
+PRICES = {
+    'gemini-2.5-flash': (0.30, 2.50),
+    'gemini-2.5-flash-lite': (0.10, 0.40),
+    'gemini-2.5-pro': (1.25, 10.00),
+    'gpt-4o-mini': (0.15, 0.60),
+    'gpt-4o': (2.50, 10.00),
+    'mock': (0.0, 0.0),
+}
+# Context-cached input is billed at a quarter of the normal rate
+CACHED_INPUT_DISCOUNT = 0.25
+
+_PIECE = re.compile(r"[A-Za-z0-9']+|[^\W\d_]+|\d+|\S")
+_SENTENCE = re.compile(r"(?<=[.!?])\s+")
+GAP = "[...]"
+
+
+def _piece_tokens(piece: str) -> int:
+    if piece.isascii():
+        return -(-len(piece) // 6) if piece[0].isalnum() or piece[0] == "'" else 1
+    return -(-len(piece) // 2)
+
+
+def count_tokens(text: str) -> int:
+    """Estimated token count of text."""
+    return sum(_piece_tokens(m.group()) for m in _PIECE.finditer(text)) + text.count('\n')
+
+
+def truncate_tokens(text: str, budget: int) -> str:
+    """Longest prefix of text within budget, cut at a word boundary."""
+    used = pos = 0
+    for m in _PIECE.finditer(text):
+        used += _piece_tokens(m.group()) + text.count('\n', pos, m.start())
+        pos = m.end()
+        if used > budget:
+            return text[:m.start()].rstrip()
+    return text
+
+
+def fit_post(text: str, budget: int) -> str:
+    """text unchanged if within budget, otherwise a structure-preserving digest.
+
+    Middle paragraphs are first cut to their opening sentence, then
+    replaced by a [...] marker from the end backwards; the hook (first
+    paragraph) and the closing paragraph are kept whole while they fit.
+    """
+    if count_tokens(text) <= budget:
+        return text
+    paragraphs = [p for p in re.split(r"\n\s*\n", text.strip()) if p.strip()]
+    if len(paragraphs) > 2:
+        hook, middle, close = paragraphs[0], paragraphs[1:-1], paragraphs[-1]
+        middle = [_SENTENCE.split(p.strip(), 1)[0] for p in middle]
+        while True:
+            candidate = '\n\n'.join([hook] + middle + [close])
+            if count_tokens(candidate) <= budget or not middle or middle == [GAP]:
+                break
+            # Drop the last real middle paragraph, keeping one gap marker in its place
+            middle = [p for p in middle if p != GAP]
+            middle = middle[:-1] + [GAP]
+        if count_tokens(candidate) <= budget:
+            return candidate
+        text = candidate
+    return truncate_tokens(text, max(budget - count_tokens(GAP), 0)) + ' ' + GAP
+
+
+def cost_usd(model: str, input_tokens: int, output_tokens: int, cached_tokens: int = 0):
+    """Estimated cost of one request, or None for a model without a price."""
+    price = PRICES.get(model)
+    if price is None:
+        return None
+    billed_input = input_tokens - cached_tokens + cached_tokens * CACHED_INPUT_DISCOUNT
+    return (billed_input * price[0] + output_tokens * price[1]) / 1_000_000
+
+
+def usage(model: str, input_tokens: int, output_tokens: int, cached_tokens: int = 0,
+          measured: bool = False) -> dict:
+    """Per-request token and cost record attached to analysis results."""
+    return {
+        'model': model,
+        'input_tokens': input_tokens,
+        'output_tokens': output_tokens,
+        'cached_tokens': cached_tokens,
+        'cost_usd': cost_usd(model, input_tokens, output_tokens, cached_tokens),
+        'measured': measured,
+    }
+
+
+def total_usage(records) -> dict:
+    """Sum of usage records (None entries, e.g. cache hits, are skipped)."""
+    total = {'input_tokens': 0, 'output_tokens': 0, 'cached_tokens': 0, 'cost_usd': 0.0, 'requests': 0}
+    for record in records:
+        if not record:
+            continue
+        total['requests'] += 1
+        for name in ('input_tokens', 'output_tokens', 'cached_tokens'):
+            total[name] += record[name]
+        total['cost_usd'] += record['cost_usd'] or 0.0
+    return total
@@ -0,0 +1,269 @@
+"""
+Lightweight tracing for the hot paths.
+
+Spans record wall time, thread CPU time and any attributes (e.g. bytes)
+and nest through a context variable. Finished spans land in a bounded
+ring buffer, per-name duration reservoirs feed the Performance tab's
+percentiles, and an optional background exporter writes them as
+OpenTelemetry (OTLP/JSON) to a file or a collector.
+
+When tracing is off, span() and start() hand back one shared no-op
+object: no clock reads, no allocation. trace_session() turns it on for
+the current context only, e.g. one user's script run and the jobs it
+schedules.
+"""
+
+import contextvars
+import json
+import os
+import queue
+import random
+import threading
+import time
+import urllib.request
+from collections import deque
+
+_current = contextvars.ContextVar('postpro_span', default=None)
+_session = contextvars.ContextVar('postpro_trace_session', default=False)
+# Span ids only need to be unique, not unpredictable; this avoids a urandom call per span
+_random_id = random.Random().getrandbits
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attributes):
+        pass
+
+    def end(self):
+        pass
+
+
+NOOP = _NoopSpan()
+
+
+class Span:
+    """One timed operation; use as a context manager or call end()."""
+
+    __slots__ = ('tracer', 'name', 'trace_id', 'span_id', 'parent_id', 'attributes',
+                 'start_ns', 'end_ns', 'cpu_ns', '_cpu_start', '_token', 'error')
+
+    def __init__(self, tracer, name: str, attributes: dict):
+        parent = _current.get()
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = parent.trace_id if parent else _random_id(128)
+        self.span_id = _random_id(64)
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = attributes
+        self.error = None
+        self.end_ns = None
+        self._token = _current.set(self)
+        self._cpu_start = time.thread_time_ns()
+        self.start_ns = time.time_ns()
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def end(self):
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        self.cpu_ns = time.thread_time_ns() - self._cpu_start
+        try:
+            _current.reset(self._token)
+        except ValueError:
+            # Ended from a different context (e.g. a generator resumed elsewhere)
+            pass
+        self.tracer._finish(self)
+
+    @property
+    def wall_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    @property
+    def cpu_ms(self) -> float:
+        return self.cpu_ns / 1e6
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        self.end()
+        return False
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def to_otlp(spans, service: str = 'postpro') -> dict:
+    """OTLP/JSON ExportTraceServiceRequest for a batch of finished spans."""
+    return {'resourceSpans': [{
+        'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': service}}]},
+        'scopeSpans': [{
+            'scope': {'name': 'postpro.tracing'},
+            'spans': [{
+                'traceId': f'{s.trace_id:032x}',
+                'spanId': f'{s.span_id:016x}',
+                **({'parentSpanId': f'{s.parent_id:016x}'} if s.parent_id else {}),
+                'name': s.name,
+                'kind': 1,
+                'startTimeUnixNano': str(s.start_ns),
+                'endTimeUnixNano': str(s.end_ns),
+                'attributes': [{'key': k, 'value': _otlp_value(v)}
+                               for k, v in dict(s.attributes, **{'cpu.ms': s.cpu_ms}).items()],
+                'status': {'code': 2, 'message': s.error} if s.error else {},
+            } for s in spans],
+        }],
+    }]}
+
+
+class Exporter:
+    """Background OTLP/JSON export to a JSON-lines file and/or an OTLP/HTTP collector."""
+
+    def __init__(self, path: str = None, endpoint: str = None, interval: float = 2.0,
+                 max_batch: int = 512):
+        self.path = path
+        self.endpoint = endpoint
+        self.interval = interval
+        self.max_batch = max_batch
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=10_000)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, span: Span):
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.interval
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self.export(batch)
+
+    def flush(self):
+        """Export whatever is still queued, e.g. before a short-lived process exits."""
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            self.export(batch)
+
+    def export(self, batch):
+        payload = to_otlp(batch)
+        try:
+            if self.path:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(payload) + '\n')
+            if self.endpoint:
+                request = urllib.request.Request(
+                    self.endpoint, data=json.dumps(payload).encode('utf-8'),
+                    headers={'Content-Type': 'application/json'}, method='POST')
+                urllib.request.urlopen(request, timeout=5).close()
+        except (OSError, ValueError):
+            self.dropped += len(batch)
+
+
+class Tracer:
+    """Process-wide span recorder; disabled unless enabled, configured by env or traced per session."""
+
+    def __init__(self, enabled: bool = False, buffer: int = 10_000, reservoir: int = 2048,
+                 exporter: Exporter = None):
+        self.enabled = enabled
+        self.exporter = exporter
+        self.spans = deque(maxlen=buffer)
+        self._reservoir = reservoir
+        self._durations = {}
+        self._lock = threading.Lock()
+
+    def span(self, name: str, **attributes):
+        """Context manager timing a block (no-op while disabled)."""
+        if not (self.enabled or _session.get()):
+            return NOOP
+        return Span(self, name, attributes)
+
+    def trace_session(self, enabled: bool = True):
+        """Record spans in the current context even while the tracer is disabled."""
+        _session.set(enabled)
+
+    def active(self) -> bool:
+        """True when spans in the current context are recorded."""
+        return self.enabled or _session.get()
+
+    start = span
+
+    def _finish(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+            durations = self._durations.get(span.name)
+            if durations is None:
+                durations = self._durations[span.name] = deque(maxlen=self._reservoir)
+            durations.append((span.wall_ms, span.cpu_ms))
+        if self.exporter is not None:
+            self.exporter.submit(span)
+
+    def summary(self) -> list:
+        """Per span name: count and wall-time p50/p95/p99, plus mean CPU time."""
+        import numpy as np
+
+        with self._lock:
+            snapshot = {name: np.array(values) for name, values in self._durations.items() if values}
+        rows = []
+        for name, values in sorted(snapshot.items()):
+            p50, p95, p99 = np.percentile(values[:, 0], [50, 95, 99])
+            rows.append({'span': name, 'count': len(values), 'p50_ms': float(p50), 'p95_ms': float(p95),
+                         'p99_ms': float(p99), 'cpu_ms': float(values[:, 1].mean())})
+        return rows
+
+    def durations(self, name: str):
+        """Recent wall times (ms) of one span name, as a numpy array."""
+        import numpy as np
+
+        with self._lock:
+            return np.array([wall for wall, _ in self._durations.get(name, ())])
+
+    def clear(self):
+        with self._lock:
+            self.spans.clear()
+            self._durations.clear()
+
+
+def configure_from_env() -> Tracer:
+    """Tracer enabled by POSTPRO_TRACE=1, exporting to POSTPRO_TRACE_FILE / POSTPRO_OTLP_ENDPOINT."""
+    path = os.environ.get('POSTPRO_TRACE_FILE')
+    endpoint = os.environ.get('POSTPRO_OTLP_ENDPOINT')
+    enabled = os.environ.get('POSTPRO_TRACE', '') not in ('', '0') or bool(path or endpoint)
+    exporter = Exporter(path, endpoint) if (path or endpoint) else None
+    return Tracer(enabled=enabled, exporter=exporter)
+
+
+tracer = configure_from_env()
@@ -0,0 +1,285 @@
+"""
+Draft variants: rewrite a draft several ways and keep the best versions.
+
+generate_variants() combines candidate hooks with body edits into
+distinct drafts. Candidate hooks are the draft's own hook, its first
+sentence, the part that fits above the fold, and any suggested hooks
+such as the model's rewritten_hook. Body edits swap bot speak for plain
+words, split walls of text, or give each sentence its own line.
+optimize() scores every variant locally with the linter and the fold
+simulator. It sends only the top ~2*sqrt(N) to the model, then halves the
+field each round, scoring the survivors against one more anchor per
+round, so the number of model calls grows sublinearly in N. The result
+is the Pareto front over model score, local score and how far each
+variant strays from the original. Variants knocked out early have seen
+fewer anchors, so the front is first taken on the anchors everyone
+shares, and its members are then scored on the anchors they miss and
+compared again on the same set.
+"""
+
+import difflib
+import math
+import random
+import re
+from concurrent.futures import ThreadPoolExecutor
+from itertools import product
+
+from postpro.batch import TokenBucket, score_with_retry
+from postpro.layout import fold
+from postpro.lint import default_linter
+from postpro.tokens import total_usage
+from postpro.tracing import tracer
+
+# Plain replacements for bot speak; phrases without one are left for the linter to flag
+PLAIN_WORDS = {
+    'delve': 'dig', 'delving': 'digging', 'landscape': 'market', 'unlock': 'open up',
+    'unlocking': 'opening up', 'game-changer': 'big shift', 'game changer': 'big shift',
+    'leverage': 'use', 'leveraging': 'using', 'synergy': 'overlap', 'synergies': 'overlaps',
+    'elevate': 'raise', 'embark': 'start', 'unleash': 'release', 'seamless': 'smooth',
+    'cutting-edge': 'new', 'robust': 'solid', 'deep dive': 'close look', 'dive deep': 'look closely',
+    'harness the power': 'use the power', 'ever-evolving': 'changing',
+}
+
+_SENTENCES = re.compile(r'(?<=[.!?])\s+(?=\S)')
+_PARAGRAPHS = re.compile(r'\n[ \t]*\n+')
+
+
+def split_hook(text: str):
+    """(hook, separator, body): the opening line, the whitespace after it and the rest."""
+    text = text.strip()
+    hook, _, rest = text.partition('\n')
+    body = rest.lstrip('\n \t')
+    return hook.strip(), '\n' + rest[:len(rest) - len(body)] if rest else '', body
+
+
+def hook_candidates(hook: str, suggested=()) -> dict:
+    """Alternative opening lines, by name; spill-over text moves to the body."""
+    candidates = {'hook': (hook, '')}
+    sentences = _SENTENCES.split(hook)
+    if len(sentences) > 1:
+        candidates['first_sentence'] = (sentences[0], ' '.join(sentences[1:]))
+    folded = fold(hook, 'iphone')
+    if folded['cut']:
+        cut = hook.rfind(' ', 0, folded['fold'])
+        if cut > 0:
+            candidates['fit_fold'] = (hook[:cut].rstrip(), hook[cut:].strip())
+    for i, text in enumerate(suggested):
+        text = ' '.join((text or '').split())
+        if text and text != hook:
+            candidates[f'suggested_{i + 1}'] = (text, '')
+    return candidates
+
+
+def plain_words(body: str, linter=None) -> str:
+    """body with bot-speak phrases swapped for plain ones, keeping capitalisation."""
+    linter = linter or default_linter()
+
+    def replace(m):
+        plain = PLAIN_WORDS.get(' '.join(m.group().lower().split()))
+        if plain is None:
+            return m.group()
+        return plain[0].upper() + plain[1:] if m.group()[0].isupper() else plain
+
+    return linter.pattern.sub(replace, body)
+
+
+def split_walls(body: str, linter=None) -> str:
+    """Paragraphs over the mobile line limit split into pairs of sentences."""
+    linter = linter or default_linter()
+    paragraphs = []
+    for paragraph in _PARAGRAPHS.split(body):
+        if linter.paragraph_stats(paragraph)[0] > linter.max_paragraph_lines:
+            sentences = _SENTENCES.split(paragraph.strip())
+            paragraphs.extend(' '.join(sentences[i:i + 2]) for i in range(0, len(sentences), 2))
+        else:
+            paragraphs.append(paragraph)
+    return '\n\n'.join(paragraphs)
+
+
+def one_per_line(body: str, linter=None) -> str:
+    """Every sentence as its own paragraph."""
+    return '\n\n'.join(s for p in _PARAGRAPHS.split(body) for s in _SENTENCES.split(p.strip()) if s)
+
+
+LAYOUTS = {'as_written': None, 'split_walls': split_walls, 'one_per_line': one_per_line}
+
+
+def generate_variants(draft: str, n: int = 32, suggested_hooks=(), seed: int = 0, linter=None) -> list:
+    """Up to n distinct variants of draft, the unchanged draft first.
+
+    Each is {"text", "hook", "edits"}. When there are more combinations
+    than n, a seeded sample is kept so results are reproducible.
+    """
+    linter = linter or default_linter()
+    hook, separator, body = split_hook(draft)
+    original = draft.strip()
+    variants = {original: {'text': original, 'hook': 'hook', 'edits': []}}
+    for (name, (opening, spill)), layout, spacing, plain in product(
+            hook_candidates(hook, suggested_hooks).items(), LAYOUTS, ('\n\n', separator or '\n\n'), (False, True)):
+        text = '\n\n'.join(part for part in (spill, body) if part)
+        if LAYOUTS[layout] is not None:
+            text = LAYOUTS[layout](text, linter)
+        text = (opening + spacing + text if text else opening).strip()
+        if plain:
+            text = plain_words(text, linter)
+        if text not in variants:
+            edits = [] if layout == 'as_written' else [layout]
+            if spacing != separator and separator:
+                edits.append('blank_line_after_hook')
+            variants[text] = {'text': text, 'hook': name, 'edits': edits + (['plain_words'] if plain else [])}
+
+    rest = list(variants.values())[1:]
+    if len(rest) >= n:
+        rest = random.Random(seed).sample(rest, n - 1)
+    return [variants[original]] + rest
+
+
+def visual_metrics(text: str, linter=None) -> dict:
+    """The lint metrics local_score compares against the anchor."""
+    return (linter or default_linter()).metrics(text)
+
+
+def local_score(text: str, anchor_metrics: dict = None, linter=None):
+    """0-100 from local checks alone, or None when a hard rule fails.
+
+    Soft issues and a hook cut by the fold cost points, and so does each
+    visual-physics metric that drifts from the anchor's.
+    """
+    report = (linter or default_linter()).lint(text)
+    if report['hard_fail']:
+        return None
+    metrics = report['metrics']
+    score = 100.0 - 15 * len(report['issues'])
+    folded = fold(text, 'iphone')
+    if folded['cut'] and folded['fold'] < metrics['hook_chars']:
+        score -= 20
+    if anchor_metrics:
+        drift = [
+            min(1.0, abs(metrics[k] - anchor_metrics[k]) / max(abs(anchor_metrics[k]), scale))
+            for k, scale in (('line_break_density', 1.0), ('whitespace_ratio', 0.1),
+                             ('max_paragraph_lines', 1.0), ('hook_chars', 40.0))
+        ]
+        score -= 40 * sum(drift) / len(drift)
+    return round(max(0.0, score), 1)
+
+
+def change_ratio(original: str, text: str) -> float:
+    """Share of the original rewritten, from 0 (unchanged) to 1."""
+    return round(1 - difflib.SequenceMatcher(None, original, text, autojunk=False).ratio(), 3)
+
+
+def pareto_front(variants: list, objectives=(('score', 1), ('local', 1), ('change', -1))) -> list:
+    """Variants no other variant beats on every objective (sign 1 = maximise, -1 = minimise)."""
+    points = [tuple(v[k] * sign for k, sign in objectives) for v in variants]
+    return [
+        v for v, p in zip(variants, points)
+        if not any(q != p and all(a >= b for a, b in zip(q, p)) for q in points)
+    ]
+
+
+def _score_shared(variants: list) -> list:
+    """Set each variant's score to its mean over the anchors all of them were scored against."""
+    shared = set.intersection(*(set(v['scores']) for v in variants))
+    for v in variants:
+        v['score'] = round(sum(v['scores'][a] for a in shared) / len(shared), 1)
+    return variants
+
+
+def _score_all(pairs: list, api_key: str, scheduler, session: str, concurrency: int,
+               bucket, kwargs) -> list:
+    """Model results for (anchor, draft) pairs, run in parallel."""
+    if scheduler is not None:
+        jobs = [scheduler.submit_analysis(anchor, draft, api_key, session, stream=False, **kwargs)
+                for anchor, draft in pairs]
+        return [job.result() for job in jobs]
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(pairs)))) as pool:
+        return list(pool.map(lambda pair: score_with_retry(pair[0], pair[1], api_key, bucket, **kwargs), pairs))
+
+
+def optimize(draft: str, anchors, api_key: str, n: int = 32, suggested_hooks=(), survivors: int = None,
+             eta: int = 2, scheduler=None, session: str = '', concurrency: int = 4,
+             requests_per_second: float = None, seed: int = 0, linter=None, **kwargs) -> dict:
+    """Generate n variants of draft and return the best ones.
+
+    anchors is one anchor post or a list; round r of successive halving
+    scores the remaining variants against anchors[r] and ranks them by
+    their mean over the anchors they all have seen. The variants on the
+    front are then scored on any anchor another one of them has seen, so
+    each reported score is a mean over the same anchors. survivors (default
+    2*sqrt(n)) variants reach the model; the original draft is always one
+    of them, as the baseline. Each later round keeps the top 1/eta. Extra
+    keyword arguments (cache, model, context_cache) go to analyze_posts,
+    and with a scheduler the calls are queued there under session.
+
+    Returns {"best": Pareto front sorted by score, "variants": every
+    variant with its local score and any model scores, "llm_calls",
+    "rounds", "usage"}, or {"error": ...} when no model call succeeded.
+    """
+    anchors = [anchors] if isinstance(anchors, str) else [a for a in anchors if a.strip()]
+    if not anchors:
+        return {"error": "No anchor to score against"}
+    linter = linter or default_linter()
+    with tracer.span('variants.optimize', n=n) as span:
+        variants = generate_variants(draft, n, suggested_hooks, seed, linter)
+        anchor_metrics = visual_metrics(anchors[0], linter)
+        for v in variants:
+            v['local'] = local_score(v['text'], anchor_metrics, linter)
+            v['scores'] = {}
+        original = variants[0]
+        original['original'] = True
+        ranked = sorted((v for v in variants[1:] if v['local'] is not None), key=lambda v: -v['local'])
+        keep = survivors or max(2, math.ceil(2 * math.sqrt(len(variants))))
+        field = [original] + ranked[:keep - 1]
+
+        bucket = TokenBucket(requests_per_second) if requests_per_second else None
+        results, errors = [], []
+        rounds = 0
+        for index, anchor in enumerate(anchors):
+            rounds += 1
+            for v, result in zip(field, _score_all([(anchor, v['text']) for v in field], api_key,
+                                                  scheduler, session, concurrency, bucket, kwargs)):
+                results.append(result)
+                if 'error' in result:
+                    errors.append(result['error'])
+                else:
+                    v['scores'][index] = float(result.get('score', 0))
+                    v.setdefault('verdict', result.get('verdict', ''))
+            field = [v for v in field if v['scores']]
+            if len(field) <= 1:
+                break
+            _score_shared(field)
+            field = sorted(field, key=lambda v: -v['score'])[:math.ceil(len(field) / eta)]
+
+        scored = [v for v in variants if v['scores']]
+        if not scored:
+            span.set(llm_calls=len(results), rounds=rounds)
+            return {"error": errors[0] if errors else "No variant passed the local checks"}
+        for v in scored:
+            v['change'] = change_ratio(original['text'], v['text'])
+            v['local'] = v['local'] if v['local'] is not None else 0.0
+
+        # Every scored variant has the first anchor. The front on it and the last
+        # survivors are scored on the rest, then compared on the same anchors
+        front = pareto_front(_score_shared(scored))
+        front += [v for v in field if not any(v is f for f in front)]
+        needed = set().union(*(v['scores'] for v in front))
+        missing = [(index, v) for v in front for index in sorted(needed - set(v['scores']))]
+        if missing:
+            for (index, v), result in zip(missing, _score_all([(anchors[index], v['text']) for index, v in missing],
+                                                              api_key, scheduler, session, concurrency, bucket,
+                                                              kwargs)):
+                results.append(result)
+                if 'error' in result:
+                    errors.append(result['error'])
+                else:
+                    v['scores'][index] = float(result.get('score', 0))
+        front = pareto_front(_score_shared([v for v in front if len(v['scores']) == len(needed)] or front))
+        span.set(llm_calls=len(results), rounds=rounds)
+        best = sorted(front, key=lambda v: (-v['score'], v['change']))
+    return {
+        "best": best,
+        "variants": variants,
+        "llm_calls": len(results),
+        "rounds": rounds,
+        "usage": total_usage(r.get('usage') for r in results),
+    }
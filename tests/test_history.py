@@ -0,0 +1,64 @@
+"""
+Running totals, daily rollups and owner scoping of the analysis history.
+"""
+
+from datetime import date, datetime
+
+import pytest
+
+from postpro.history import HistoryStore, score_band
+
+
+def at(day: str, hour: int = 12) -> float:
+    return datetime.fromisoformat(f'{day}T{hour:02d}:00').timestamp()
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / 'history.sqlite')
+
+
+def test_score_band():
+    assert [score_band(s) for s in (100, 70, 69.9, 40, 39.9, 0)] == ['high', 'high', 'medium', 'medium', 'low', 'low']
+
+
+def test_totals_and_reload(path):
+    store = HistoryStore(path)
+    assert store.summary() == {'count': 0, 'mean': 0.0, 'high': 0, 'medium': 0, 'low': 0}
+    for score in (90, 70, 50, 10):
+        store.append(score, created=at('2026-03-01'))
+    expected = {'count': 4, 'mean': 55.0, 'high': 2, 'medium': 1, 'low': 1}
+    assert store.summary() == expected
+    assert HistoryStore(path).summary() == expected
+
+
+def test_owners_are_isolated(path):
+    store = HistoryStore(path, max_owners=1)
+    store.append(80, owner='a')
+    store.append(20, owner='b')
+    store.append(60, owner='a')
+    assert store.summary(owner='a') == {'count': 2, 'mean': 70.0, 'high': 1, 'medium': 1, 'low': 0}
+    assert store.summary(owner='b')['count'] == 1
+    assert store.summary()['count'] == 0
+    assert [t['score'] for t in store.tail(owner='a')] == [80, 60]
+
+
+def test_window_and_daily(path):
+    store = HistoryStore(path)
+    store.append(30, created=at('2026-03-01'))
+    store.append(50, created=at('2026-03-05', 9))
+    store.append(90, created=at('2026-03-05', 18))
+    store.append(99, created=at('2026-03-05'), owner='other')
+    week = store.window(3, today=date(2026, 3, 7))
+    assert week == {'count': 2, 'mean': 70.0, 'high': 1, 'medium': 1, 'low': 0}
+    assert store.window(30, today=date(2026, 3, 7))['count'] == 3
+    assert [(d['day'], d['count']) for d in store.daily()] == [('2026-03-01', 1), ('2026-03-05', 2)]
+    assert [d['day'] for d in store.daily(days=1)] == ['2026-03-05']
+
+
+def test_tail_is_bounded(path):
+    store = HistoryStore(path, tail=3)
+    for score in range(5):
+        store.append(score, created=1000 + score)
+    assert store.tail() == [{'score': s, 'timestamp': 1000 + s} for s in (2, 3, 4)]
+    assert [t['score'] for t in HistoryStore(path, tail=3).tail()] == [2, 3, 4]
@@ -0,0 +1,55 @@
+"""
+Lint rules and the hard/soft gate in front of the model.
+"""
+
+from postpro.lint import Linter
+
+
+def rules(report):
+    return {(i['rule'], i['severity']) for i in report['issues']}
+
+
+def test_clean_draft_passes():
+    passed, report = Linter().gate('I shipped a thing.\n\nHere is what broke.')
+    assert passed
+    assert report['issues'] == []
+    assert report['metrics']['paragraphs'] == 2
+
+
+def test_single_word_is_soft():
+    passed, report = Linter().gate('We built a robust pipeline.')
+    assert passed
+    assert rules(report) == {('bot_speak', 'soft')}
+    assert report['issues'][0]['message'] == 'Bot speak: "robust"'
+
+
+def test_multi_word_phrase_is_hard():
+    passed, report = Linter().gate('Time for a Deep  Dive into hiring.')
+    assert not passed
+    assert rules(report) == {('bot_speak', 'hard')}
+    start, end = report['issues'][0]['span']
+    assert report['issues'][0]['message'] == 'Bot speak: "Deep  Dive"'
+    assert (start, end) == (11, 21)
+
+
+def test_pile_up_of_words_is_hard():
+    text = 'A robust, seamless way to leverage data.'
+    assert not Linter().gate(text)[0]
+    assert Linter(max_bot_words=3).gate(text)[0]
+
+
+def test_words_inside_other_words_do_not_match():
+    assert Linter().lint('Unrobust re-leveraged realms')['issues'] == []
+
+
+def test_wall_of_text_and_long_hook_are_soft():
+    passed, report = Linter().gate('word ' * 60 + '\n\nShort.')
+    assert passed
+    assert rules(report) == {('wall_of_text', 'soft'), ('hook_length', 'soft')}
+    assert report['metrics']['max_paragraph_lines'] == 6
+
+
+def test_hard_rules_are_configurable():
+    passed, report = Linter(hard_rules={'bot_speak', 'hook_length'}).gate('x' * 200)
+    assert not passed
+    assert rules(report) == {('hook_length', 'hard'), ('wall_of_text', 'soft')}
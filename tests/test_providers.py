@@ -0,0 +1,101 @@
+"""
+HTTP retries and fallback routing of the model providers.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from postpro.analyzer import stream_analysis
+from postpro.providers import FallbackRouter, MockProvider, OpenAICompatibleProvider
+
+ANSWER = {'score': 90, 'verdict': 'v', 'risk_level': 'Low',
+          'analysis': {'visual_physics': 'a', 'tonal_dna': 'b', 'hook_comparison': 'c'},
+          'fatal_errors': [], 'fix_suggestions': ['x'], 'rewritten_hook': 'h'}
+
+
+class Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, mode):
+        self.mode = mode
+        self.posts = 0
+        super().__init__(('127.0.0.1', 0), Handler)
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        self.server.posts += 1
+        if self.server.mode == 'drop':
+            self.close_connection = True
+            return
+        body = json.dumps({'choices': [{'message': {'content': json.dumps(ANSWER)}}]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        # A keep-alive timeout: the connection is closed after the answer, unannounced
+        self.close_connection = self.server.mode == 'timeout'
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(mode):
+        server = Server(mode)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server, OpenAICompatibleProvider('key', base_url=f'http://127.0.0.1:{server.server_port}/v1')
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_post_is_not_sent_twice(serve):
+    server, provider = serve('drop')
+    with pytest.raises(ConnectionError):
+        provider.generate_content('prompt')
+    assert server.posts == 1
+
+
+def test_closed_idle_connection_is_replaced(serve):
+    server, provider = serve('timeout')
+    assert json.loads(provider.generate_content('prompt').text) == ANSWER
+    assert provider._pool._idle.qsize() == 1
+    time.sleep(0.05)
+    assert json.loads(provider.generate_content('prompt').text) == ANSWER
+    assert server.posts == 2
+
+
+class Named(MockProvider):
+    def __init__(self, model):
+        super().__init__(latency=0)
+        self.model = model
+        self.name = f'mock:{model}'
+
+
+def analyze(router, draft, stream):
+    *_, result = stream_analysis('anchor', draft, '', model=router, stream=stream)
+    return result
+
+
+@pytest.mark.parametrize('stream', [False, True])
+def test_router_bills_the_answering_model(stream):
+    router = FallbackRouter(Named('gemini-2.5-flash-lite'), Named('gemini-2.5-pro'), min_confidence=0)
+    assert analyze(router, 'draft', stream)['usage']['model'] == 'gemini-2.5-flash-lite'
+    router.min_confidence = 2
+    usage = analyze(router, 'draft two', stream)['usage']
+    assert usage['model'] == 'gemini-2.5-pro'
+    assert usage['cost_usd'] > 0
+    assert router.escalations == 1
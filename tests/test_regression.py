@@ -0,0 +1,100 @@
+"""
+Regression tests for export parsing and replayed analyses.
+
+Exports come from the synthetic generator and model answers from the
+committed mock cassette, so every assertion is exact and runs offline.
+The cassette holds the mock model's answers, so the replay tests only
+check the prompt, replay and parsing plumbing, not the quality of any
+model; the modules themselves are tested in the other files here:
+
+    python -m pytest tests
+"""
+
+import json
+from datetime import date, timedelta
+
+import pytest
+
+from benchmarks.suite import MOCK_CASSETTE, analysis_pairs
+from benchmarks.synthetic import JOB_TITLES, make_export
+from postpro.analyzer import analyze_posts, build_prompt, stream_analysis
+from postpro.ingest import parse_linkedin_xlsx, read_export
+from postpro.replay import ReplayModel, load_cassette, prompt_key
+from postpro.schema import ANALYSIS_KEYS, REQUIRED, RISK_LEVELS
+
+N_POSTS, N_DAYS = 200, 365
+PAIRS = analysis_pairs(40)
+
+
+@pytest.fixture(scope='module')
+def export():
+    return make_export(N_POSTS, N_DAYS)
+
+
+@pytest.fixture(scope='module')
+def replay():
+    return ReplayModel(MOCK_CASSETTE, latency='none')
+
+
+def test_blocks(export):
+    blocks = read_export(export)
+    assert list(blocks) == ['engagement', 'impressions', 'demographics', 'trends']
+    assert set(blocks['engagement']) == {'url', 'date', 'engagements'}
+    assert set(blocks['impressions']) == {'url', 'date', 'impressions'}
+    assert set(blocks['demographics']) == {'Top Demographics', 'Value', 'Percentage'}
+    assert set(blocks['trends']) == {'Date', 'Impressions', 'Engagements'}
+    assert len(blocks['engagement']['url']) == len(blocks['impressions']['url']) == N_POSTS
+    assert len(blocks['demographics']['Value']) == len(JOB_TITLES) + 3
+    assert len(blocks['trends']['Date']) == N_DAYS
+
+
+def test_parsed_export(export):
+    parsed = parse_linkedin_xlsx(export)
+    assert 'error' not in parsed
+    assert len(parsed['posts']) == N_POSTS
+    assert len(parsed['top_by_engagement']) == len(parsed['top_by_impressions']) == 10
+    assert [d['Value'] for d in parsed['demographics']] == JOB_TITLES[:5]
+    assert all(0 <= d['Percentage'] <= 0.25 for d in parsed['demographics'])
+
+    post = parsed['posts'][0]
+    assert set(post) == {'url', 'date', 'engagements', 'impressions'}
+    assert post['url'].startswith('https://www.linkedin.com/feed/update/urn:li:activity:')
+    assert isinstance(post['date'], date)
+    assert isinstance(post['engagements'], int) and isinstance(post['impressions'], int)
+    assert len({p['url'] for p in parsed['posts']}) == N_POSTS
+
+    trends = parsed['trends']
+    assert len(trends) == N_DAYS
+    assert set(trends[0]) == {'Date', 'Impressions', 'Engagements'}
+    assert [t['Date'] for t in trends] == [date(2020, 1, 1) + timedelta(days=i) for i in range(N_DAYS)]
+
+
+def test_cassette_covers_pairs():
+    entries = load_cassette(MOCK_CASSETTE)
+    assert {prompt_key(build_prompt(anchor, draft)) for anchor, draft in PAIRS} <= set(entries)
+
+
+def recorded(anchor: str, draft: str) -> dict:
+    return json.loads(load_cassette(MOCK_CASSETTE)[prompt_key(build_prompt(anchor, draft))]['text'])
+
+
+@pytest.mark.parametrize('index', range(len(PAIRS)))
+def test_replayed_analysis(replay, index):
+    anchor, draft = PAIRS[index]
+    result = analyze_posts(anchor, draft, '', model=replay)
+    expected = recorded(anchor, draft)
+    assert 'error' not in result
+    assert set(REQUIRED) <= set(result)
+    assert set(result['analysis']) == set(ANALYSIS_KEYS)
+    assert result['score'] == expected['score']
+    assert 0 <= result['score'] <= 100
+    assert result['risk_level'] == expected['risk_level'] and result['risk_level'] in RISK_LEVELS
+    assert result['fix_suggestions'] == expected['fix_suggestions']
+
+
+def test_streamed_matches_blocking(replay):
+    for anchor, draft in PAIRS[:10]:
+        final = list(stream_analysis(anchor, draft, '', model=replay))[-1]
+        blocking = analyze_posts(anchor, draft, '', model=replay)
+        assert {k: final[k] for k in REQUIRED} == {k: blocking[k] for k in REQUIRED}
+    assert replay.misses == 0
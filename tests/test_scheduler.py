@@ -0,0 +1,33 @@
+"""
+Coalescing of identical requests in the shared scheduler.
+"""
+
+import pytest
+
+from postpro.providers import MockProvider
+from postpro.scheduler import AnalysisScheduler
+
+
+@pytest.fixture
+def scheduler():
+    return AnalysisScheduler(workers=2, per_key=2)
+
+
+def test_identical_requests_share_a_call(scheduler):
+    model = MockProvider(latency=0.2)
+    jobs = [scheduler.submit_analysis('anchor', 'draft', 'key', session, model=model, stream=False)
+            for session in ('a', 'b')]
+    assert jobs[0] is jobs[1]
+    assert jobs[0].result()['score'] == jobs[1].result()['score']
+    assert model.calls == 1 and scheduler.coalesced == 1
+
+
+def test_streamed_and_blocking_requests_are_kept_apart(scheduler):
+    model = MockProvider(latency=0.2, chars_per_second=2000)
+    streamed = scheduler.submit_analysis('anchor', 'draft', 'key', 'a', model=model, stream=True)
+    blocking = scheduler.submit_analysis('anchor', 'draft', 'key', 'b', model=model, stream=False)
+    assert streamed is not blocking
+    assert not any(item.get('partial') for item in blocking.stream())
+    assert any(item.get('partial') for item in streamed.stream())
+    assert blocking.result()['score'] == streamed.result()['score']
+    assert model.calls == 2 and scheduler.coalesced == 0
@@ -0,0 +1,106 @@
+"""
+Repair and validation of malformed model answers.
+"""
+
+import json
+import os
+
+import pytest
+
+from postpro.analyzer import complete_result
+from postpro.fakes import FakeResponse
+from postpro.schema import REQUIRED, repair_json, validate
+
+CORPUS = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'benchmarks', 'data', 'malformed_responses.jsonl')
+COMPLETE = {
+    'score': 85, 'verdict': 'Close.', 'risk_level': 'Low',
+    'analysis': {'visual_physics': 'a', 'tonal_dna': 'b', 'hook_comparison': 'c'},
+    'fatal_errors': [], 'fix_suggestions': ['x', 'y', 'z'], 'rewritten_hook': 'Hook.',
+}
+
+
+class FollowUp:
+    """Answers a missing-fields follow-up with COMPLETE and keeps the prompt."""
+
+    def __init__(self):
+        self.prompts = []
+
+    def generate_content(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        return FakeResponse(json.dumps(COMPLETE))
+
+
+@pytest.mark.parametrize('text, expected', [
+    # A number, literal or string running into the end may be cut short
+    ('{"verdict": "v", "score": 8', {'verdict': 'v'}),
+    ('{"verdict": "v", "score": -1.5e', {'verdict': 'v'}),
+    ('{"verdict": "v", "ok": tru', {'verdict': 'v'}),
+    ('{"verdict": "v", "hook": "half wri', {'verdict': 'v'}),
+    ('{"a": [1, 2', {'a': [1]}),
+    # ...but not when whitespace or a delimiter shows it was finished
+    ('{"verdict": "v", "score": 85\n', {'verdict': 'v', 'score': 85}),
+    ('{"ok": true, ', {'ok': True}),
+    # Finished strings in an array are elements, not dangling keys
+    ('{"fix_suggestions": ["a", "b"', {'fix_suggestions': ['a', 'b']}),
+    ('{"x": {"k": ["a", "b"', {'x': {'k': ['a', 'b']}}),
+    # In an object a trailing string is a key without its value
+    ('{"a": 1, "b"', {'a': 1}),
+    ('{"a": 1, "b":', {'a': 1}),
+    ('{"a": {"k": "v", "z"', {'a': {'k': 'v'}}),
+    ('{"a"', {}),
+    # Fences, chatter, trailing commas and Python literals
+    ('```json\n{"a": 1}\n```', {'a': 1}),
+    ('Here you go: {"a": 1} Hope it helps!', {'a': 1}),
+    ('{"a": [1, 2,], }', {'a': [1, 2]}),
+    ("{'a': True, 'b': None}", {'a': True, 'b': None}),
+    ('{“a”: “b”}', {'a': 'b'}),
+])
+def test_repair(text, expected):
+    assert repair_json(text) == expected
+
+
+def test_repair_without_json():
+    with pytest.raises(json.JSONDecodeError):
+        repair_json('I cannot help with that.')
+
+
+def test_truncated_score_is_requested_again():
+    answer = dict(COMPLETE)
+    del answer['score']
+    text = json.dumps(answer)[:-1] + ', "score": 8'
+    result, missing = validate(repair_json(text))
+    assert missing == ['score']
+
+    model = FollowUp()
+    result = complete_result(model, 'prompt', text)
+    assert len(model.prompts) == 1 and model.prompts[0].endswith('missing fields, in the same format: score')
+    assert result['score'] == 85 and result['risk_level'] == 'Low'
+
+
+def test_validate_coerces_fields():
+    result, missing = validate(dict(COMPLETE, score='7/10', risk_level='low', fix_suggestions='one\ntwo'))
+    assert not missing
+    assert result['score'] == 70 and result['risk_level'] == 'Low'
+    assert isinstance(result['fix_suggestions'], list) and len(result['fix_suggestions']) == 2
+
+
+def test_validate_reports_missing_fields():
+    result, missing = validate({'score': 50, 'verdict': 'v'})
+    assert 'score' not in missing and 'verdict' not in missing
+    assert set(missing) <= set(REQUIRED) and 'analysis' in missing
+
+
+def test_malformed_corpus():
+    with open(CORPUS, encoding='utf-8') as f:
+        corpus = [json.loads(line) for line in f]
+    for case in corpus:
+        model = FollowUp()
+        if case['kind'] == 'no_json':
+            with pytest.raises(json.JSONDecodeError):
+                complete_result(model, 'prompt', case['text'])
+            continue
+        result = complete_result(model, 'prompt', case['text'])
+        assert set(REQUIRED) <= set(result), case['kind']
+        # Only truncated or incomplete answers need a follow-up
+        assert bool(model.prompts) == (case['kind'].startswith('truncated') or case['kind'] == 'missing_fields'), \
+            case['kind']
@@ -0,0 +1,83 @@
+"""
+Merging successive exports into the export store.
+"""
+
+import pytest
+
+from postpro.store import ExportStore, as_of
+
+
+def export(day: str, posts: dict, trends: dict, demographics=None) -> dict:
+    """A parsed export whose posts were published on day."""
+    return {
+        'posts': [{'url': url, 'date': day, 'engagements': e, 'impressions': i}
+                  for url, (e, i) in posts.items()],
+        'trends': [{'Date': d, 'Impressions': i, 'Engagements': e} for d, (i, e) in trends.items()],
+        'demographics': [{'Value': v, 'Percentage': 1.0} for v in demographics or []],
+        'top_by_engagement': [],
+        'top_by_impressions': [],
+    }
+
+
+NEW = export('2026-03-01', {'a': (50, 900)}, {'2026-02-28': (900, 50), '2026-03-01': (100, 5)}, ['new'])
+OLD = export('2026-02-01', {'a': (10, 200), 'b': (3, 40)},
+             {'2026-01-31': (70, 2), '2026-02-28': (1, 1)}, ['old'])
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ExportStore(str(tmp_path / 'export.sqlite'))
+
+
+def by_url(merged):
+    return {p['url']: (p['engagements'], p['impressions']) for p in merged['posts']}
+
+
+def test_as_of():
+    assert as_of(NEW) == '2026-03-01'
+    assert as_of(OLD) == '2026-02-28'
+    assert as_of(export('2026-02-01', {'a': (1, 1)}, {})) == '2026-02-01'
+    assert as_of({}) == ''
+
+
+def test_older_export_only_fills_gaps(store):
+    store.import_export('new', NEW)
+    counts = store.import_export('old', OLD)
+    assert counts['new_posts'] == 1 and counts['changed_posts'] == 0
+    merged = store.merged()
+    assert by_url(merged) == {'a': (50, 900), 'b': (3, 40)}
+    assert {t['Date']: t['Impressions'] for t in merged['trends']} == {
+        '2026-01-31': 70, '2026-02-28': 900, '2026-03-01': 100}
+    assert merged['demographics'] == [{'Value': 'new', 'Percentage': 1.0}]
+
+
+def test_newer_export_overwrites(store):
+    store.import_export('old', OLD)
+    counts = store.import_export('new', NEW)
+    assert counts == dict(counts, posts=1, new_posts=0, changed_posts=1, changed_days=2, skipped=False)
+    merged = store.merged()
+    assert by_url(merged) == {'a': (50, 900), 'b': (3, 40)}
+    assert merged['demographics'] == [{'Value': 'new', 'Percentage': 1.0}]
+    assert [(h['engagements'], h['impressions']) for h in store.post_history('a')] == [(10, 200), (50, 900)]
+    assert merged['top_by_engagement'][0]['url'] == 'a'
+
+
+def test_missing_values_are_filled_from_older_export(store):
+    store.import_export('new', export('2026-03-01', {'a': (50, None)}, {}))
+    store.import_export('old', export('2026-02-01', {'a': (10, 200)}, {}))
+    assert by_url(store.merged()) == {'a': (50, 200)}
+
+
+def test_same_digest_is_skipped(store):
+    first = store.import_export('new', NEW)
+    again = store.import_export('new', NEW)
+    assert again['skipped'] and again['id'] == first['id']
+    assert len(store.snapshots()) == 1
+    assert store.version() == first['id']
+
+
+def test_state_survives_reopening(store, tmp_path):
+    store.import_export('new', NEW)
+    reopened = ExportStore(str(tmp_path / 'export.sqlite'))
+    assert reopened.import_export('old', OLD)['changed_posts'] == 0
+    assert by_url(reopened.merged())['a'] == (50, 900)
@@ -0,0 +1,49 @@
+"""
+Field-by-field parsing of streamed model output.
+"""
+
+import json
+
+import pytest
+
+from postpro.stream import PartialJSONParser
+
+ANSWER = {
+    'score': 72,
+    'verdict': 'Close, but "tighter" hook.',
+    'risk_level': 'Medium',
+    'analysis': {'visual_physics': 'ok', 'tonal_dna': '{not a brace}'},
+    'fatal_errors': [],
+    'fix_suggestions': ['a', ['b'], 'c'],
+    'approved': True,
+}
+
+
+@pytest.mark.parametrize('size', [1, 3, 7, 1000])
+def test_chunked_feed_matches_json(size):
+    text = '```json\n' + json.dumps(ANSWER, indent=2) + '\n```'
+    parser = PartialJSONParser()
+    order = []
+    for i in range(0, len(text), size):
+        order += parser.feed(text[i:i + size])
+    assert parser.fields == ANSWER
+    assert order == list(ANSWER)
+    assert parser.done
+
+
+def test_field_completes_with_its_chunk():
+    parser = PartialJSONParser()
+    assert parser.feed('{"score": 8') == {}
+    assert parser.feed('5, "verdict": "Clo') == {'score': 85}
+    assert parser.feed('se"') == {'verdict': 'Close'}
+    assert parser.feed(', "analysis": {"a": [1, 2') == {}
+    assert parser.feed(']}') == {'analysis': {'a': [1, 2]}}
+    assert not parser.done
+    assert parser.feed('}') == {}
+    assert parser.done
+
+
+def test_text_after_the_object_is_ignored():
+    parser = PartialJSONParser()
+    parser.feed('Sure! {"score": 1} and {"score": 2}')
+    assert parser.fields == {'score': 1}
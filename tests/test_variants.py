@@ -0,0 +1,32 @@
+"""
+Successive halving over draft variants.
+"""
+
+from benchmarks.bench_variants import ANCHORS, DRAFT, SUGGESTED
+from postpro.analyzer import analyze_posts
+from postpro.providers import MockProvider
+from postpro.variants import optimize, pareto_front
+
+
+def test_pareto_front():
+    variants = [
+        {'id': 'a', 'score': 80, 'local': 50, 'change': 0.5},
+        {'id': 'b', 'score': 70, 'local': 60, 'change': 0.1},
+        {'id': 'c', 'score': 70, 'local': 50, 'change': 0.5},
+        {'id': 'd', 'score': 80, 'local': 50, 'change': 0.5},
+    ]
+    assert [v['id'] for v in pareto_front(variants)] == ['a', 'b', 'd']
+
+
+def test_front_is_scored_on_the_same_anchors():
+    model = MockProvider(latency=0)
+    result = optimize(DRAFT, ANCHORS, '', n=64, suggested_hooks=SUGGESTED, model=model)
+    assert result['rounds'] == len(ANCHORS)
+    assert result['llm_calls'] == model.calls
+    eliminated = [v for v in result['variants'] if v['scores'] and len(v['scores']) < len(ANCHORS)]
+    assert eliminated
+    for v in result['best']:
+        assert sorted(v['scores']) == list(range(len(ANCHORS)))
+        means = [analyze_posts(a, v['text'], '', model=MockProvider(latency=0))['score'] for a in ANCHORS]
+        assert v['score'] == round(sum(means) / len(means), 1)
+    assert [v['score'] for v in result['best']] == sorted((v['score'] for v in result['best']), reverse=True)